@@ -0,0 +1,56 @@
+import numpy as np
+
+
+# goal blending: n ingredients with k nutrient contents and unit costs; nutrient targets near the
+# content of an even mix and a cost target near the cheapest ingredient, so not all goals can be met;
+# one weight per goal, the cost goal last
+def blending(n, k=3, seed=0):
+    rng = np.random.default_rng(seed)
+    content = rng.uniform(0.0, 0.3, (k, n))
+    cost = rng.uniform(0.1, 10.0, n)
+    batch = 100.0
+    target = np.r_[content.mean(axis=1) * batch * rng.uniform(0.8, 1.2, k), cost.min() * batch * 1.5]
+    return {"content": content, "cost": cost, "target": target, "batch": batch,
+            "weight": rng.uniform(1.0, 5.0, k + 1)}
+
+
+# steel production of lagrangian.py at scale: blocks plants making two products each, local capacity
+# rows D_i x_i <= d_i per plant and coupling rows A x <= b shared by all plants
+def production(blocks, coupling=1, seed=0):
+    rng = np.random.default_rng(seed)
+    n = 2 * blocks
+    D = rng.integers(1, 4, (blocks, 2, 2)).astype(np.float64)
+    d = rng.integers(4, 16, (blocks, 2)).astype(np.float64)
+    A = rng.integers(4, 9, (coupling, n)).astype(np.float64)
+    # coupling capacity at half of what the plants could use on their own
+    x = np.array([(dk / Dk.sum(axis=1)).min() for Dk, dk in zip(D, d)]).repeat(2)
+    return {"c": rng.integers(50, 100, n).astype(np.float64), "A": A, "b": 0.5 * (A @ x), "D": D, "d": d}
+
+
+# transportation of logistic.py at scale: m depots with stock and a vehicle capacity per route, n customers;
+# the vehicle capacity admits the proportional split of every demand over the depots, which is returned
+# as the feasible start the Lagrangian loop needs
+def logistics(m, n, seed=0):
+    rng = np.random.default_rng(seed)
+    demand = rng.integers(20, 60, n).astype(np.float64)
+    inventory = rng.uniform(1.0, 2.0, m)
+    inventory = np.ceil(1.3 * demand.sum() * inventory / inventory.sum())
+    share = inventory / inventory.sum()
+    start = np.outer(share, demand)
+    return {"cost": rng.integers(1, 10, (m, n)).astype(np.float64), "inventory": inventory, "demand": demand,
+            "capacity": np.ceil(1.2 * demand.max() * share), "start": start}
+
+
+# cutting stock: k piece lengths below a roll length with random demands
+def cutting(k, roll=107, seed=0):
+    rng = np.random.default_rng(seed)
+    lengths = np.sort(rng.choice(np.arange(3, roll // 2), k, replace=False))
+    return {"lengths": lengths, "demand": rng.integers(10, 50, k), "roll": roll}
+
+
+# farmer yields for s equally likely scenarios, each crop scaled by an independent uniform factor
+def farmer_scenarios(s, seed=0):
+    from labs.stochastic.farm import expected_yields, scenario_dicts
+    rng = np.random.default_rng(seed)
+    base = np.array(list(expected_yields.values()))
+    return scenario_dicts(base * rng.uniform(0.8, 1.2, (s, len(base))))
@@ -0,0 +1,324 @@
+import argparse
+import importlib
+import json
+import multiprocessing as mp
+import os
+import platform
+import resource
+import sys
+import time
+import traceback
+
+import numpy as np
+
+import instances
+from labs import decomposition, goal
+from labs.gurobi import env
+
+# usage: PYTHONPATH=. python benchmarks/suite.py [--family NAME ...] [--quick] [--repeat N] [--timeout S]
+#                                   [--out results.json] [--baseline FILE] [--save-baseline] [--tolerance 0.25]
+# every (family, size) case runs in a fresh process with its output silenced; generate, build and solve
+# are timed apart, memory is the growth of the peak resident set over the process at start, so it
+# covers numpy, scipy and Gurobi alike; the solve phase returns an objective that must match the baseline
+# baseline.json was measured on the host in its "machine" entry; elsewhere only its objectives are checked
+baseline_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+# phase that passes its input through
+def same(x):
+    return x
+
+
+# ================================ LP / MIP families ================================
+
+# the LP and MIP families time the labs library itself; its functions build and solve in one call,
+# so their build phase passes the instance through and the solve phase covers both
+
+# weighted goal program of the blending lab: hit every nutrient target, stay under the cost target
+def solve_goal(data):
+    k = len(data["content"])
+    weight = data["weight"]
+    return goal.weighted(np.vstack([data["content"], data["cost"]]), data["target"], weight,
+                         np.r_[weight[:k], 0.0], total=data["batch"])["objective"]
+
+
+# Lagrangian relaxation of the production lab, one two-product plant per block
+def solve_production(data):
+    return decomposition.production(data["c"], data["A"], data["b"], data["D"], data["d"])["objective"]
+
+
+# Lagrangian relaxation of the vehicle capacities of the logistics lab from the instance's feasible start
+def solve_logistics(data):
+    return decomposition.logistics(data["cost"], data["inventory"], data["demand"], data["capacity"],
+                                   data["start"])["objective"]
+
+
+# column generation of the cutting-stock lab and the integer program over the generated patterns
+def solve_cutting(data):
+    return decomposition.cutting_stock(data["lengths"], data["demand"], data["roll"])["rolls"]
+
+
+# extensive form of the farmer problem over sampled yield scenarios, built and solved by labs.stochastic.farm.extensive
+def solve_farmer(data):
+    from labs.stochastic.farm import extensive
+    profit, _ = extensive(*data)
+    return profit
+
+
+# ================================ network families ================================
+
+# random graph with about 5 arcs per node, as plain arrays so that building the Graph is timed
+def random_arcs(n):
+    from labs.network.graph import random_graph
+    graph = random_graph(n, 5 * n)
+    return graph.n, graph.tail, graph.head, graph.capacity, graph.cost
+
+
+def build_graph(arcs):
+    from labs.network.graph import Graph
+    n, tail, head, capacity, cost = arcs
+    return Graph(n, tail, head, capacity, cost)
+
+
+def solve_maxflow(graph):
+    from labs.network.maxflowsolver import max_flow
+    return float(max_flow(graph, 0, graph.n - 1)[0])
+
+
+def solve_shortestpath(graph):
+    from labs.network.shortestpathsolver import dijkstra
+    dist, _ = dijkstra(graph, 0)
+    return float(dist[np.isfinite(dist)].sum())
+
+
+def mincost_instance(n):
+    from labs.network.networksimplex import random_instance
+    graph, supply = random_instance(n, 5 * n, max(2, n // 20))
+    return (graph.n, graph.tail, graph.head, graph.capacity, graph.cost), supply
+
+
+def build_mincost(data):
+    from labs.network.networksimplex import NetworkSimplex
+    arcs, supply = data
+    return NetworkSimplex(build_graph(arcs), supply)
+
+
+def solve_mincost(simplex):
+    return simplex.solve()[0]
+
+
+# ================================ DP / MDP families ================================
+
+def reliability_instance(n):
+    from labs.dynamic.dp import random_instance
+    R, C = random_instance(n, seed=n)
+    return R, C, int(1.3 * C[:, 1].sum())
+
+
+def solve_reliability(data):
+    from labs.dynamic.dp import optimize
+    return float(np.log(optimize(*data)[0]))
+
+
+def build_discounted(capacity):
+    from labs.markov.mdp import inventory
+    return inventory(capacity, max_order=max(1, capacity // 4))
+
+
+def solve_discounted(mdp):
+    from labs.markov.policy import policy_iteration
+    V, _, _ = policy_iteration(mdp, 0.95)
+    return float(V.mean())
+
+
+def average_instance(N):
+    from labs.markov.avg import queue
+    return queue(N)
+
+
+# the assembly from the lab dictionaries is timed on its own; policy_iteration assembles again
+def build_average(model):
+    from labs.markov.avg import sparse_model
+    sparse_model(*model)
+    return model
+
+
+def solve_average(model):
+    from labs.markov.avg import policy_iteration
+    gain, _, _, _ = policy_iteration(*model)
+    return float(gain)
+
+
+# family: (sizes, modules, generate(size), build(instance), solve(built) -> objective); the modules are
+# imported and Gurobi started before the clock runs; sizes grow by about 10x and the largest LP sizes
+# stay inside a size-limited Gurobi license
+families = {
+    "goal": ((10, 100, 1000), ("gurobipy",), instances.blending, same, solve_goal),
+    "production": ((2, 10, 40), ("gurobipy",), instances.production, same, solve_production),
+    "logistics": ((2, 4, 8), ("gurobipy",), lambda m: instances.logistics(m, 2 * m), same, solve_logistics),
+    "cutting": ((3, 10, 30), ("gurobipy",), instances.cutting, same, solve_cutting),
+    "farmer": ((3, 30, 300), ("gurobipy", "labs.stochastic.farm"), instances.farmer_scenarios, same, solve_farmer),
+    "maxflow": ((1000, 10000, 100000), ("labs.network.maxflowsolver",), random_arcs, build_graph, solve_maxflow),
+    "mincostflow": ((300, 1000, 3000), ("labs.network.networksimplex",), mincost_instance, build_mincost,
+                    solve_mincost),
+    "shortestpath": ((10000, 100000, 1000000), ("labs.network.shortestpathsolver",), random_arcs, build_graph,
+                     solve_shortestpath),
+    "reliability": ((50, 200, 800), ("labs.dynamic.dp",), reliability_instance, same, solve_reliability),
+    "discounted": ((100, 500, 2000), ("labs.markov.policy", "scipy.stats"), same, build_discounted,
+                   solve_discounted),
+    "average": ((1000, 10000, 100000), ("labs.markov.avg",), average_instance, build_average, solve_average),
+}
+
+
+# resident set size of this process in MB
+def rss():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+# one case in this process, output silenced; sends the timings, memory and objective back
+def _case(family, size, conn):
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    sizes, modules, generate, build, solve = families[family]
+    result = {"family": family, "size": size}
+    try:
+        # gurobipy's matrix API loads scipy.sparse on first use
+        for module in ("scipy.sparse",) + modules:
+            importlib.import_module(module)
+        if "gurobipy" in modules:
+            import gurobipy as gp
+            # the default environment too, for lab code that builds models without one
+            env()
+            gp.Model().dispose()
+        start = rss()
+        tick = time.perf_counter()
+        instance = generate(size)
+        result["generate"] = time.perf_counter() - tick
+        tick = time.perf_counter()
+        built = build(instance)
+        result["build"] = time.perf_counter() - tick
+        tick = time.perf_counter()
+        result["objective"] = float(solve(built))
+        result["solve"] = time.perf_counter() - tick
+        # ru_maxrss is in KB on Linux
+        result["memory"] = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 - start, 0.0)
+        result["status"] = "ok"
+    except Exception as error:
+        result["status"] = "error"
+        result["error"] = f"{type(error).__name__}: {error}"
+        result["traceback"] = traceback.format_exc()
+    conn.send(result)
+
+
+# run a case in a fresh process, killed after timeout seconds
+def run_case(family, size, timeout=600):
+    context = mp.get_context("fork")
+    receive, send = context.Pipe(duplex=False)
+    process = context.Process(target=_case, args=(family, size, send))
+    process.start()
+    if receive.poll(timeout):
+        result = receive.recv()
+    else:
+        process.kill()
+        result = {"family": family, "size": size, "status": "timeout"}
+    process.join()
+    return result
+
+
+# every case of the chosen families, best time and largest memory over repeat runs
+def run(names=None, quick=False, repeat=1, timeout=600, log=print):
+    results = []
+    for family in names or families:
+        sizes = families[family][0]
+        for size in sizes[:1] if quick else sizes:
+            runs = [run_case(family, size, timeout) for _ in range(repeat)]
+            result = runs[0]
+            if all(r["status"] == "ok" for r in runs):
+                for key in ("generate", "build", "solve"):
+                    result[key] = min(r[key] for r in runs)
+                result["memory"] = max(r["memory"] for r in runs)
+            log(line(result))
+            results.append(result)
+    return {"machine": machine(), "results": results}
+
+
+# platform and library versions, stored with every result file
+def machine():
+    import scipy
+    return {"platform": platform.platform(), "python": platform.python_version(), "numpy": np.__version__,
+            "scipy": scipy.__version__, "cpus": os.cpu_count(), "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def line(result):
+    head = f"{result['family']:>13} {result['size']:>8}"
+    if result["status"] != "ok":
+        return f"{head}  {result['status']}: {result.get('error', '')}"
+    return (f"{head} {result['generate']:>9.3f}s {result['build']:>9.3f}s {result['solve']:>9.3f}s "
+            f"{result['memory']:>8.1f}MB {result['objective']:>16.6g}")
+
+
+# the machine() fields that timings and memory depend on
+def host(info):
+    return {key: info.get(key) for key in ("platform", "python", "numpy", "scipy", "cpus")}
+
+
+# regressions against a baseline: a phase slower by more than tolerance (and by more than noise
+# seconds), memory higher by more than tolerance (and by more than 1 MB), a different objective, or a
+# case that ran before and fails now; timings and memory only count against a baseline measured on the
+# same host, objectives always; returns the messages
+def compare(results, baseline, tolerance=0.25, noise=0.05):
+    before = {(r["family"], r["size"]): r for r in baseline["results"]}
+    timed = host(results["machine"]) == host(baseline.get("machine", {}))
+    problems = []
+    for r in results["results"]:
+        old = before.get((r["family"], r["size"]))
+        if old is None or old["status"] != "ok":
+            continue
+        name = f"{r['family']} {r['size']}"
+        if r["status"] != "ok":
+            problems.append(f"{name}: {r['status']} {r.get('error', '')}")
+            continue
+        for key in ("build", "solve") * timed:
+            if r[key] > old[key] * (1 + tolerance) and r[key] - old[key] > noise:
+                problems.append(f"{name}: {key} {r[key]:.3f}s against {old[key]:.3f}s")
+        if timed and r["memory"] > old["memory"] * (1 + tolerance) and r["memory"] - old["memory"] > 1.0:
+            problems.append(f"{name}: memory {r['memory']:.1f}MB against {old['memory']:.1f}MB")
+        if abs(r["objective"] - old["objective"]) > 1e-6 * max(1.0, abs(old["objective"])):
+            problems.append(f"{name}: objective {r['objective']:.10g} against {old['objective']:.10g}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and measure the lab models at growing sizes.")
+    parser.add_argument("--family", nargs="*", choices=list(families), help="families to run, all by default")
+    parser.add_argument("--quick", action="store_true", help="smallest size of each family only")
+    parser.add_argument("--repeat", type=int, default=1, help="runs per case, the best time is kept")
+    parser.add_argument("--timeout", type=float, default=600, help="seconds before a case is killed")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=baseline_path, help="results to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    args = parser.parse_args(argv)
+    print(f"{'family':>13} {'size':>8} {'generate':>10} {'build':>10} {'solve':>10} {'memory':>10} {'objective':>16}")
+    results = run(args.family, args.quick, args.repeat, args.timeout)
+    for path in [args.out] + [args.baseline] * args.save_baseline:
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=1)
+    if args.save_baseline or not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if host(results["machine"]) != host(baseline.get("machine", {})):
+        print(f"{args.baseline} was measured on {host(baseline.get('machine', {}))}, "
+              f"only objectives are compared; run with --save-baseline to measure this host")
+    problems = compare(results, baseline, args.tolerance)
+    for problem in problems:
+        print("REGRESSION", problem)
+    print(f"{len(problems)} regressions against {args.baseline}")
+    return int(bool(problems))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
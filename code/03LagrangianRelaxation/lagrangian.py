@@ -2,6 +2,9 @@ import gurobipy as gp
 import numpy as np
 from gurobipy import GRB
 
+# tracing is shared by the lab scripts through the labs package
+from labs import tracing
+
 # parameters
 c = np.array([90, 80, 70, 60])
 A = np.array([[8, 6, 7, 5]])
@@ -75,6 +78,8 @@ x2 = subproblem2.addMVar(len(c2), name="steels")
 # constraints
 subproblem2.addConstr(D2 @ x2 <= d2)
 
+# per-iteration trace, written to $TRACE/lagrangian.jsonl when TRACE is set
+trace = tracing.tracer("lagrangian")
 # start with x = 0
 xval = np.zeros_like(c)
 ub = np.inf
@@ -84,25 +89,34 @@ while True:
     # count
     cnt +=  1
     # add new constraint master
-    master.addConstr(z >= b @ λ + (c - λ @ A) @ xval)
+    with trace.phase("build"):
+        master.addConstr(z >= b @ λ + (c - λ @ A) @ xval)
     # solve master for λ
-    master.optimize()
+    with trace.phase("master"):
+        master.optimize()
     λval = λ.X
     # lower bound
     lb = master.ObjVal
     # terminate condition
     if ub - lb < 1e-6:
+        if trace.enabled:
+            trace.record(iteration=cnt, lower=lb, upper=ub, cuts=1, **tracing.size(master))
         break
     # update subproblems obj
-    subproblem1.setObjective((c1 - λval @ A[:,:2]) @ x1, sense=GRB.MAXIMIZE)
-    subproblem2.setObjective((c2 - λval @ A[:,2:]) @ x2, sense=GRB.MAXIMIZE)
+    with trace.phase("build"):
+        subproblem1.setObjective((c1 - λval @ A[:,:2]) @ x1, sense=GRB.MAXIMIZE)
+        subproblem2.setObjective((c2 - λval @ A[:,2:]) @ x2, sense=GRB.MAXIMIZE)
     # solve the subproblems for x
-    subproblem1.optimize()
-    subproblem2.optimize()
+    with trace.phase("subproblem"):
+        subproblem1.optimize()
+    with trace.phase("subproblem"):
+        subproblem2.optimize()
     xval[:2] = x1.X
     xval[2:] = x2.X
     # upper bound
     ub = b @ λval + (c - λval @ A) @ xval
+    if trace.enabled:
+        trace.record(iteration=cnt, lower=lb, upper=ub, cuts=1, **tracing.size(master))
     # terminate
     if ub - lb < 1e-6:
         break
@@ -112,6 +126,7 @@ while True:
 print(f"Iteration {cnt-1}:")
 print(f"  λ = {λval.tolist()}, Dual Obj = {lb:.2f}.")
 print(f"  x = {xval.tolist()}, Primal Obj = {ub:.2f}.\n")
+trace.close()
 
 # solution
 print("Objective Value: {:.2f}".format(model.ObjVal))
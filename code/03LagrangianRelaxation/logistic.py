@@ -2,6 +2,9 @@ import gurobipy as gp
 import numpy as np
 from gurobipy import GRB
 
+# tracing is shared by the lab scripts through the labs package
+from labs import tracing
+
 # parameters
 cost = np.array([[2, 4, 5],
                  [3, 1, 2]])
@@ -61,6 +64,8 @@ x = subproblem.addMVar((2, 3), name="x")
 subproblem.addConstr(x.sum(axis=1) <= inventory, name="Inventory")
 subproblem.addConstr(x.sum(axis=0) >= demand, name="Demand")
 
+# per-iteration trace, written to $TRACE/logistic.jsonl when TRACE is set
+trace = tracing.tracer("logistic")
 # start with a feasible x
 xval = np.array([[60, 10,  0],
                  [ 0, 40, 40]])
@@ -71,25 +76,32 @@ while True:
     # count
     cnt +=  1
     # add new constraint master
-    master.addConstr(z <= (cost * xval).sum() + \
-                          gp.quicksum(λ[i,j] * (xval[i,j] - capacity[i])
-                                      for i in range(2) for j in range(3)))
+    with trace.phase("build"):
+        master.addConstr(z <= (cost * xval).sum() + \
+                              gp.quicksum(λ[i,j] * (xval[i,j] - capacity[i])
+                                          for i in range(2) for j in range(3)))
     # solve master for λ
-    master.optimize()
+    with trace.phase("master"):
+        master.optimize()
     λval = λ.X
     # upper bound
     ub = master.ObjVal
     # terminate condition
     if ub - lb < 1e-6:
+        if trace.enabled:
+            trace.record(iteration=cnt, lower=lb, upper=ub, cuts=1, **tracing.size(master))
         break
     # update subproblems obj
-    subproblem.setObjective(((cost - λval) * x).sum(), sense=GRB.MINIMIZE)
+    with trace.phase("build"):
+        subproblem.setObjective(((cost - λval) * x).sum(), sense=GRB.MINIMIZE)
     # solve the subproblems for x
-    subproblem.optimize()
+    with trace.phase("subproblem"):
+        subproblem.optimize()
     xval = x.X
     # lower bound
-    lb = (cost * xval).sum() + np.sum(λval[i,j] * (xval[i,j] - capacity[i])
-                                      for i in range(2) for j in range(3))
+    lb = (cost * xval).sum() + (λval * (xval - capacity[:, None])).sum()
+    if trace.enabled:
+        trace.record(iteration=cnt, lower=lb, upper=ub, cuts=1, **tracing.size(master))
     # terminate
     if ub - lb < 1e-6:
         break
@@ -99,6 +111,7 @@ while True:
 print(f"Iteration {cnt-1}:")
 print(f"  λ = {λval.tolist()}, Dual Obj = {lb:.2f}.")
 print(f"  x = {xval.tolist()}, Primal Obj = {ub:.2f}.\n")
+trace.close()
 
 # solution
 print("Objective Value: {:.2f}".format(master.ObjVal))
@@ -2,6 +2,9 @@ import gurobipy as gp
 import numpy as np
 from gurobipy import GRB
 
+# tracing is shared by the lab scripts through the labs package
+from labs import tracing
+
 # available lengths
 lengths = [3, 5, 9]
 # demand
@@ -63,22 +66,27 @@ else:
 
 print("Iterations for Column Generation.\n")
 
+# per-iteration trace, written to $TRACE/cuttingstock.jsonl when TRACE is set
+trace = tracing.tracer("cuttingstock")
+
 # master problem
 def solve_master_problem(patterns):
-    # create Gurobi model
-    m = gp.Model("master")
-    # turn off log
-    m.Params.outputFlag = 0
-    # decision variables for the number of times each pattern is used
-    x = m.addVars(len(patterns), vtype=GRB.CONTINUOUS, name="x")
-    # objective: Minimize the number of 107' copper wires used
-    m.setObjective(gp.quicksum(x[i] for i in range(len(patterns))), GRB.MINIMIZE)
-    # constraints to meet demand for each length (3', 5', 9')
-    m.addConstr(gp.quicksum(patterns[i][0] * x[i] for i in range(len(patterns))) >= demand[0], "Demand_3ft")
-    m.addConstr(gp.quicksum(patterns[i][1] * x[i] for i in range(len(patterns))) >= demand[1], "Demand_5ft")
-    m.addConstr(gp.quicksum(patterns[i][2] * x[i] for i in range(len(patterns))) >= demand[2], "Demand_9ft")
+    with trace.phase("build"):
+        # create Gurobi model
+        m = gp.Model("master")
+        # turn off log
+        m.Params.outputFlag = 0
+        # decision variables for the number of times each pattern is used
+        x = m.addVars(len(patterns), vtype=GRB.CONTINUOUS, name="x")
+        # objective: Minimize the number of 107' copper wires used
+        m.setObjective(gp.quicksum(x[i] for i in range(len(patterns))), GRB.MINIMIZE)
+        # constraints to meet demand for each length (3', 5', 9')
+        m.addConstr(gp.quicksum(patterns[i][0] * x[i] for i in range(len(patterns))) >= demand[0], "Demand_3ft")
+        m.addConstr(gp.quicksum(patterns[i][1] * x[i] for i in range(len(patterns))) >= demand[1], "Demand_5ft")
+        m.addConstr(gp.quicksum(patterns[i][2] * x[i] for i in range(len(patterns))) >= demand[2], "Demand_9ft")
     # optimize the master
-    m.optimize()
+    with trace.phase("master"):
+        m.optimize()
     # objective value
     objval = m.objVal
     # return the dual variables (shadow prices) from the demand constraints
@@ -89,20 +97,22 @@ def solve_master_problem(patterns):
 
 # subproblem
 def solve_subproblem(λ):
-    # create the subproblem to find new cutting patterns
-    m = gp.Model("Subproblem")
-    # turn off log
-    m.Params.outputFlag = 0
-    # decision variables for the number of 3', 5', and 9' lengths
-    a3 = m.addVar(vtype=GRB.INTEGER, name="a3")
-    a5 = m.addVar(vtype=GRB.INTEGER, name="a5")
-    a9 = m.addVar(vtype=GRB.INTEGER, name="a9")
-    # objective: maximize the reduced cost (negative of the dual prices)
-    m.setObjective(λ[0] * a3 + λ[1] * a5 + λ[2] * a9 - 1, GRB.MAXIMIZE)
-    # constraint: less than or equal to whole lengtj
-    m.addConstr(3 * a3 + 5 * a5 + 9 * a9 <= wholesale_length, "Length")
+    with trace.phase("build"):
+        # create the subproblem to find new cutting patterns
+        m = gp.Model("Subproblem")
+        # turn off log
+        m.Params.outputFlag = 0
+        # decision variables for the number of 3', 5', and 9' lengths
+        a3 = m.addVar(vtype=GRB.INTEGER, name="a3")
+        a5 = m.addVar(vtype=GRB.INTEGER, name="a5")
+        a9 = m.addVar(vtype=GRB.INTEGER, name="a9")
+        # objective: maximize the reduced cost (negative of the dual prices)
+        m.setObjective(λ[0] * a3 + λ[1] * a5 + λ[2] * a9 - 1, GRB.MAXIMIZE)
+        # constraint: less than or equal to whole lengtj
+        m.addConstr(3 * a3 + 5 * a5 + 9 * a9 <= wholesale_length, "Length")
     # optimize the subproblem
-    m.optimize()
+    with trace.phase("subproblem"):
+        m.optimize()
     # objective value
     objval = m.objVal
     # obtain new pattern
@@ -119,6 +129,11 @@ def column_generation(init_pattern):
         objval, λ = solve_master_problem(patterns)
         # solve subproblem
         rcost, new_pattern = solve_subproblem(λ)
+        if trace.enabled:
+            # the master value bounds the LP from above, divided by the best pattern's dual value from below
+            trace.record(iteration=cnt + 1, lower=objval / (1 + rcost), upper=objval, columns=int(rcost > 0),
+                         vars=len(patterns), constrs=len(demand),
+                         nonzeros=sum(1 for pattern in patterns for a in pattern if a))
         # if no improvement, break
         if rcost <= 0:
             break
@@ -131,6 +146,7 @@ def column_generation(init_pattern):
 # solve via Col gen
 init_pattern = [1, 1, 11]
 patterns = column_generation(init_pattern)
+trace.close()
 # display the number of patterns and a sample
 print("Total number of valid cutting patterns:", len(patterns))
 print("Patterns:", patterns)
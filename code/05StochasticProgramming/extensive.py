@@ -2,23 +2,9 @@ import gurobipy as gp
 import numpy as np
 from gurobipy import GRB
 
-# data setup
-planting_cost = {"wheat": 150, "corn": 230, "beets": 260}
-purchase_cost = {"wheat": 238, "corn": 210}
-selling_price = {"wheat": 170, "corn": 150, "beets_high": 36, "beets_low": 10}
-feed_requirements = {"wheat": 200, "corn": 240}
-land_available = 500
-beet_sale_limit = 6000
-
-# scenarios and probabilities
-expected_yields = {"wheat": 2.5, "corn": 3, "beets": 20}
-scenarios = [1, 2, 3]
-yields = {
-    1: {crop: yield_val for crop, yield_val in expected_yields.items()},    # Scenario 1: Expected yields
-    2: {crop: 1.2 * yield_val for crop, yield_val in expected_yields.items()},  # Scenario 2: 20% higher yields
-    3: {crop: 0.8 * yield_val for crop, yield_val in expected_yields.items()}   # Scenario 3: 20% lower yields
-}
-probabilities = {1: 1/3, 2: 1/3, 3: 1/3}
+# data setup and scenarios shared with the other farmer labs
+from labs.stochastic.farm import (planting_cost, purchase_cost, selling_price, feed_requirements,
+                                  land_available, beet_sale_limit, scenarios, yields, probabilities)
 
 # create Gurobi model
 m = gp.Model("Extensive Form")
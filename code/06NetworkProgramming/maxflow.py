@@ -1,26 +1,32 @@
-# define graph: nodes and edges with distances
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+
+from labs.network.graph import Graph
+from labs.network.flowlp import flow_balance
+
+# define graph: nodes and edges with capacities
 nodes = ["S", "A", "B", "T"]
-edges, capacities = gp.multidict({
+graph = Graph.from_dict(nodes, {
     ("S", "A"): 10,
     ("S", "B"): 5,
     ("A", "B"): 5,
     ("A", "T"): 5,
     ("B", "T"): 10
 })
+s, t = graph.index("S"), graph.index("T")
 
 # create model
 m = gp.Model("MaxFlow")
 
 # TODO: decision variables: flow on each edge (bounded by capacity)
-x = m.addVars(edges, lb=0, ub=capacities, vtype=GRB.CONTINUOUS, name="x")
+x = m.addMVar(graph.m, lb=0, ub=graph.capacity, vtype=GRB.CONTINUOUS, name="x")
 
 # TODO: objective: maximize total flow from S
-m.setObjective(gp.quicksum(x["S", j] for j in nodes if ("S", j) in edges), GRB.MAXIMIZE)
+m.setObjective(gp.quicksum(x[a] for a in graph.out_arcs(s)), GRB.MAXIMIZE)
 
 # TODO: Flow conservation constraints for all intermediate nodes
-m.addConstrs((gp.quicksum(x[j, i] for j in nodes if (j, i) in edges) ==
-              gp.quicksum(x[i, k] for k in nodes if (i, k) in edges)
-              for i in nodes if i not in ["S", "T"]), "flow_balance")
+flow_balance(m, x, graph, np.zeros(graph.n), rows=[v for v in range(graph.n) if v not in (s, t)])
 
 # Solve model
 m.optimize()
@@ -29,5 +35,5 @@ m.optimize()
 if m.status == GRB.OPTIMAL:
     print(f"\nMaximum Flow: {m.objVal}")
     print("Flow distribution:")
-    for i, j in edges:
-        print(f"  Flow on {i} → {j}: {x[i, j].x}")
+    for a, (i, j) in enumerate(graph.arcs()):
+        print(f"  Flow on {i} → {j}: {x[a].X}")
@@ -1,3 +1,10 @@
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+
+from labs.network.graph import Graph
+from labs.network.flowlp import flow_balance
+
 # define nodes
 nodes = ["Warehouse1", "Warehouse2", "Retailer1", "Retailer2"]
 
@@ -10,7 +17,7 @@ supply_demand = {
 }
 
 # define edges with (capacity, cost per unit)
-edges, capacities, costs = gp.multidict({
+graph = Graph.from_dict(nodes, {
     ("Warehouse1", "Retailer1"): [15, 4],  # (capacity, cost)
     ("Warehouse1", "Retailer2"): [10, 3],
     ("Warehouse2", "Retailer1"): [20, 3],
@@ -22,15 +29,10 @@ edges, capacities, costs = gp.multidict({
 m = gp.Model("MinCostFlow")
 
 # TODO: decision variables: flow on each edge
-x = m.addVars(edges, lb=0, ub=capacities, obj=costs, vtype=GRB.CONTINUOUS, name="flow")
+x = m.addMVar(graph.m, lb=0, ub=graph.capacity, obj=graph.cost, vtype=GRB.CONTINUOUS, name="flow")
 
-# TODO: flow constraints: Inflow - Outflow
-m.addConstrs(
-    (gp.quicksum(x[i, j] for j in nodes if (i, j) in edges) -
-     gp.quicksum(x[j, i] for j in nodes if (j, i) in edges) == supply_demand[i]
-     for i in nodes),
-    "flow_balance"
-)
+# TODO: flow constraints: Outflow - Inflow, one row per node
+flow_balance(m, x, graph, [supply_demand[i] for i in nodes])
 
 # slve model
 m.optimize()
@@ -39,6 +41,6 @@ m.optimize()
 if m.status == GRB.OPTIMAL:
     print(f"\nMinimum Cost: {m.objVal}")
     print("Optimal Transportation Plan:")
-    for i, j in edges:
-        if x[i, j].x > 0:
-            print(f"  Send {x[i, j].x:.0f} units from {i} to {j}")
+    for a, (i, j) in enumerate(graph.arcs()):
+        if x[a].X > 0:
+            print(f"  Send {x[a].X:.0f} units from {i} to {j}")
@@ -1,27 +1,33 @@
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+
+from labs.network.graph import Graph
+from labs.network.flowlp import flow_balance
+
 # define graph: nodes and edges with distances
 nodes = ["A", "B", "C", "D"]
-edges, distances = gp.multidict({
+graph = Graph.from_dict(nodes, {
     ("A", "B"): 4,
     ("A", "C"): 2,
     ("B", "C"): 1,
     ("C", "D"): 3
-})
+}, fields=("cost",))
+s, t = graph.index("A"), graph.index("D")
 
 # create model
 m = gp.Model("ShortestPath")
 
 # decision variables: Flow on each edge
-x = m.addVars(edges, lb=0, ub=1, vtype=GRB.CONTINUOUS, name="x")
+x = m.addMVar(graph.m, lb=0, ub=1, vtype=GRB.CONTINUOUS, name="x")
 
 # objective: Minimize total distance traveled
-m.setObjective(gp.quicksum(distances[i, j] * x[i, j] for i, j in edges), GRB.MINIMIZE)
+m.setObjective(graph.cost @ x, GRB.MINIMIZE)
 
 # TODO:constraints
-m.addConstr(gp.quicksum(x["A", j] for j in nodes if ("A", j) in edges) == 1, "source")  # supply
-m.addConstr(gp.quicksum(x[i, "D"] for i in nodes if (i, "D") in edges) == 1, "sink")    # demand
-m.addConstrs((gp.quicksum(x[i, j] for j in nodes if (i, j) in edges) ==
-              gp.quicksum(x[j, i] for j in nodes if (j, i) in edges)
-              for i in nodes if i not in ["A", "D"]), "flow_balance")  # flow conservation
+rhs = np.zeros(graph.n)
+rhs[s], rhs[t] = 1, -1  # supply at the source, demand at the sink
+flow_balance(m, x, graph, rhs)  # flow conservation
 
 # solve model
 m.optimize()
@@ -30,6 +36,6 @@ m.optimize()
 if m.status == GRB.OPTIMAL:
     print(f"\nOptimal Distance: {m.objVal}")
     print("Edges used in the shortest path:")
-    for i, j in edges:
-        if x[i, j].x > 0.5:
+    for a, (i, j) in enumerate(graph.arcs()):
+        if x[a].X > 0.5:
             print(f"  {i} → {j}")
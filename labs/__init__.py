@@ -0,0 +1,17 @@
+# the lab models as a library: every function takes the instance data and returns its results as a dict,
+# and nothing is built or solved on import; gurobipy is only imported by the functions that build LP or
+# MIP models, so the DP, MDP and network solvers load without it and without a license check. The lab
+# scripts under code/ import from here, so they run with the repository root on PYTHONPATH.
+#
+#   goal           weighted and pre-emptive goal programs
+#   decomposition  Lagrangian relaxation (production, logistics) and column generation (cutting stock)
+#   stochastic     farmer extensive form, regularized Benders, SDDP and scenario reduction
+#   network        max flow, min-cost flow, shortest paths, Gomory-Hu trees and their LPs
+#   dynamic        reliability DP, Pareto labels and the IP
+#   markov         discounted and average-cost MDPs
+#   tracing        per-iteration traces of the decomposition loops, also used by the lab scripts
+#   cli            python -m labs: a batch of instances from a JSONL file on a worker pool
+#
+# stochastic, network, dynamic and markov are packages: their __init__ holds the functions above and
+# the solver modules sit next to it (labs.network.graph, labs.markov.value, labs.stochastic.farm, ...),
+# each runnable for its benchmark demo, e.g. python -m labs.network.maxflowsolver
@@ -0,0 +1,122 @@
+import argparse
+import importlib
+import inspect
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# usage: python -m labs BATCH.jsonl [--out results.jsonl] [--workers N] [--trace DIR]
+# one instance per line, the library function as module.function and its keyword arguments:
+#   {"id": "q1", "problem": "markov.queue", "data": {"N": 1000}}
+#   {"id": "cut", "problem": "decomposition.cutting_stock", "data": {"lengths": [3, 5, 9], "demand": [25, 20, 15], "roll": 107}}
+# results come back one line per instance in input order, {"id", "problem", "status", "time", "result"}
+# or "error"; workers start without gurobipy, which only instances of LP and MIP problems import
+modules = ("goal", "decomposition", "stochastic", "network", "dynamic", "markov")
+
+
+# the library function named module.function
+def problem(name):
+    module, _, function = name.partition(".")
+    if module not in modules or not function or function.startswith("_"):
+        raise ValueError(f"Unknown problem {name!r}, expected module.function with module one of {modules}.")
+    solver = getattr(importlib.import_module(f"labs.{module}"), function, None)
+    if not inspect.isfunction(solver) or solver.__module__ != f"labs.{module}":
+        raise ValueError(f"Unknown problem {name!r}, labs.{module} has no function {function!r}.")
+    return solver
+
+
+# results as JSON values: arrays to lists, numpy scalars to Python numbers, keys to strings
+def plain(value):
+    if isinstance(value, dict):
+        return {str(k): plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    raise TypeError(f"{type(value).__name__} result is not a JSON value.")
+
+
+# workers write nothing to the shared stdout, solver banners included
+def _quiet():
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+
+
+# one instance, errors reported instead of raised so that the rest of the batch goes on
+def solve(task):
+    index, instance, trace = task
+    name = instance.get("problem", "")
+    result = {"id": instance.get("id", index), "problem": name}
+    tick = time.perf_counter()
+    data = dict(instance.get("data", {}))
+    try:
+        solver = problem(name)
+        if trace and "trace" in inspect.signature(solver).parameters:
+            from . import tracing
+            data["trace"] = tracing.Tracer(os.path.join(trace, f"{result['id']}.jsonl"))
+        result["result"] = plain(solver(**data))
+        result["status"] = "ok"
+    except Exception as error:
+        result["status"] = "error"
+        result["error"] = f"{type(error).__name__}: {error}"
+        result["traceback"] = traceback.format_exc()
+    finally:
+        if trace and "trace" in data:
+            data["trace"].close()
+    result["time"] = time.perf_counter() - tick
+    return result
+
+
+# instances of the JSONL batch, blank lines skipped
+def read(path):
+    f = sys.stdin if path == "-" else open(path)
+    try:
+        return [json.loads(line) for line in f if line.strip()]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+# solve every instance on a pool of workers (in this process for 0) and write each result as it is
+# ready, in input order; returns the number of failed instances
+def run(batch, out, workers=None, trace=None):
+    tasks = [(i, instance, trace) for i, instance in enumerate(batch)]
+    pool = ProcessPoolExecutor(workers or os.cpu_count(), initializer=_quiet) if workers != 0 else None
+    failed = 0
+    try:
+        for result in (pool.map(solve, tasks) if pool else map(solve, tasks)):
+            failed += result["status"] != "ok"
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m labs", description="Solve a batch of lab instances.")
+    parser.add_argument("batch", help="JSONL file of instances, - for stdin")
+    parser.add_argument("--out", help="JSONL file for the results, stdout by default")
+    parser.add_argument("--workers", type=int, help="worker processes, one per core by default, 0 for none")
+    parser.add_argument("--trace", help="folder for per-iteration traces of the decomposition problems")
+    args = parser.parse_args(argv)
+    batch = read(args.batch)
+    out = open(args.out, "w") if args.out else sys.stdout
+    try:
+        tick = time.perf_counter()
+        failed = run(batch, out, args.workers, args.trace)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"{len(batch)} instances, {failed} failed, {time.perf_counter() - tick:.2f}s", file=sys.stderr)
+    return int(bool(failed))
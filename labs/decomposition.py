@@ -0,0 +1,147 @@
+import numpy as np
+
+from . import tracing
+from .gurobi import model, solve
+
+
+# Lagrangian relaxation of the production lab for any number of plants: maximize c x subject to the
+# coupling rows A x <= b and the plant rows D[k] x_k <= d[k], x_k the next D[k].shape[1] entries of x;
+# a cutting-plane master over the multipliers of A and one LP per plant, until the master (lower) and
+# the Lagrangian bound (upper) meet. trace takes a tracing.Tracer for the per-iteration records, verbose
+# prints every iteration as the lab does
+def production(c, A, b, D, d, tol=1e-6, max_iter=500, trace=None, verbose=False):
+    from gurobipy import GRB
+    trace = trace or tracing.NULL
+    c, A, b = (np.asarray(v, dtype=np.float64) for v in (c, A, b))
+    A = np.atleast_2d(A)
+    with trace.phase("build"):
+        master = model("Master Problem")
+        lam = master.addMVar(len(A), name="dual")
+        z = master.addVar(lb=-GRB.INFINITY, name="z")
+        master.setObjective(z, GRB.MINIMIZE)
+        plants, start = [], 0
+        for k, (Dk, dk) in enumerate(zip(D, d)):
+            Dk = np.atleast_2d(np.asarray(Dk, dtype=np.float64))
+            sub = model(f"Subproblem {k}")
+            xk = sub.addMVar(Dk.shape[1], name="steels")
+            sub.addConstr(Dk @ xk <= np.asarray(dk, dtype=np.float64))
+            plants.append((sub, xk, slice(start, start + Dk.shape[1])))
+            start += Dk.shape[1]
+    x = np.zeros_like(c)
+    upper = np.inf
+    for it in range(1, max_iter + 1):
+        with trace.phase("build"):
+            master.addConstr(z >= b @ lam + (c - lam @ A) @ x)
+        with trace.phase("master"):
+            lower = solve(master)
+        price = lam.X
+        if upper - lower >= tol:
+            for sub, xk, block in plants:
+                with trace.phase("build"):
+                    sub.setObjective((c[block] - price @ A[:, block]) @ xk, GRB.MAXIMIZE)
+                with trace.phase("subproblem"):
+                    solve(sub)
+                x[block] = xk.X
+            upper = b @ price + (c - price @ A) @ x
+        if trace.enabled:
+            trace.record(iteration=it, lower=lower, upper=upper, cuts=1, **tracing.size(master))
+        if verbose:
+            print(f"Iteration {it}:")
+            print(f"  λ = {price.tolist()}, master bound = {lower:.2f}.")
+            print(f"  x = {x.tolist()}, Lagrangian bound = {upper:.2f}.\n")
+        if upper - lower < tol:
+            break
+    return {"objective": upper, "x": x, "multipliers": price, "iterations": it}
+
+
+# Lagrangian relaxation of the vehicle capacities x[i, j] <= capacity[i] of the logistics lab: a
+# cutting-plane master over the multipliers (upper) and the transportation LP as subproblem (lower),
+# from a feasible start of the full problem
+def logistics(cost, inventory, demand, capacity, start, tol=1e-6, max_iter=500, trace=None, verbose=False):
+    from gurobipy import GRB
+    trace = trace or tracing.NULL
+    cost, capacity = np.asarray(cost, dtype=np.float64), np.asarray(capacity, dtype=np.float64)[:, None]
+    with trace.phase("build"):
+        master = model("Master Problem")
+        lam = master.addMVar(cost.shape, name="dual")
+        z = master.addVar(lb=-GRB.INFINITY, name="z")
+        master.setObjective(z, GRB.MAXIMIZE)
+        sub = model("Subproblem")
+        x = sub.addMVar(cost.shape, name="x")
+        sub.addConstr(x.sum(axis=1) <= np.asarray(inventory, dtype=np.float64), name="Inventory")
+        sub.addConstr(x.sum(axis=0) >= np.asarray(demand, dtype=np.float64), name="Demand")
+    xval = np.asarray(start, dtype=np.float64)
+    lower = -np.inf
+    for it in range(1, max_iter + 1):
+        with trace.phase("build"):
+            master.addConstr(z <= (cost * xval).sum() + (lam * (xval - capacity)).sum())
+        with trace.phase("master"):
+            upper = solve(master)
+        price = lam.X
+        if upper - lower >= tol:
+            with trace.phase("build"):
+                sub.setObjective(((cost - price) * x).sum(), GRB.MINIMIZE)
+            with trace.phase("subproblem"):
+                solve(sub)
+            xval = x.X
+            lower = (cost * xval).sum() + (price * (xval - capacity)).sum()
+        if trace.enabled:
+            trace.record(iteration=it, lower=lower, upper=upper, cuts=1, **tracing.size(master))
+        if verbose:
+            print(f"Iteration {it}:")
+            print(f"  λ = {price.tolist()}, master bound = {upper:.2f}.")
+            print(f"  x = {xval.tolist()}, Lagrangian bound = {lower:.2f}.\n")
+        if upper - lower < tol:
+            break
+    return {"objective": lower, "x": xval, "multipliers": price, "iterations": it}
+
+
+# column generation of the cutting-stock lab: LP master over patterns, starting from the start patterns
+# (one per length with as many pieces as fit by default), integer knapsack pricing, then the integer
+# program over the generated patterns; returns the rolls used, the LP bound, the patterns and how often
+# each is cut
+def cutting_stock(lengths, demand, roll, start=None, max_iter=1000, trace=None, verbose=False):
+    import gurobipy as gp
+    from gurobipy import GRB
+    trace = trace or tracing.NULL
+    lengths, demand = np.asarray(lengths), np.asarray(demand)
+    with trace.phase("build"):
+        master = model("master")
+        rows = master.addConstrs((gp.LinExpr() >= demand[i] for i in range(len(lengths))), name="Demand")
+        if start is None:
+            start = np.diag(roll // lengths)
+        patterns = [np.asarray(pattern, dtype=np.int64) for pattern in start]
+        for pattern in patterns:
+            used = np.flatnonzero(pattern)
+            master.addVar(obj=1.0, column=gp.Column(pattern[used].tolist(), [rows[i] for i in used]))
+        pricing = model("Subproblem")
+        a = pricing.addMVar(len(lengths), vtype=GRB.INTEGER, name="a")
+        pricing.addConstr(lengths @ a <= roll, name="Length")
+    for it in range(1, max_iter + 1):
+        with trace.phase("master"):
+            bound = solve(master)
+        duals = np.array([rows[i].Pi for i in range(len(rows))])
+        with trace.phase("build"):
+            pricing.setObjective(duals @ a - 1, GRB.MAXIMIZE)
+        with trace.phase("subproblem"):
+            rcost = solve(pricing)
+        improving = rcost > 1e-9
+        if improving:
+            pattern = np.rint(a.X).astype(np.int64)
+            used = np.flatnonzero(pattern)
+            with trace.phase("build"):
+                master.addVar(obj=1.0, column=gp.Column(pattern[used].tolist(), [rows[i] for i in used]))
+            patterns.append(pattern)
+            if verbose:
+                print(f"Iteration {it}: New pattern {pattern.tolist()} with objective value {bound}")
+        if trace.enabled:
+            # the master value bounds the LP from above, divided by the best pattern's dual value from below
+            trace.record(iteration=it, lower=bound / (1 + rcost), upper=bound, columns=int(improving),
+                         **tracing.size(master))
+        if not improving:
+            break
+    for v in master.getVars():
+        v.VType = GRB.INTEGER
+    rolls = solve(master)
+    counts = np.rint([v.X for v in master.getVars()]).astype(np.int64)
+    return {"rolls": rolls, "bound": bound, "patterns": np.array(patterns), "counts": counts, "iterations": it}
@@ -0,0 +1,31 @@
+import numpy as np
+
+# redundancy allocation: R[i, u] the reliability of component i with option u (0 where unavailable),
+# C[i, u] its cost; the system reliability is the product over the components; the solver modules
+# load on first call
+
+
+# exact DP over the budget grid; integer costs, or costs on a common grid step
+def reliability(R, C, budget):
+    from .dp import optimize
+    best, config = optimize(np.asarray(R, dtype=np.float64), np.asarray(C), budget)
+    return {"reliability": best, "units": config}
+
+
+# Pareto-label DP for real-valued costs and an optional second resource W limited by capacity;
+# bound="lp" prunes labels with the duals of the LP relaxation (Gurobi), "simple" without
+def pareto(R, C, budget, W=None, capacity=None, bound="lp"):
+    from .labels import pareto
+    W = None if W is None else np.asarray(W, dtype=np.float64)
+    best, config, counts = pareto(np.asarray(R, dtype=np.float64), np.asarray(C, dtype=np.float64), budget,
+                                   W, capacity, bound)
+    return {"reliability": best, "units": config, "labels": max(counts, default=0)}
+
+
+# the log-linear MIP of labs.dynamic.mip
+def ip(R, C, budget, W=None, capacity=None):
+    from .mip import ip
+    W = None if W is None else np.asarray(W, dtype=np.float64)
+    log_reliability, config, _ = ip(np.asarray(R, dtype=np.float64), np.asarray(C, dtype=np.float64), budget,
+                                    W, capacity)
+    return {"reliability": float(np.exp(log_reliability)) if config is not None else 0.0, "units": config}
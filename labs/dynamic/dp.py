@@ -0,0 +1,251 @@
+import hashlib
+import math
+import os
+import tempfile
+import time
+import tracemalloc
+from functools import reduce
+
+import numpy as np
+
+# parameters
+reliabilities = {
+    "A": [0, 0.5, 0.6, 0.8],
+    "B": [0, 0.6, 0.7, 0.8],
+    "C": [0, 0.7, 0.8, 0.9],
+    "D": [0, 0.5, 0.7, 0.9]
+}
+costs = {
+    "A": [0, 100, 200, 300],
+    "B": [0, 200, 400, 500],
+    "C": [0, 100, 300, 400],
+    "D": [0, 200, 300, 400]
+}
+
+# indices
+components = ["A", "B", "C", "D"]
+units = [1, 2, 3]
+
+# solved tables are kept here between runs, one file per instance: $RELIABILITY_CACHE when set, else a
+# folder in the temp directory; the table format is part of every file name, so a layout change
+# never reads files written by an older version
+cache_dir = os.environ.get("RELIABILITY_CACHE") or os.path.join(tempfile.gettempdir(), "reliability")
+table_format = 1
+
+# recursive dynamic programming function, kept as a reference for the table solver;
+# instance is (components, reliabilities, costs) with the dicts keyed by component
+def dp(comp_ind, budget, instance, memo=None):
+    # fresh memo per top-level call
+    if memo is None:
+        memo = {}
+    components, reliabilities, costs = instance
+    # bsase case: no components left
+    if comp_ind >= len(components):
+        return 1, []
+    # check if solution already computed in memo
+    if (comp_ind, budget) in memo:
+        return memo[comp_ind, budget]
+    # init setting
+    max_reliability = 0
+    best_units = []
+    c = components[comp_ind]
+    # recursive case: try all unit options for the current component
+    for u in range(1, len(costs[c])):
+        cost = costs[c][u]
+        # check if feasible
+        if budget >= cost:
+            # recursive dp
+            reliability, units_used = dp(comp_ind + 1,
+                                         budget - cost,
+                                         instance,
+                                         memo)
+            current_reliability = reliability * reliabilities[c][u]
+            # get best one
+            if current_reliability > max_reliability:
+                max_reliability = current_reliability
+                best_units = [u] + units_used
+    # memoize
+    memo[comp_ind, budget] = max_reliability, best_units
+    # return the result
+    return max_reliability, best_units
+
+# dict instance as (components x options) arrays, column u meaning u units;
+# missing options get reliability 0 so they are never chosen
+def arrays(reliabilities, costs, components=None):
+    components = list(reliabilities) if components is None else components
+    width = max(len(reliabilities[c]) for c in components)
+    R = np.zeros((len(components), width))
+    C = np.zeros((len(components), width), dtype=np.int64)
+    for i, c in enumerate(components):
+        R[i, :len(reliabilities[c])] = reliabilities[c]
+        C[i, :len(costs[c])] = costs[c]
+    return R, C
+
+# budget grid spacing: every reachable spend is a multiple of the gcd of the costs
+def grid_step(C):
+    return reduce(math.gcd, np.unique(C[C > 0]).tolist(), 0) or 1
+
+# bottom-up over the components from last to first; value[b] is the best log reliability of the
+# components still to go with b grid steps of budget, and choice[i, b] the best option of component i,
+# one byte per entry
+def solve(R, C, budget):
+    n, k = R.shape
+    if k > 256:
+        raise ValueError("At most 256 unit options per component fit the uint8 choice table.")
+    step = grid_step(C)
+    B = int(budget) // step
+    shift = C // step
+    # logs keep the product of hundreds of reliabilities away from underflow
+    with np.errstate(divide="ignore"):
+        logr = np.log(R)
+    value = np.zeros(B + 1)
+    candidates = np.empty((k, B + 1))
+    choice = np.empty((n, B + 1), dtype=np.uint8)
+    for i in range(n - 1, -1, -1):
+        # one row per option: option u at budget b uses the value at b - cost
+        candidates.fill(-np.inf)
+        for u in range(k):
+            c = shift[i, u]
+            if c <= B and np.isfinite(logr[i, u]):
+                np.add(value[:B + 1 - c], logr[i, u], out=candidates[u, c:])
+        best = candidates.argmax(axis=0)
+        value = candidates[best, np.arange(B + 1)]
+        choice[i] = best
+    return value, choice, step
+
+# configuration for b grid steps of budget, read off the choice tables
+def backtrack(choice, C, step, b):
+    config = np.empty(len(choice), dtype=np.int64)
+    for i, best in enumerate(choice):
+        config[i] = best[b]
+        b -= C[i, config[i]] // step
+    return config
+
+# best reliability and units per component within the budget, (0, None) if nothing fits
+def optimize(R, C, budget):
+    value, choice, step = solve(R, C, budget)
+    b = len(value) - 1
+    if not np.isfinite(value[b]):
+        return 0.0, None
+    return float(np.exp(value[b])), backtrack(choice, C, step, b)
+
+# table format and full hash of the instance data, the name of its cached tables
+def instance_key(R, C):
+    h = hashlib.sha256()
+    for a in (R, C):
+        a = np.ascontiguousarray(a)
+        h.update("{} {}".format(a.dtype, a.shape).encode())
+        h.update(a.tobytes())
+    return "v{}-{}".format(table_format, h.hexdigest())
+
+# value and choice tables up to the budget; a cached solve with at least this budget is sliced,
+# since entries for smaller budgets never depend on larger ones
+def tables(R, C, budget, cache=cache_dir):
+    step = grid_step(C)
+    B = int(budget) // step
+    path = os.path.join(cache, instance_key(R, C) + ".npz") if cache else None
+    if path and os.path.exists(path):
+        with np.load(path) as f:
+            if len(f["value"]) > B:
+                return f["value"][:B + 1], f["choice"][:, :B + 1], step
+    value, choice, step = solve(R, C, budget)
+    if path:
+        os.makedirs(cache, exist_ok=True)
+        # write then rename so a concurrent reader never sees half a file
+        with open(path + ".tmp", "wb") as f:
+            np.savez(f, value=value, choice=choice)
+        os.replace(path + ".tmp", path)
+    return value, choice, step
+
+# optimal reliability and configuration for every budget 0, step, 2 step, ..., budget from one table;
+# budgets nothing fits into get reliability 0 and zero units
+def frontier(R, C, budget, cache=cache_dir):
+    value, choice, step = tables(R, C, budget, cache)
+    b = np.arange(len(value))
+    config = np.empty((len(value), len(choice)), dtype=np.int64)
+    # backtrack all budgets at once
+    for i in range(len(choice)):
+        config[:, i] = choice[i][b]
+        b = b - C[i, config[:, i]] // step
+    return step * np.arange(len(value)), np.exp(value), config
+
+# peak memory of the memoized recursion against the bottom-up solver on one instance
+def memory(R, C, budget):
+    names = [str(i) for i in range(len(R))]
+    instance = (names, dict(zip(names, R.tolist())), dict(zip(names, C.tolist())))
+    tracemalloc.start()
+    tick = time.perf_counter()
+    memo = {}
+    reference, _ = dp(0, budget, instance, memo)
+    recursion = time.perf_counter() - tick, tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    tracemalloc.start()
+    tick = time.perf_counter()
+    value, choice, _ = solve(R, C, budget)
+    table = time.perf_counter() - tick, tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert abs(reference - np.exp(value[-1])) <= 1e-9 * reference
+    print("{} components: recursion {} memo entries, {:.1f}MB peak, {:.2f}s; "
+          "tables {:.1f}MB peak ({:.2f}MB of choices), {:.2f}s".format(
+              len(R), len(memo), recursion[1] / 2 ** 20, recursion[0],
+              table[1] / 2 ** 20, choice.nbytes / 2 ** 20, table[0]))
+
+# redundancy-allocation instance: reliability rises with the number of units, costs on a coarse grid
+def random_instance(n, k=3, unit=10, seed=0):
+    rng = np.random.default_rng(seed)
+    R = np.zeros((n, k + 1))
+    R[:, 1:] = np.sort(rng.uniform(0.99, 0.9999, (n, k)), axis=1)
+    C = np.zeros((n, k + 1), dtype=np.int64)
+    C[:, 1:] = unit * np.cumsum(rng.integers(1, 20, (n, k)), axis=1)
+    return R, C
+
+if __name__ == "__main__":
+    # solve
+    R, C = arrays(reliabilities, costs, components)
+    max_reliability, unit_configuration = optimize(R, C, budget=1000)
+
+    # solution
+    print("Solutions:")
+    for i, c in enumerate(components):
+        print("Component {}: {} units.".format(c, unit_configuration[i]))
+    print("Maximum Reliability: {:.4f}".format(max_reliability))
+
+    # same answer as the recursion
+    assert abs(dp(comp_ind=0, budget=1000, instance=(components, reliabilities, costs))[0] - max_reliability) <= 1e-12
+
+    # reliability-vs-budget frontier of the lab system
+    print()
+    print("Budget  Reliability  Units")
+    budgets, reliability, configs = frontier(R, C, 1500, cache=None)
+    for k in range(len(budgets)):
+        if k == 0 or reliability[k] > reliability[k - 1]:
+            print("{:>6}  {:>11.4f}  {}".format(budgets[k], reliability[k], configs[k].tolist()))
+
+    # redundancy allocation at scale
+    print()
+    R, C = random_instance(500)
+    budget = int(1.3 * C[:, 1].sum())
+    tick = time.perf_counter()
+    max_reliability, unit_configuration = optimize(R, C, budget)
+    print("500 components, budget {} on a grid of step {}: {:.2f}s".format(budget, grid_step(C), time.perf_counter() - tick))
+    spent = C[np.arange(len(C)), unit_configuration].sum()
+    print("Maximum Reliability: {:.4e}, spent {}".format(max_reliability, spent))
+    assert spent <= budget
+    assert abs(np.prod(R[np.arange(len(R)), unit_configuration]) - max_reliability) <= 1e-9
+
+    # every budget at once, then again from the disk cache
+    tick = time.perf_counter()
+    budgets, reliability, configs = frontier(R, C, budget)
+    first = time.perf_counter() - tick
+    tick = time.perf_counter()
+    frontier(R, C, budget // 2)
+    print("Frontier over {} budgets: {:.2f}s, half of it again from {}: {:.3f}s".format(
+        len(budgets), first, cache_dir, time.perf_counter() - tick))
+    assert abs(reliability[-1] - max_reliability) <= 1e-12
+    assert (C[np.arange(len(C)), configs].sum(axis=1) <= budgets).all()
+
+    # memory of the memoized recursion against the byte tables
+    print()
+    for n in (50, 100, 200):
+        R, C = random_instance(n, seed=n)
+        memory(R, C, int(1.3 * C[:, 1].sum()))
@@ -0,0 +1,185 @@
+import time
+
+import numpy as np
+
+from .dp import optimize
+
+
+# reliability system with real-valued costs and weights, column u meaning u units
+def real_instance(n, k=3, seed=0):
+    rng = np.random.default_rng(seed)
+    R = np.zeros((n, k + 1))
+    R[:, 1:] = np.sort(rng.uniform(0.9, 0.999, (n, k)), axis=1)
+    C = np.zeros((n, k + 1))
+    C[:, 1:] = np.cumsum(rng.uniform(10, 100, (n, k)), axis=1).round(2)
+    W = np.zeros((n, k + 1))
+    W[:, 1:] = np.cumsum(rng.uniform(1, 20, (n, k)), axis=1).round(2)
+    return R, C, W
+
+
+# labels no other label dominates (cost and weight no larger, log reliability no smaller), in cost order
+def nondominated(cost, weight, value):
+    if weight is None:
+        # one resource: a label survives if it beats every cheaper one
+        order = np.lexsort((-value, cost))
+        v = value[order]
+        keep = np.ones(len(v), dtype=bool)
+        keep[1:] = v[1:] > np.maximum.accumulate(v)[:-1]
+        return order[keep]
+    # two resources: sweep in cost order, a Fenwick tree holds the best value seen per weight prefix
+    order = np.lexsort((-value, weight, cost))
+    levels = np.unique(weight)
+    rank = (np.searchsorted(levels, weight[order]) + 1).tolist()
+    tree = [-np.inf] * (len(levels) + 1)
+    keep = []
+    for j, (r, v) in enumerate(zip(rank, value[order].tolist())):
+        best, i = -np.inf, r
+        while i > 0:
+            if tree[i] > best:
+                best = tree[i]
+            i -= i & -i
+        if best >= v:
+            continue
+        keep.append(j)
+        while r < len(tree):
+            if v > tree[r]:
+                tree[r] = v
+            r += r & -r
+    return order[keep]
+
+
+# feasible configuration to prune against: cheapest options, then the upgrades with the best
+# log-reliability gain per unit of normalized resource while they fit
+def greedy(logr, resources, limits):
+    n = len(logr)
+    rows = np.arange(n)
+    scaled = sum(r / limit for r, limit in zip(resources, limits))
+    usable = np.isfinite(logr)
+    if not usable.any(axis=1).all():
+        return -np.inf, None
+    config = np.where(usable, scaled, np.inf).argmin(axis=1)
+    slack = np.array([limit - r[rows, config].sum() for r, limit in zip(resources, limits)])
+    if (slack < 0).any():
+        return -np.inf, None
+    while True:
+        gain = logr - logr[rows, config][:, None]
+        extra = scaled - scaled[rows, config][:, None]
+        ok = gain > 0
+        for r, s in zip(resources, slack):
+            ok &= r - r[rows, config][:, None] <= s
+        if not ok.any():
+            break
+        ratio = np.where(ok, gain / np.maximum(extra, 1e-12), -np.inf)
+        i, u = np.unravel_index(ratio.argmax(), ratio.shape)
+        slack -= [r[i, u] - r[i, config[i]] for r in resources]
+        config[i] = u
+    return logr[rows, config].sum(), config
+
+
+# forward DP over the components on sparse (cost, weight, log reliability) labels; a stage keeps only
+# nondominated labels that still fit the resources and, with a bound, can still reach the incumbent.
+# bound "simple" adds the best remaining options; bound "lp" also prices the leftover resources with
+# the duals of the LP relaxation in mip.py, a Lagrangian bound valid for every label at once.
+# returns the best reliability, its configuration and the number of labels kept per stage
+def pareto(R, C, budget, W=None, capacity=None, bound="lp"):
+    n, k = R.shape
+    usable = R > 0
+    logr = np.where(usable, np.log(np.where(usable, R, 1.0)), -np.inf)
+    resources = [C] if W is None else [C, W]
+    limits = [budget] if W is None else [budget, capacity]
+    tol = [1e-9 * max(1.0, limit) for limit in limits]
+    # least of each resource the remaining components need
+    least = [np.append(np.cumsum(np.where(usable, r, np.inf).min(axis=1)[::-1])[::-1], 0.0) for r in resources]
+    duals = np.zeros(len(resources))
+    if bound == "lp":
+        # Gurobi is loaded only for the LP bound
+        from .mip import ip
+        _, _, duals = ip(R, C, budget, W, capacity, relax=True)
+        if duals is None:
+            # not even the relaxation fits the resources
+            return 0.0, None, []
+        duals = np.maximum(duals, 0.0)
+    adjusted = logr - sum(d * r for d, r in zip(duals, resources))
+    rest = np.append(np.cumsum(adjusted.max(axis=1)[::-1])[::-1], 0.0)
+    simple = np.append(np.cumsum(logr.max(axis=1)[::-1])[::-1], 0.0)
+    incumbent, fallback = greedy(logr, resources, limits) if bound else (-np.inf, None)
+    # labels: resource use per resource and log reliability, one entry at the start; the option of
+    # each label is kept in the smallest unsigned type that holds k - 1
+    option = np.min_scalar_type(k - 1)
+    used = [np.zeros(1) for _ in resources]
+    value = np.zeros(1)
+    parents, options, counts = [], [], []
+    for i in range(n):
+        opts = np.flatnonzero(usable[i])
+        p = np.repeat(np.arange(len(value)), len(opts))
+        o = np.tile(opts, len(value))
+        used = [u[p] + r[i, o] for u, r in zip(used, resources)]
+        value = value[p] + logr[i, o]
+        keep = np.ones(len(value), dtype=bool)
+        for u, limit, rest_least, t in zip(used, limits, least, tol):
+            keep &= u + rest_least[i + 1] <= limit + t
+        if bound:
+            # both bounds hold, take the tighter one
+            upper = np.minimum(value + simple[i + 1],
+                               value + rest[i + 1] + sum(d * (limit - u) for d, u, limit in zip(duals, used, limits)))
+            keep &= upper >= incumbent - 1e-9
+        p, o, value = p[keep], o[keep], value[keep]
+        used = [u[keep] for u in used]
+        idx = nondominated(used[0], used[1] if W is not None else None, value)
+        p, o, value = p[idx], o[idx], value[idx]
+        used = [u[idx] for u in used]
+        parents.append(p.astype(np.int32))
+        options.append(o.astype(option))
+        counts.append(len(value))
+        if not len(value):
+            break
+    if not len(value) or value.max() < incumbent:
+        return (float(np.exp(incumbent)), fallback, counts) if fallback is not None else (0.0, None, counts)
+    # backtrack through the parent pointers
+    j = int(value.argmax())
+    best = float(np.exp(value[j]))
+    config = np.empty(n, dtype=np.int64)
+    for i in range(n - 1, -1, -1):
+        config[i] = options[i][j]
+        j = parents[i][j]
+    return best, config, counts
+
+
+# time the label DP against the dense grid (one resource, costs in cents) and the Gurobi MIP
+def benchmark(sizes=(20, 60, 100), seed=0):
+    from .mip import ip
+    print(f"{'n':>4} {'resources':>9} {'dense':>14} {'labels simple':>22} {'labels lp':>22} {'MIP':>8} {'reliability':>12}")
+    for n in sizes:
+        R, C, W = real_instance(n, seed=seed)
+        budget = round(1.2 * C[:, 1].sum(), 2)
+        capacity = round(1.2 * W[:, 1].sum(), 2)
+        for two in (False, True):
+            w, cap = (W, capacity) if two else (None, None)
+            cells = []
+            if two:
+                # a dense grid would need a cell per cent of budget and per hundredth of capacity
+                cells.append(f"{int(100 * budget) * int(100 * capacity):.1e} cells")
+            else:
+                tick = time.perf_counter()
+                dense, _ = optimize(R, np.rint(100 * C).astype(np.int64), int(round(100 * budget)))
+                cells.append(f"{time.perf_counter() - tick:.2f}s")
+            found = []
+            for bound in ("simple", "lp"):
+                tick = time.perf_counter()
+                best, config, counts = pareto(R, C, budget, w, cap, bound=bound)
+                cells.append(f"{time.perf_counter() - tick:.2f}s {max(counts):>7} max")
+                found.append(best)
+                assert (C[np.arange(n), config].sum() <= budget + 1e-6)
+            tick = time.perf_counter()
+            log_mip, _, _ = ip(R, C, budget, w, cap)
+            cells.append(f"{time.perf_counter() - tick:.2f}s")
+            assert abs(found[0] - found[1]) <= 1e-9
+            # the MIP stops at its default relative gap
+            assert np.exp(log_mip) <= found[0] * (1 + 1e-9) and np.exp(log_mip) >= found[0] * (1 - 1e-3)
+            if not two:
+                assert abs(dense - found[0]) <= 1e-9
+            print(f"{n:>4} {2 if two else 1:>9} {cells[0]:>14} {cells[1]:>22} {cells[2]:>22} {cells[3]:>8} {found[0]:>12.6f}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,71 @@
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+
+# parameters
+reliabilities = {
+    "A": [0, 0.5, 0.6, 0.8],
+    "B": [0, 0.6, 0.7, 0.8],
+    "C": [0, 0.7, 0.8, 0.9],
+    "D": [0, 0.5, 0.7, 0.9]
+}
+costs = {
+    "A": [0, 100, 200, 300],
+    "B": [0, 200, 400, 500],
+    "C": [0, 100, 300, 400],
+    "D": [0, 200, 300, 400]
+}
+
+# indices
+components = ["A", "B", "C", "D"]
+units = [1, 2, 3]
+
+
+# log-linear model on (components x options) arrays, column u meaning u units, options with
+# reliability 0 unavailable and left out of the model; an optional second resource W is limited by
+# capacity; relax=True solves the LP relaxation and also returns the resource duals
+def ip(R, C, budget, W=None, capacity=None, relax=False, verbose=False):
+    from scipy.sparse import csr_matrix
+    from ..gurobi import model
+    n, k = R.shape
+    # one variable per available option
+    rows, cols = np.nonzero(R > 0)
+    # ceate a model
+    m = model("System Reliability")
+    if verbose:
+        m.Params.OutputFlag = 1
+    # variables
+    x = m.addMVar(len(rows), vtype=GRB.CONTINUOUS if relax else GRB.BINARY, name="x")
+    # obj func P_A * P_B * P_C * P_D -> log P_A + log P_B + log P_C + log P_D
+    m.setObjective(np.log(R[rows, cols]) @ x, sense=GRB.MAXIMIZE)
+    # unit configuration constraints
+    choose = csr_matrix((np.ones(len(rows)), (rows, np.arange(len(rows)))), shape=(n, len(rows)))
+    m.addConstr(choose @ x == 1)
+    # budget constraint
+    resources = [m.addConstr(C[rows, cols] @ x <= budget)]
+    if W is not None:
+        resources.append(m.addConstr(W[rows, cols] @ x <= capacity))
+    # solves
+    m.optimize()
+    if m.Status != GRB.OPTIMAL:
+        return 0.0, None, None
+    X = np.zeros((n, k))
+    X[rows, cols] = x.X
+    config = X.argmax(axis=1)
+    duals = np.array([c.Pi for c in resources]) if relax else None
+    return m.ObjVal, config, duals
+
+
+if __name__ == "__main__":
+    R = np.array([reliabilities[c] for c in components])
+    C = np.array([costs[c] for c in components])
+    log_reliability, config, _ = ip(R, C, 1000, verbose=True)
+
+    # solution
+    print()
+    print("Solutions:")
+    obj_val = 1
+    for i, c in enumerate(components):
+        print("Component {}: {} units.".format(c, config[i]))
+        obj_val *= reliabilities[c][config[i]]
+    print("Maximum Reliability: {:.4f}".format(obj_val))
@@ -0,0 +1,43 @@
+import numpy as np
+
+from .gurobi import model, solve
+
+
+# goal rows A x = target + over - under on nonnegative x summing to total (no such row for None);
+# deviations are capped by over_limit and under_limit, 0 making a goal a hard constraint
+def _goals(name, A, target, total, over_limit, under_limit):
+    A = np.atleast_2d(np.asarray(A, dtype=np.float64))
+    k, n = A.shape
+    m = model(name)
+    x = m.addMVar(n, name="x")
+    over = m.addMVar(k, ub=np.inf if over_limit is None else np.asarray(over_limit, dtype=np.float64), name="over")
+    under = m.addMVar(k, ub=np.inf if under_limit is None else np.asarray(under_limit, dtype=np.float64),
+                      name="under")
+    m.addConstr(A @ x == np.asarray(target, dtype=np.float64) + over - under, name="goals")
+    if total is not None:
+        m.addConstr(x.sum() == total, name="total")
+    return m, x, over, under
+
+
+# weighted goal program: minimize over_weight @ over + under_weight @ under; a negative weight rewards
+# a deviation, as the blending lab does for less fat and cost and more protein
+def weighted(A, target, over_weight, under_weight, total=None, over_limit=None, under_limit=None):
+    from gurobipy import GRB
+    m, x, over, under = _goals("Weighted Goal", A, target, total, over_limit, under_limit)
+    m.setObjective(np.asarray(over_weight) @ over + np.asarray(under_weight) @ under, GRB.MINIMIZE)
+    objective = solve(m)
+    return {"objective": objective, "x": x.X, "over": over.X, "under": under.X}
+
+
+# pre-emptive goal program: levels of (over_weight, under_weight) in priority order, each minimized
+# while every level before it stays within tol of its optimum; returns the optimum of every level
+def preemptive(A, target, levels, total=None, over_limit=None, under_limit=None, tol=1e-9):
+    from gurobipy import GRB
+    m, x, over, under = _goals("Pre-Emptive Goal", A, target, total, over_limit, under_limit)
+    objectives = []
+    for i, (over_weight, under_weight) in enumerate(levels):
+        expr = np.asarray(over_weight) @ over + np.asarray(under_weight) @ under
+        m.setObjective(expr, GRB.MINIMIZE)
+        objectives.append(solve(m))
+        m.addConstr(expr <= objectives[-1] + tol * max(1.0, abs(objectives[-1])), name=f"level {i}")
+    return {"objectives": objectives, "x": x.X, "over": over.X, "under": under.X}
@@ -0,0 +1,25 @@
+# gurobipy is imported here on first use only, never at module level
+
+# Gurobi environment without the banner or solver log, started once per process
+def env():
+    import gurobipy as gp
+    if not hasattr(env, "cached"):
+        env.cached = gp.Env(empty=True)
+        env.cached.setParam("OutputFlag", 0)
+        env.cached.start()
+    return env.cached
+
+
+# a silent model in the shared environment
+def model(name):
+    import gurobipy as gp
+    return gp.Model(name, env=env())
+
+
+# solve m, raising unless it ends optimal
+def solve(m):
+    from gurobipy import GRB
+    m.optimize()
+    if m.Status != GRB.OPTIMAL:
+        raise RuntimeError(f"{m.ModelName}: no optimal solution, Gurobi status {m.Status}.")
+    return m.ObjVal
@@ -0,0 +1,70 @@
+import numpy as np
+import scipy.sparse as sp
+
+# discounted models are given as transitions, rows (s, a, t, p) of the probability of moving from s to t
+# under action slot a, and an S x A cost array with inf (or None in JSON) for slots that are not actions;
+# the solver modules load on first call
+
+
+# the MDP of transitions and cost
+def model(transitions, cost):
+    from .mdp import MDP
+    # None becomes nan on the way in
+    cost = np.array(cost, dtype=np.float64)
+    cost[np.isnan(cost)] = np.inf
+    S, A = cost.shape
+    s, a, t, p = np.asarray(transitions, dtype=np.float64).T
+    P = sp.csr_matrix((p, (s.astype(np.int64) * A + a.astype(np.int64), t.astype(np.int64))), shape=(S * A, S))
+    return MDP(P, cost.ravel(), np.isfinite(cost))
+
+
+# optimal discounted values and policy by policy iteration ("policy"), value iteration ("value") or
+# the Gurobi LP ("lp")
+def solve(mdp, beta, method="policy", eps=1e-6):
+    if method == "policy":
+        from .policy import policy_iteration
+        V, pi, it = policy_iteration(mdp, beta)
+    elif method == "value":
+        from .value import value_iteration
+        V, pi, it = value_iteration(mdp, beta, eps)
+    elif method == "lp":
+        from .lp import primal_lp
+        V, pi, _ = primal_lp(mdp, beta)
+        it = 1
+    else:
+        raise ValueError(f"Unknown method {method!r}, expected 'policy', 'value' or 'lp'.")
+    return {"values": V, "policy": pi, "iterations": it}
+
+
+# optimal values and policy of the model given as transitions and cost
+def discounted(transitions, cost, beta, method="policy", eps=1e-6):
+    return solve(model(transitions, cost), beta, method, eps)
+
+
+# the inventory model of mdp.inventory, generated from its parameters
+def inventory(capacity, beta=0.95, method="policy", eps=1e-6, **params):
+    from . import mdp as models
+    return solve(models.inventory(capacity, **params), beta, method, eps)
+
+
+# average-cost model from the lab dictionaries (states, actions per state, P[(s, a)] = {t: p},
+# cost[(s, a)]): gain, bias and policy by policy iteration ("policy"), relative value iteration
+# ("relative") or the occupation-measure LP ("lp", gain and occupation measure only)
+def average(states, actions, P, cost, method="policy"):
+    from . import avg
+    if method == "lp":
+        gain, pi, _ = avg.occupation_lp(states, actions, P, cost)
+        return {"gain": gain, "occupation": pi}
+    if method == "policy":
+        gain, h, pi, it = avg.policy_iteration(states, actions, P, cost)
+    elif method == "relative":
+        gain, h, pi, it = avg.relative_value_iteration(states, actions, P, cost)
+    else:
+        raise ValueError(f"Unknown method {method!r}, expected 'policy', 'relative' or 'lp'.")
+    return {"gain": gain, "bias": h, "policy": [pi[s] for s in states], "iterations": it}
+
+
+# the controlled queue of avg.queue with N places
+def queue(N, method="policy", **params):
+    from . import avg
+    return average(*avg.queue(N, **params), method=method)
@@ -0,0 +1,222 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+# define parameters
+states = [0, 1, 2, 3] # states
+
+# define allowed actions per state
+actions = {
+    0: [2, 3, 4],
+    1: [1, 2, 3],
+    2: [0, 1, 2],
+    3: [0, 1]
+}
+
+# define transition probabilities P(t | s, a)
+P = {
+    # s = 0
+    (0, 2): {0: 0.5, 1: 0.5},
+    (0, 3): {1: 0.5, 2: 0.5},
+    (0, 4): {2: 0.5, 3: 0.5},
+    # s = 1
+    (1, 1): {0: 0.5, 1: 0.5},
+    (1, 2): {1: 0.5, 2: 0.5},
+    (1, 3): {2: 0.5, 3: 0.5},
+    # s = 2
+    (2, 0): {0: 0.5, 1: 0.5},
+    (2, 1): {1: 0.5, 2: 0.5},
+    (2, 2): {2: 0.5, 3: 0.5},
+    # s = 3
+    (3, 0): {1: 0.5, 2: 0.5},
+    (3, 1): {2: 0.5, 3: 0.5}
+}
+
+# define the cost with s-a pairs
+cost = {
+    # s = 0
+    (0, 2): 6,
+    (0, 3): 7,
+    (0, 4): 8,
+    # s = 1
+    (1, 1): 6,
+    (1, 2): 7,
+    (1, 3): 8,
+    # s = 2
+    (2, 0): 2,
+    (2, 1): 7,
+    (2, 2): 8,
+    # s = 3
+    (3, 0): 3,
+    (3, 1): 8
+}
+
+
+# the dictionaries as sparse arrays over (state, action) pairs, grouped by state in actions order:
+# transition matrix T (pairs x states), costs, state index of each pair, action label of each pair
+# and ptr, the pairs of state i being ptr[i]:ptr[i + 1]
+def sparse_model(states, actions, P, cost):
+    index = {s: i for i, s in enumerate(states)}
+    pair_state, labels, c, rows, cols, data = [], [], [], [], [], []
+    for s in states:
+        for a in actions[s]:
+            row = len(labels)
+            pair_state.append(index[s])
+            labels.append(a)
+            c.append(cost[s, a])
+            for t, p in P.get((s, a), {}).items():
+                rows.append(row)
+                cols.append(index[t])
+                data.append(p)
+    T = sp.csr_matrix((data, (rows, cols)), shape=(len(labels), len(states)))
+    pair_state = np.array(pair_state)
+    ptr = np.concatenate([[0], np.cumsum(np.bincount(pair_state, minlength=len(states)))])
+    return T, np.array(c, dtype=np.float64), pair_state, labels, ptr
+
+
+# minimum of q over each state's pairs and the first pair attaining it
+def state_min(q, pair_state, ptr):
+    low = np.minimum.reduceat(q, ptr[:-1])
+    first = np.where(q <= low[pair_state], -np.arange(len(q)), -len(q))
+    return low, -np.maximum.reduceat(first, ptr[:-1])
+
+
+# occupation-measure LP: min sum c pi s.t. flow balance (E - T^T) pi = 0 and sum pi = 1, where
+# E sums the pairs of each state; the balance rows go in with one addMConstr
+def occupation_lp(states, actions, P, cost, verbose=False):
+    import gurobipy as gp
+    from gurobipy import GRB
+    T, c, pair_state, labels, ptr = sparse_model(states, actions, P, cost)
+    E = sp.csr_matrix((np.ones(len(c)), (pair_state, np.arange(len(c)))), shape=(len(states), len(c)))
+    # ceate a model
+    m = gp.Model("MDP")
+    m.Params.OutputFlag = int(verbose)
+    # varibles
+    pi = m.addMVar(len(c), lb=0, name="steady-state distribution")
+    # obj func: minimize total expected cost
+    m.setObjective(c @ pi, GRB.MINIMIZE)
+    # constraint
+    m.addMConstr((E - T.T).tocsr(), pi, "=", np.zeros(len(states)), name="flow balance")
+    m.addConstr(pi.sum() == 1, name="normalization")
+    # solve
+    m.optimize()
+    return m.ObjVal, pi.X, m
+
+
+# relative value iteration on the aperiodic transform tau P + (1 - tau) I, which keeps the gain and
+# scales the bias by 1 / tau; the gain lies between the min and max of T h - h, iteration stops when
+# they are within eps; returns the gain, the bias (zero at ref), the policy labels and the sweeps
+def relative_value_iteration(states, actions, P, cost, tau=0.5, eps=1e-8, ref=0, max_iter=1000000):
+    T, c, pair_state, labels, ptr = sparse_model(states, actions, P, cost)
+    h = np.zeros(len(states))
+    for it in range(1, max_iter + 1):
+        q = c + tau * (T @ h) + (1 - tau) * h[pair_state]
+        Th, best = state_min(q, pair_state, ptr)
+        diff = Th - h
+        low, high = diff.min(), diff.max()
+        h = Th - Th[ref]
+        if high - low <= eps:
+            break
+    policy = {s: labels[k] for s, k in zip(states, best)}
+    return (low + high) / 2, tau * h, policy, it
+
+
+# average-cost policy iteration for unichain models: evaluation solves g + h = c_pi + P_pi h with
+# h[ref] = 0 by sparse LU, the column of h[ref] carrying g; improvement keeps the current action
+# unless another is strictly better; returns the gain, the bias, the policy labels and the iterations
+def policy_iteration(states, actions, P, cost, ref=0, max_iter=10000):
+    T, c, pair_state, labels, ptr = sparse_model(states, actions, P, cost)
+    n = len(states)
+    chosen = ptr[:-1].copy()
+    for it in range(1, max_iter + 1):
+        A = (sp.identity(n, format="csr") - T[chosen]).tolil()
+        A[:, ref] = np.ones((n, 1))
+        x = splu(A.tocsc()).solve(c[chosen])
+        gain, h = x[ref], x.copy()
+        h[ref] = 0.0
+        q = c + T @ h
+        low, best = state_min(q, pair_state, ptr)
+        keep = q[chosen] <= low + 1e-9 * (1 + np.abs(low))
+        new = np.where(keep, chosen, best)
+        if (new == chosen).all():
+            break
+        chosen = new
+    policy = {s: labels[k] for s, k in zip(states, chosen)}
+    return gain, h, policy, it
+
+
+# admission-free service-rate control of a queue with room for N customers, uniformized: an arrival
+# with probability arrival, a departure with probability rates[a] under service level a; holding cost
+# per customer plus the cost of the service level
+def queue(N, arrival=0.3, rates=(0.2, 0.35, 0.5), level_cost=(0.0, 2.0, 5.0), holding=1.0):
+    states = list(range(N + 1))
+    actions = {s: list(range(len(rates))) for s in states}
+    P, cost = {}, {}
+    for s in states:
+        for a, mu in enumerate(rates):
+            up = arrival if s < N else 0.0
+            down = mu if s > 0 else 0.0
+            moves = {s: 1.0 - up - down}
+            if up:
+                moves[s + 1] = up
+            if down:
+                moves[s - 1] = down
+            P[s, a] = moves
+            cost[s, a] = holding * s + level_cost[a]
+    return states, actions, P, cost
+
+
+# the original dictionary-by-dictionary flow balance, kept to time against the sparse assembly
+def dict_lp(states, actions, P, cost):
+    import gurobipy as gp
+    from gurobipy import GRB
+    m = gp.Model("MDP")
+    pi = m.addVars(cost, lb=0, name="steady-state distribution")
+    m.setObjective(gp.quicksum(cost[s_a] * pi[s_a] for s_a in cost), GRB.MINIMIZE)
+    m.addConstrs((gp.quicksum(pi[t, a] for a in actions[t]) ==
+                  gp.quicksum(P.get((s, a), {}).get(t, 0) * pi[s, a] for s in states for a in actions[s])
+                 for t in states), name="flow balance")
+    m.addConstr(pi.sum() == 1, name="normalization")
+    m.update()
+    return m
+
+
+if __name__ == "__main__":
+    import gurobipy as gp
+    # solve
+    objective, pi, _ = occupation_lp(states, actions, P, cost)
+    # Output results
+    print("\nOptimal steady-state policy (pi_sa > 0):")
+    for k, (s, a) in enumerate((s, a) for s in states for a in actions[s]):
+        if pi[k] > 1e-6:
+            print(f"State {s}, Action {a} -> π = {pi[k]:.4f}")
+    gain, h, policy, it = relative_value_iteration(states, actions, P, cost)
+    print(f"Relative value iteration: gain {gain:.4f} after {it} sweeps, policy {policy}")
+    gain, h, policy, it = policy_iteration(states, actions, P, cost)
+    print(f"Policy iteration: gain {gain:.4f} after {it} iterations, policy {policy}")
+    assert abs(gain - objective) <= 1e-6
+    print()
+    # flow-balance assembly: dictionary sums against the sparse matrix
+    model = queue(300)
+    tick = time.perf_counter()
+    dict_lp(*model)
+    print(f"Queue with 301 states: dictionary LP assembled in {time.perf_counter() - tick:.2f}s")
+    tick = time.perf_counter()
+    T, c, pair_state, labels, ptr = sparse_model(*model)
+    E = sp.csr_matrix((np.ones(len(c)), (pair_state, np.arange(len(c)))), shape=(T.shape[1], len(c)))
+    m = gp.Model("MDP")
+    pi = m.addMVar(len(c), lb=0)
+    m.addMConstr((E - T.T).tocsr(), pi, "=", np.zeros(T.shape[1]))
+    m.update()
+    print(f"Queue with 301 states: sparse LP assembled in {time.perf_counter() - tick:.3f}s")
+    # LP-free solvers; relative value iteration needs about as many sweeps as the chain takes to
+    # cross the state space, policy iteration a handful of sparse solves
+    for N, methods in ((1000, (("relative value iteration", relative_value_iteration), ("policy iteration", policy_iteration))),
+                       (100000, (("policy iteration", policy_iteration),))):
+        model = queue(N)
+        for name, solve in methods:
+            tick = time.perf_counter()
+            gain, h, policy, it = solve(*model)
+            print(f"Queue with {N + 1} states, {name}: gain {gain:.4f}, {it} iterations, {time.perf_counter() - tick:.2f}s")
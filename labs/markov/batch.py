@@ -0,0 +1,177 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import splu
+
+from .mdp import MDP, inventory
+from .value import value_iteration
+
+
+# K settings as a discount vector and an (S*A x K) cost array; a single discount or cost vector is
+# shared by all settings, unused action slots cost inf in every column
+def settings(mdp, betas, costs=None):
+    betas = np.atleast_1d(np.asarray(betas, dtype=np.float64))
+    costs = mdp.cost if costs is None else np.asarray(costs, dtype=np.float64)
+    if costs.ndim == 1:
+        costs = costs[:, None]
+    K = max(len(betas), costs.shape[1])
+    betas = np.broadcast_to(betas, (K,)).copy()
+    costs = np.where(mdp.mask.ravel()[:, None], np.broadcast_to(costs, (mdp.S * mdp.A, K)), np.inf)
+    return betas, costs
+
+
+# greedy policies of all settings from one mat-mat product, S x K
+def greedy(mdp, V, betas, costs):
+    Q = (costs + (mdp.P @ V) * betas).reshape(mdp.S, mdp.A, -1)
+    return Q.argmin(axis=1)
+
+
+# value iteration for K settings at once: V is S x K and each sweep is one sparse mat-mat product
+# over the settings still running; a setting stops when its MacQueen bounds are within eps and
+# moves to their midpoint; returns V, the policies, the sweeps per setting and whether each converged
+def batch_value_iteration(mdp, betas, costs=None, eps=1e-6, V=None, max_iter=100000):
+    betas, costs = settings(mdp, betas, costs)
+    K = len(betas)
+    V = np.zeros((mdp.S, K)) if V is None else np.array(V, dtype=np.float64)
+    factor = betas / (1 - betas)
+    sweeps = np.zeros(K, dtype=np.int64)
+    converged = np.zeros(K, dtype=bool)
+    # working copies of the running settings, repacked only when some finish
+    active = np.arange(K)
+    C, W, b = costs, V.copy(), betas
+    for it in range(1, max_iter + 1):
+        Q = mdp.P @ W
+        Q *= b
+        Q += C
+        W_new = Q.reshape(mdp.S, mdp.A, len(active)).min(axis=1)
+        diff = W_new - W
+        low, high = diff.min(axis=0), diff.max(axis=0)
+        W = W_new
+        sweeps[active] = it
+        done = factor[active] * (high - low) <= eps
+        if done.any():
+            finished = active[done]
+            V[:, finished] = W[:, done] + factor[finished] * (low[done] + high[done]) / 2
+            converged[finished] = True
+            active, C, W, b = active[~done], C[:, ~done], W[:, ~done], b[~done]
+        if not len(active):
+            break
+    V[:, active] = W
+    return V, greedy(mdp, V, betas, costs), sweeps, converged
+
+
+# policy iteration for K settings: one sparse LU evaluation per setting still changing, then one
+# mat-mat product improves all of them; a setting stops when its policy is stable;
+# returns V, the policies, the iterations per setting and whether each converged
+def batch_policy_iteration(mdp, betas, costs=None, V=None, policy=None, max_iter=1000):
+    betas, costs = settings(mdp, betas, costs)
+    K = len(betas)
+    V = np.zeros((mdp.S, K)) if V is None else np.array(V, dtype=np.float64)
+    policy = greedy(mdp, V, betas, costs) if policy is None else np.array(policy)
+    iterations = np.zeros(K, dtype=np.int64)
+    converged = np.zeros(K, dtype=bool)
+    active = np.arange(K)
+    identity = sp.identity(mdp.S, format="csc")
+    base = np.arange(mdp.S) * mdp.A
+    for it in range(1, max_iter + 1):
+        for k in active:
+            rows = base + policy[:, k]
+            V[:, k] = splu((identity - betas[k] * mdp.P[rows]).tocsc()).solve(costs[rows, k])
+        Q = (costs[:, active] + (mdp.P @ V[:, active]) * betas[active]).reshape(mdp.S, mdp.A, len(active))
+        best = Q.argmin(axis=1)
+        # keep the current action unless another is strictly better
+        current = np.take_along_axis(Q, policy[:, None, active], axis=1)[:, 0]
+        low = np.take_along_axis(Q, best[:, None], axis=1)[:, 0]
+        new = np.where(current <= low + 1e-9 * (1 + np.abs(low)), policy[:, active], best)
+        iterations[active] = it
+        stable = (new == policy[:, active]).all(axis=0)
+        policy[:, active] = new
+        converged[active[stable]] = True
+        active = active[~stable]
+        if not len(active):
+            break
+    return V, policy, iterations, converged
+
+
+# bound on |V*_i - V*_j| from the parameters alone: |c_i - c_j| / (1 - beta_i)
+# + |beta_i - beta_j| |c_j| / ((1 - beta_i)(1 - beta_j)), K x K, row i the setting to start
+def distances(mdp, betas, costs):
+    valid = mdp.mask.ravel()
+    # cost gaps between distinct cost vectors only, sweeps usually share a few
+    distinct, which = {}, []
+    for k in range(costs.shape[1]):
+        which.append(distinct.setdefault(costs[valid, k].tobytes(), len(distinct)))
+    c = costs[valid][:, [list(which).index(u) for u in range(len(distinct))]]
+    gap = np.array([np.abs(c - c[:, [j]]).max(axis=0) for j in range(c.shape[1])])
+    gap = gap[np.ix_(which, which)]
+    size = np.abs(c).max(axis=0)[which]
+    return (gap / (1 - betas)[:, None]
+            + np.abs(betas[:, None] - betas[None, :]) * size[None, :] / np.outer(1 - betas, 1 - betas))
+
+
+# solve a parameter sweep with the batched solvers; with warm=True a spread-out subset of seed
+# settings (farthest-point sampling under the distance bound) is solved first and every other setting
+# starts from the values of its nearest seed; returns a dict with V, policy, iterations, converged and
+# start, the seed each setting was started from (-1 for a cold start)
+def sweep(mdp, betas, costs=None, method="value", warm=False, seeds=None, **kwargs):
+    betas, costs = settings(mdp, betas, costs)
+    K = len(betas)
+    solve = batch_value_iteration if method == "value" else batch_policy_iteration
+    if not warm or K < 3:
+        V, policy, iterations, converged = solve(mdp, betas, costs, **kwargs)
+        return {"V": V, "policy": policy, "iterations": iterations, "converged": converged,
+                "start": np.full(K, -1)}
+    D = distances(mdp, betas, costs)
+    seeds = seeds or int(np.ceil(np.sqrt(K)))
+    # farthest-point sampling from the setting with the largest discount
+    chosen = [int(betas.argmax())]
+    while len(chosen) < seeds:
+        chosen.append(int(D[:, chosen].min(axis=1).argmax()))
+    chosen = np.array(chosen)
+    rest = np.setdiff1d(np.arange(K), chosen)
+    V = np.zeros((mdp.S, K))
+    policy = np.zeros((mdp.S, K), dtype=np.int64)
+    iterations = np.zeros(K, dtype=np.int64)
+    converged = np.zeros(K, dtype=bool)
+    start = np.full(K, -1)
+    V[:, chosen], policy[:, chosen], iterations[chosen], converged[chosen] = solve(
+        mdp, betas[chosen], costs[:, chosen], **kwargs)
+    start[rest] = chosen[D[np.ix_(rest, chosen)].argmin(axis=1)]
+    V[:, rest], policy[:, rest], iterations[rest], converged[rest] = solve(
+        mdp, betas[rest], costs[:, rest], V=V[:, start[rest]], **kwargs)
+    return {"V": V, "policy": policy, "iterations": iterations, "converged": converged, "start": start}
+
+
+if __name__ == "__main__":
+    # sensitivity study: 20 discount factors times 3 shortage penalties on one inventory structure
+    mdp = inventory(500, max_order=150)
+    penalties = (5.0, 10.0, 20.0)
+    discounts = np.linspace(0.85, 0.99, 20)
+    betas = np.tile(discounts, len(penalties))
+    costs = np.repeat(np.column_stack([inventory(500, max_order=150, shortage=p).cost for p in penalties]),
+                      len(discounts), axis=1)
+    K = len(betas)
+    print(f"Inventory MDP with {mdp.pairs} state-action pairs, {K} settings")
+    tick = time.perf_counter()
+    total = 0
+    reference = np.zeros((mdp.S, K))
+    for k in range(K):
+        reference[:, k], _, it = value_iteration(MDP(mdp.P, costs[:, k], mdp.mask), betas[k], eps=1e-6)
+        total += it
+    print(f"{'one at a time':>28}: {total:>6} sweeps, {time.perf_counter() - tick:6.2f}s")
+    for label, method, warm in (("batched value iteration", "value", False),
+                                ("batched, warm-started", "value", True),
+                                ("batched policy iteration", "policy", False),
+                                ("batched PI, warm-started", "policy", True)):
+        tick = time.perf_counter()
+        result = sweep(mdp, betas, costs, method=method, warm=warm)
+        elapsed = time.perf_counter() - tick
+        assert result["converged"].all()
+        unit = "sweeps" if method == "value" else "iterations"
+        print(f"{label:>28}: {result['iterations'].sum():>6} {unit}, {elapsed:6.2f}s, "
+              f"max error {np.abs(result['V'] - reference).max():.1e}")
+    # order-up-to levels rise with the discount factor and the shortage penalty
+    levels = (np.arange(mdp.S)[:, None] + result["policy"])[0].reshape(len(penalties), len(discounts))
+    for p, row in zip(penalties, levels):
+        print(f"shortage {p:>4}: order-up-to level from empty stock", row.tolist())
@@ -0,0 +1,198 @@
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import scipy.sparse as sp
+
+from .mdp import inventory, inventory_rows
+from . import value
+
+# on-disk layout: one raw array file per array plus meta.json; the files are appended block by block
+# while writing, so a model never has to fit in memory, and opened with np.memmap for reading
+arrays = {"indptr": np.int64, "indices": np.int32, "data": np.float64, "cost": np.float64, "mask": np.bool_}
+
+
+# write an MDP given as consecutive blocks of states, each a (P rows, costs, mask rows) triple in the
+# layout of MDP; returns the stored model opened with DiskMDP
+def write(out, S, A, blocks, chunk=1 << 22):
+    os.makedirs(out, exist_ok=True)
+    files = {name: open(os.path.join(out, f"{name}.bin"), "wb") for name in arrays}
+    nnz, states = 0, 0
+    try:
+        np.zeros(1, dtype=np.int64).tofile(files["indptr"])
+        for P, cost, mask in blocks:
+            P = sp.csr_matrix(P, dtype=np.float64)
+            mask = np.asarray(mask, dtype=bool)
+            if P.shape != (mask.size, S) or mask.shape[1] != A:
+                raise ValueError(f"Block of states from {states} has P of shape {P.shape} "
+                                 f"and mask of shape {mask.shape}.")
+            valid = mask.ravel()
+            rows = np.asarray(P.sum(axis=1)).ravel()
+            if np.abs(rows[valid] - 1).max(initial=0.0) > 1e-9 or rows[~valid].any():
+                raise ValueError("Rows of P must sum to one for actions and be empty elsewhere.")
+            (P.indptr[1:] + nnz).astype(np.int64).tofile(files["indptr"])
+            P.indices.astype(np.int32).tofile(files["indices"])
+            P.data.tofile(files["data"])
+            np.where(valid, np.asarray(cost, dtype=np.float64), np.inf).tofile(files["cost"])
+            valid.tofile(files["mask"])
+            nnz += P.nnz
+            states += len(mask)
+    finally:
+        for f in files.values():
+            f.close()
+    if states != S:
+        raise ValueError(f"Blocks cover {states} states, expected {S}.")
+    with open(os.path.join(out, "meta.json"), "w") as f:
+        json.dump({"S": int(S), "A": int(A), "nnz": int(nnz)}, f)
+    return DiskMDP(out, chunk)
+
+
+# write an in-memory MDP, states at a time
+def save(mdp, out, states=1 << 16, chunk=1 << 22):
+    A = mdp.A
+    blocks = ((mdp.P[s * A:min(s + states, mdp.S) * A], mdp.cost[s * A:min(s + states, mdp.S) * A],
+               mdp.mask[s:s + states]) for s in range(0, mdp.S, states))
+    return write(out, mdp.S, A, blocks, chunk)
+
+
+# the inventory model generated straight to disk, states at a time
+def write_inventory(out, capacity, max_order=None, states=1 << 12, chunk=1 << 22, **params):
+    A = (capacity if max_order is None else max_order) + 1
+    blocks = (inventory_rows(capacity, s, min(s + states, capacity + 1), max_order, **params)
+              for s in range(0, capacity + 1, states))
+    return write(out, capacity + 1, A, blocks, chunk)
+
+
+# MDP whose transition matrix stays on disk: backup() streams the CSR rows in blocks of at most chunk
+# nonzeros (whole states, at least one per block) and only the costs and V are held in memory, so
+# value.value_iteration runs on it unchanged; unused action slots cost inf as in MDP
+class DiskMDP:
+
+    def __init__(self, path, chunk=1 << 22):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        self.path = path
+        self.S, self.A, self.nnz = meta["S"], meta["A"], meta["nnz"]
+        self.open()
+        self.cost = np.fromfile(os.path.join(path, "cost.bin"), dtype=np.float64)
+        # offset of every state's first row, to cut blocks on state boundaries
+        self.state_ptr = np.array(self.indptr[::self.A])
+        self.chunk = chunk
+
+    # map the arrays of P and the mask
+    def open(self):
+        sizes = {"indptr": self.S * self.A + 1, "indices": self.nnz, "data": self.nnz, "mask": self.S * self.A}
+        for name, size in sizes.items():
+            setattr(self, name, np.memmap(os.path.join(self.path, f"{name}.bin"), dtype=arrays[name], mode="r",
+                                          shape=(size,)))
+
+    # block boundaries for the current chunk size, as a list of states
+    @property
+    def chunk(self):
+        return self._chunk
+
+    @chunk.setter
+    def chunk(self, chunk):
+        self._chunk = int(chunk)
+        cuts = [0]
+        while cuts[-1] < self.S:
+            last = np.searchsorted(self.state_ptr, self.state_ptr[cuts[-1]] + self._chunk, side="right") - 1
+            cuts.append(int(min(max(last, cuts[-1] + 1), self.S)))
+        self.cuts = cuts
+
+    # rows of states first..last - 1 read from disk into a CSR matrix
+    def block(self, first, last):
+        ptr = np.array(self.indptr[first * self.A:last * self.A + 1])
+        lo, hi = ptr[0], ptr[-1]
+        return sp.csr_matrix((np.array(self.data[lo:hi]), np.array(self.indices[lo:hi]), ptr - lo),
+                             shape=((last - first) * self.A, self.S))
+
+    # one Bellman backup, block by block: minimal Q-value and its action slot per state
+    def backup(self, V, beta):
+        TV = np.empty(self.S)
+        policy = np.empty(self.S, dtype=np.int64)
+        A = self.A
+        for first, last in zip(self.cuts[:-1], self.cuts[1:]):
+            Q = (self.cost[first * A:last * A] + beta * (self.block(first, last) @ V)).reshape(last - first, A)
+            policy[first:last] = Q.argmin(axis=1)
+            TV[first:last] = Q[np.arange(last - first), policy[first:last]]
+        return TV, policy
+
+    # bytes of P read by one backup
+    @property
+    def bytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
+
+    # drop the files from the page cache, so the next pass reads from the device; pages still mapped
+    # stay cached, so the arrays are unmapped first and mapped again afterwards. only POSIX systems
+    # take the hint, elsewhere (Windows, macOS) this does nothing
+    def evict(self):
+        if not hasattr(os, "posix_fadvise"):
+            return
+        self.indptr = self.indices = self.data = self.mask = None
+        for name in arrays:
+            fd = os.open(os.path.join(self.path, f"{name}.bin"), os.O_RDONLY)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            os.close(fd)
+        self.open()
+
+
+# value iteration with P streamed from disk each sweep, chunk nonzeros of it in memory at a time;
+# same stopping rule and results as value.value_iteration
+def value_iteration(disk, beta, eps=1e-6, V=None, chunk=None, max_iter=100000, bounds=True):
+    if chunk is not None:
+        disk.chunk = chunk
+    return value.value_iteration(disk, beta, eps, V, max_iter, bounds)
+
+
+# read throughput of one backup per chunk size, from the device (page cache dropped first) and from
+# the page cache, against the same backup on the matrix held in memory
+def benchmark(disk, mdp=None, chunks=(1 << 16, 1 << 20, 1 << 24), beta=0.95):
+    V = np.zeros(disk.S)
+    size = disk.bytes / 1e6
+    print(f"{'chunk (nonzeros)':>18} {'blocks':>7} {'cold MB/s':>10} {'warm MB/s':>10} {'warm sweep':>11}")
+    for chunk in chunks:
+        disk.chunk = chunk
+        disk.evict()
+        tick = time.perf_counter()
+        disk.backup(V, beta)
+        cold = time.perf_counter() - tick
+        tick = time.perf_counter()
+        disk.backup(V, beta)
+        warm = time.perf_counter() - tick
+        print(f"{chunk:>18} {len(disk.cuts) - 1:>7} {size / cold:>10.0f} {size / warm:>10.0f} {warm:>10.3f}s")
+    if mdp is not None:
+        tick = time.perf_counter()
+        mdp.backup(V, beta)
+        print(f"{'in memory':>18} {'':>7} {'':>10} {'':>10} {time.perf_counter() - tick:>10.3f}s")
+
+
+if __name__ == "__main__":
+    out = os.path.join(tempfile.gettempdir(), "inventory-mdp")
+    capacity, max_order = 5000, 300
+    tick = time.perf_counter()
+    disk = write_inventory(out, capacity, max_order=max_order)
+    print(f"Inventory MDP with {disk.S} states and {disk.nnz} transitions written in "
+          f"{time.perf_counter() - tick:.2f}s, {disk.bytes / 1e6:.0f} MB of P on disk")
+    # value iteration with only V, the costs and one block of P in memory
+    tracemalloc.start()
+    tick = time.perf_counter()
+    V, policy, it = value_iteration(disk, 0.95, eps=1e-6, chunk=1 << 20)
+    elapsed = time.perf_counter() - tick
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"Out of core: {it} sweeps in {elapsed:.2f}s, peak heap {peak / 1e6:.0f} MB")
+    mdp = inventory(capacity, max_order=max_order)
+    tracemalloc.start()
+    tick = time.perf_counter()
+    reference, _, it = value.value_iteration(mdp, 0.95, eps=1e-6)
+    elapsed = time.perf_counter() - tick
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"In memory:   {it} sweeps in {elapsed:.2f}s, peak heap {peak / 1e6:.0f} MB besides the model, "
+          f"max difference {np.abs(V - reference).max():.1e}")
+    print()
+    benchmark(disk, mdp)
@@ -0,0 +1,157 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from .mdp import MDP, grid, inventory
+from .policy import policy_iteration
+from .value import prioritized_sweeping, value_iteration
+
+
+# a copy of mdp with some costs and transition rows replaced, given like the lab dictionaries:
+# cost {(s, a): c} and rows {(s, a): {t: p}} over state indices and action slots; returns the new
+# model and the states whose Bellman equation changed
+def apply(mdp, cost=None, rows=None):
+    cost, rows = cost or {}, rows or {}
+    for s, a in list(cost) + list(rows):
+        if not mdp.mask[s, a]:
+            raise ValueError(f"Slot {a} is not an action of state {s}.")
+    c = mdp.cost.copy()
+    for (s, a), value in cost.items():
+        c[s * mdp.A + a] = value
+    P = mdp.P
+    if rows:
+        changed = np.array([s * mdp.A + a for s, a in rows])
+        P = P.tocoo()
+        keep = ~np.isin(P.row, changed)
+        new = [(s * mdp.A + a, t, p) for (s, a), row in rows.items() for t, p in row.items()]
+        r, t, p = (np.array(x) for x in zip(*new))
+        P = sp.csr_matrix((np.r_[P.data[keep], p], (np.r_[P.row[keep], r], np.r_[P.col[keep], t])), shape=P.shape)
+    seeds = np.unique([s for s, _ in list(cost) + list(rows)]).astype(np.int64)
+    return MDP(P, c, mdp.mask, mdp.states, mdp.labels), seeds
+
+
+# states that can reach seeds in at most depth steps under some action, by breadth-first search over
+# the predecessor lists of MDP.predecessors
+def reach(ptr, source, seeds, depth=None):
+    seen = np.zeros(len(ptr) - 1, dtype=bool)
+    seen[seeds] = True
+    frontier, d = np.asarray(seeds), 0
+    while len(frontier) and (depth is None or d < depth):
+        starts, counts = ptr[frontier], ptr[frontier + 1] - ptr[frontier]
+        offsets = np.repeat(starts - np.r_[0, np.cumsum(counts)[:-1]], counts)
+        step = np.unique(source[offsets + np.arange(counts.sum())])
+        frontier = step[~seen[step]]
+        seen[frontier] = True
+        d += 1
+    return np.flatnonzero(seen)
+
+
+# Bellman residuals |TV - V| of the states X alone, one backup each
+def residuals(mdp, V, beta, X):
+    rows = (X[:, None] * mdp.A + np.arange(mdp.A)).ravel()
+    Q = (mdp.cost[rows] + beta * (mdp.P[rows] @ V)).reshape(len(X), mdp.A)
+    return np.abs(Q.min(axis=1) - V[X])
+
+
+# the MDP on the states R with every other state frozen at its value in V: moves out of R go to one
+# absorbing cost-free state, appended last, and their expected value is added to the cost
+def restrict(mdp, R, V, beta):
+    A, n = mdp.A, len(R)
+    rows = (R[:, None] * A + np.arange(A)).ravel()
+    sub = mdp.P[rows]
+    outside = np.ones(mdp.S, dtype=bool)
+    outside[R] = False
+    cost = mdp.cost[rows] + beta * (sub @ np.where(outside, V, 0.0))
+    P = sp.hstack([sub[:, R], sub @ outside.astype(np.float64)[:, None]])
+    P = sp.vstack([P, sp.csr_matrix(([1.0], ([0], [n])), shape=(A, n + 1))]).tocsr()
+    mask = np.vstack([mdp.mask[R], np.eye(1, A, dtype=bool)])
+    return MDP(P, np.r_[cost, np.zeros(A)], mask)
+
+
+# a discounted MDP kept solved across small changes: the cold solve records V, the policy and the
+# largest Bellman residual |TV - V| of the stored values; update() applies a delta and re-solves
+# only the states whose optimal values can move by more than eps, and reports the work saved.
+# Re-solves run value iteration ("value"), prioritized sweeping ("sweeping", for local changes on models
+# with few predecessors per state) or policy iteration ("policy") from the stored solution; work is
+# counted in state backups, for policy iteration in states evaluated per iteration, and every pass over
+# all of P (building the changed model, its predecessor lists) counts as a backup of every state
+class Incremental:
+
+    def __init__(self, mdp, beta, eps=1e-6, method="value"):
+        if method not in ("value", "sweeping", "policy"):
+            raise ValueError(f"Unknown method {method!r}, expected 'value', 'sweeping' or 'policy'.")
+        self.beta, self.eps, self.method = beta, eps, method
+        self.mdp = mdp
+        tick = time.perf_counter()
+        if method != "policy":
+            self.V, self.policy, it = value_iteration(mdp, beta, eps)
+        else:
+            self.V, self.policy, it = policy_iteration(mdp, beta)
+        self.cold = {"work": it * mdp.S, "time": time.perf_counter() - tick}
+        TV, _ = mdp.backup(self.V, beta)
+        self._residuals = np.abs(TV - self.V)
+        self.residual = self._residuals.max()
+        self._predecessors = mdp.predecessors()
+
+    # apply a delta (see apply) and re-solve; only states that can reach a changed state within the
+    # depth where beta^d times the bound |V*_new - V_old| <= max residual / (1 - beta) drops below eps
+    # are re-solved, every other state is frozen; returns a report of the work against the cold solve
+    def update(self, cost=None, rows=None):
+        tick = time.perf_counter()
+        beta = self.beta
+        self.mdp, seeds = apply(self.mdp, cost, rows)
+        # apply() checks every row of the new model; new rows also rebuild P and the predecessor lists
+        passes = 1
+        if rows:
+            self._predecessors = self.mdp.predecessors()
+            passes += 2
+        change = residuals(self.mdp, self.V, beta, seeds).max(initial=0.0)
+        bound = max(change, self.residual) / (1 - beta)
+        depth = int(np.ceil(np.log(self.eps / bound) / np.log(beta))) if bound > self.eps else 0
+        ptr, source, _ = self._predecessors
+        R = reach(ptr, source, seeds, max(depth, 1))
+        sub = restrict(self.mdp, R, self.V, beta)
+        V = np.r_[self.V[R], 0.0]
+        if self.method == "value":
+            V, policy, it = value_iteration(sub, beta, self.eps, V=V)
+            work = it * len(R)
+        elif self.method == "sweeping":
+            V, policy, work = prioritized_sweeping(sub, beta, self.eps, V=V)
+        else:
+            V, policy, it = policy_iteration(sub, beta, policy=np.r_[self.policy[R], 0], V=V)
+            work = it * len(R)
+        self.V[R], self.policy[R] = V[:-1], policy[:-1]
+        # residuals only move on R and the states with a successor in R
+        X = reach(ptr, source, R, 1)
+        self._residuals[X] = residuals(self.mdp, self.V, beta, X)
+        self.residual = self._residuals.max()
+        work += passes * self.mdp.S + len(seeds) + len(X)
+        return {"seeds": len(seeds), "states": len(R), "depth": depth, "work": int(work),
+                "cold": self.cold["work"], "saved": 1 - work / self.cold["work"], "time": time.perf_counter() - tick}
+
+
+if __name__ == "__main__":
+    # congestion on a 10 x 10 patch of a 300 x 300 grid: stepping there costs 3 instead of 1
+    mdp = grid(300, 300, step=1.0)
+    beta = 0.9
+    patch = [r * 300 + c for r in range(100, 110) for c in range(200, 210)]
+    for method in ("sweeping", "policy"):
+        solver = Incremental(mdp, beta, method=method)
+        report = solver.update(cost={(s, a): 3.0 for s in patch for a in range(4)})
+        reference, _, _ = policy_iteration(solver.mdp, beta)
+        print(f"grid, {method:>8}: {report['states']:>6} of {mdp.S} states re-solved (depth {report['depth']}), "
+              f"work {report['work']} vs {report['cold']} cold ({report['saved']:.1%} saved), "
+              f"{report['time']:.2f}s vs {solver.cold['time']:.2f}s, error {np.abs(solver.V - reference).max():.1e}")
+    # a changed demand estimate at one stock level of the inventory model: every state can order up to
+    # it, so reachability prunes nothing; value iteration saves by starting at the old solution, policy
+    # iteration needs about as many iterations as cold and the three passes over P make it cost more
+    mdp = inventory(500, max_order=150)
+    for method in ("value", "policy"):
+        solver = Incremental(mdp, 0.95, method=method)
+        row = {120: 0.3, 119: 0.4, 118: 0.3}
+        report = solver.update(rows={(120, 0): row}, cost={(120, 0): 30.0})
+        reference, _, _ = policy_iteration(solver.mdp, 0.95)
+        print(f"inventory, {method:>8}: {report['states']:>4} of {mdp.S} states re-solved, "
+              f"work {report['work']} vs {report['cold']} cold ({report['saved']:.1%} saved), "
+              f"{report['time']:.2f}s vs {solver.cold['time']:.2f}s, error {np.abs(solver.V - reference).max():.1e}")
@@ -0,0 +1,102 @@
+import time
+
+import gurobipy as gp
+from gurobipy import GRB
+import numpy as np
+import scipy.sparse as sp
+
+from .mdp import inventory, lab
+
+# define parameters
+beta = 0.8 # discounted factor
+
+
+# Bellman rows E - beta P over the valid (state, action) pairs, E picking the state of each pair;
+# returns the matrix and the pair indices s * A + a in row order
+def bellman_matrix(mdp, beta):
+    pairs = np.flatnonzero(mdp.mask.ravel())
+    E = sp.csr_matrix((np.ones(len(pairs)), (np.arange(len(pairs)), pairs // mdp.A)), shape=(len(pairs), mdp.S))
+    return (E - beta * mdp.P[pairs]).tocsr(), pairs
+
+
+# primal LP: max alpha v s.t. v_s <= c(s, a) + beta sum_t P(t | s, a) v_t for every pair, added in one
+# addMConstr; the duals of those rows are the occupation measures, the policy is the action with the
+# largest one in each state; returns the values, the policy and the model
+def primal_lp(mdp, beta, alpha=None, verbose=False):
+    alpha = np.ones(mdp.S) if alpha is None else np.asarray(alpha, dtype=np.float64)
+    M, pairs = bellman_matrix(mdp, beta)
+    # ceate a model
+    m = gp.Model("MDP")
+    m.Params.OutputFlag = int(verbose)
+    # varibles
+    v = m.addMVar(mdp.S, lb=-GRB.INFINITY, name="value")
+    # obj func
+    m.setObjective(alpha @ v, sense=GRB.MAXIMIZE)
+    # constr
+    bellman = m.addMConstr(M, v, "<", mdp.cost[pairs], name="bellman")
+    # solves
+    m.optimize()
+    occupation = np.zeros(mdp.S * mdp.A)
+    occupation[pairs] = bellman.Pi
+    return v.X, occupation.reshape(mdp.S, mdp.A).argmax(axis=1), m
+
+
+# dual LP over occupation measures x(s, a) >= 0: min c x s.t. sum_a x(t, a) - beta sum P(t | s, a) x(s, a)
+# = alpha_t, with optional side constraints A_ub x <= b_ub whose columns follow the valid pairs in
+# s * A + a order; the policy x(s, a) / sum_a x(s, a) may randomize once side constraints bind;
+# returns the values (duals of the balance rows), the S x A policy and the model
+def dual_lp(mdp, beta, alpha=None, A_ub=None, b_ub=None, verbose=False):
+    alpha = np.ones(mdp.S) if alpha is None else np.asarray(alpha, dtype=np.float64)
+    M, pairs = bellman_matrix(mdp, beta)
+    m = gp.Model("MDP occupation")
+    m.Params.OutputFlag = int(verbose)
+    x = m.addMVar(len(pairs), lb=0, name="occupation")
+    m.setObjective(mdp.cost[pairs] @ x, sense=GRB.MINIMIZE)
+    balance = m.addMConstr(M.T.tocsr(), x, "=", alpha, name="balance")
+    if A_ub is not None:
+        m.addMConstr(sp.csr_matrix(A_ub), x, "<", np.asarray(b_ub, dtype=np.float64), name="side")
+    m.optimize()
+    occupation = np.zeros(mdp.S * mdp.A)
+    occupation[pairs] = x.X
+    occupation = occupation.reshape(mdp.S, mdp.A)
+    return balance.Pi, occupation / occupation.sum(axis=1, keepdims=True), m
+
+
+if __name__ == "__main__":
+    # lab instance
+    mdp = lab()
+    V, policy, _ = primal_lp(mdp, beta)
+    # value
+    print("Model Solution:")
+    for s in mdp.states:
+        print("v_{} = {:.2f}".format(s, V[s]), end=" ")
+    print()
+    print("Policy from the duals:", mdp.describe(policy))
+    V, randomized, _ = dual_lp(mdp, beta)
+    print("Occupation-measure LP values:", {s: round(float(v), 2) for s, v in zip(mdp.states, V)},
+          "policy:", mdp.describe(randomized.argmax(axis=1)))
+    # side constraint: discounted frequency of the cheap action in state 2 at most 1
+    side = np.zeros((1, mdp.pairs))
+    side[0, 6] = 1.0
+    V, randomized, _ = dual_lp(mdp, beta, A_ub=side, b_ub=[1.0])
+    print("With the side constraint, state 2 randomizes:",
+          {mdp.labels[2, a]: round(float(p), 3) for a, p in enumerate(randomized[2]) if p > 0})
+    print()
+    # assembly time at scale; the solve needs a license without size limits
+    for capacity, max_order in ((300, 100), (2000, 500)):
+        mdp = inventory(capacity, max_order=max_order)
+        tick = time.perf_counter()
+        M, pairs = bellman_matrix(mdp, 0.95)
+        m = gp.Model("MDP")
+        m.Params.OutputFlag = 0
+        v = m.addMVar(mdp.S, lb=-GRB.INFINITY)
+        m.setObjective(v.sum(), sense=GRB.MAXIMIZE)
+        m.addMConstr(M, v, "<", mdp.cost[pairs])
+        m.update()
+        print(f"Inventory LP with {mdp.pairs} rows and {M.nnz} nonzeros assembled in {time.perf_counter() - tick:.2f}s")
+        try:
+            tick = time.perf_counter()
+            m.optimize()
+            print(f"  solved in {time.perf_counter() - tick:.2f}s, objective {m.ObjVal:.2f}")
+        except gp.GurobiError as error:
+            print(f"  not solved: {error}")
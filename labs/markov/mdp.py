@@ -0,0 +1,179 @@
+import numpy as np
+import scipy.sparse as sp
+
+# lab instance: states, allowed actions per state, transition probabilities P(t | s, a) and costs
+states = [0, 1, 2, 3]
+actions = {
+    0: [2, 3, 4],
+    1: [1, 2, 3],
+    2: [0, 1, 2],
+    3: [0, 1]
+}
+P = {
+    (0, 2): {0: 0.5, 1: 0.5}, (0, 3): {1: 0.5, 2: 0.5}, (0, 4): {2: 0.5, 3: 0.5},
+    (1, 1): {0: 0.5, 1: 0.5}, (1, 2): {1: 0.5, 2: 0.5}, (1, 3): {2: 0.5, 3: 0.5},
+    (2, 0): {0: 0.5, 1: 0.5}, (2, 1): {1: 0.5, 2: 0.5}, (2, 2): {2: 0.5, 3: 0.5},
+    (3, 0): {1: 0.5, 2: 0.5}, (3, 1): {2: 0.5, 3: 0.5}
+}
+cost = {
+    (0, 2): 6, (0, 3): 7, (0, 4): 8,
+    (1, 1): 6, (1, 2): 7, (1, 3): 8,
+    (2, 0): 2, (2, 1): 7, (2, 2): 8,
+    (3, 0): 3, (3, 1): 8
+}
+
+
+# finite MDP with S states and up to A actions per state: row s * A + a of the sparse (S*A x S)
+# matrix P holds the transition probabilities of action slot a in state s, cost the matching
+# one-step costs and mask[s, a] whether the slot is an action of s; unused slots cost inf
+class MDP:
+
+    def __init__(self, P, cost, mask, states=None, labels=None):
+        self.mask = np.asarray(mask, dtype=bool)
+        self.S, self.A = self.mask.shape
+        self.P = sp.csr_matrix(P, dtype=np.float64)
+        if self.P.shape != (self.S * self.A, self.S):
+            raise ValueError(f"P has shape {self.P.shape}, expected {(self.S * self.A, self.S)}.")
+        valid = self.mask.ravel()
+        rows = np.asarray(self.P.sum(axis=1)).ravel()
+        if np.abs(rows[valid] - 1).max(initial=0.0) > 1e-9 or rows[~valid].any():
+            raise ValueError("Rows of P must sum to one for actions and be empty elsewhere.")
+        if not self.mask.any(axis=1).all():
+            raise ValueError("Every state needs at least one action.")
+        self.cost = np.where(valid, np.asarray(cost, dtype=np.float64), np.inf)
+        # names for reporting: state labels and the action label of each slot
+        self.states = list(range(self.S)) if states is None else list(states)
+        self.labels = labels
+
+    # build from the dictionaries used in the lab scripts
+    @classmethod
+    def from_dict(cls, states, actions, P, cost):
+        index = {s: i for i, s in enumerate(states)}
+        A = max(len(actions[s]) for s in states)
+        mask = np.zeros((len(states), A), dtype=bool)
+        labels = np.full((len(states), A), None, dtype=object)
+        c = np.zeros(len(states) * A)
+        rows, cols, data = [], [], []
+        for s in states:
+            for k, a in enumerate(actions[s]):
+                row = index[s] * A + k
+                mask[index[s], k] = True
+                labels[index[s], k] = a
+                c[row] = cost[s, a]
+                for t, p in P.get((s, a), {}).items():
+                    rows.append(row)
+                    cols.append(index[t])
+                    data.append(p)
+        P = sp.csr_matrix((data, (rows, cols)), shape=(len(states) * A, len(states)))
+        return cls(P, c, mask, states=states, labels=labels)
+
+    # number of (state, action) pairs
+    @property
+    def pairs(self):
+        return int(self.mask.sum())
+
+    # Q-values c + beta * P V as an S x A array, inf on unused slots
+    def q(self, V, beta):
+        return (self.cost + beta * (self.P @ V)).reshape(self.S, self.A)
+
+    # one Bellman backup: minimal Q-value and its action slot per state
+    def backup(self, V, beta):
+        Q = self.q(V, beta)
+        policy = Q.argmin(axis=1)
+        return Q[np.arange(self.S), policy], policy
+
+    # transition matrix (S x S) and cost vector of a stationary policy given by action slots
+    def policy_matrix(self, policy):
+        rows = np.arange(self.S) * self.A + policy
+        return self.P[rows], self.cost[rows]
+
+    # predecessors of every state as CSR lists (ptr, source, weight): the states that can move to t
+    # are source[ptr[t]:ptr[t + 1]], weight the largest probability of the move over their actions
+    def predecessors(self):
+        P = self.P.tocoo()
+        src, dst = P.row // self.A, P.col
+        key = dst.astype(np.int64) * self.S + src
+        order = np.argsort(key, kind="stable")
+        key = key[order]
+        starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+        weight = np.maximum.reduceat(P.data[order], starts)
+        key = key[starts]
+        ptr = np.concatenate([[0], np.cumsum(np.bincount(key // self.S, minlength=self.S))])
+        return ptr, key % self.S, weight
+
+    # policy as {state: action label}
+    def describe(self, policy):
+        if self.labels is None:
+            return dict(zip(self.states, np.asarray(policy).tolist()))
+        return {s: self.labels[i, a] for i, (s, a) in enumerate(zip(self.states, policy))}
+
+
+# the lab MDP
+def lab():
+    return MDP.from_dict(states, actions, P, cost)
+
+
+# lost-sales inventory control: stock s in 0..capacity, order a in 0..min(max_order, capacity - s),
+# Poisson demand cut off where its tail mass drops below tail; fixed plus unit ordering cost,
+# holding cost on the stock left and a penalty per unit short
+def inventory(capacity, max_order=None, mean=3.0, fixed=4.0, unit=1.0, holding=0.2, shortage=5.0, tail=1e-6):
+    return MDP(*inventory_rows(capacity, 0, capacity + 1, max_order, mean, fixed, unit, holding, shortage, tail))
+
+
+# rows of the inventory model for the stock levels first..last - 1 only: P, costs and mask of those
+# states, so models larger than memory can be generated block by block
+def inventory_rows(capacity, first, last, max_order=None, mean=3.0, fixed=4.0, unit=1.0, holding=0.2,
+                   shortage=5.0, tail=1e-6):
+    # scipy.stats takes most of a second to import, so only models that need it pay for it
+    from scipy.stats import poisson
+    max_order = capacity if max_order is None else max_order
+    S, A = capacity + 1, max_order + 1
+    top = int(poisson.isf(tail, mean)) + 1
+    demand = np.arange(top + 1)
+    pmf = poisson.pmf(demand, mean)
+    pmf[-1] += poisson.sf(top, mean)
+    s, a = np.arange(first, last)[:, None], np.arange(A)[None, :]
+    mask = s + a <= capacity
+    pairs = np.flatnonzero(mask.ravel())
+    level = (s + a).ravel()[pairs]
+    # next stock is what is left after demand
+    rows = np.repeat(pairs, len(demand))
+    cols = np.maximum(level[:, None] - demand[None, :], 0).ravel()
+    P = sp.csr_matrix((np.tile(pmf, len(pairs)), (rows, cols)), shape=((last - first) * A, S))
+    # expected leftover and shortfall for every stock level after ordering
+    y = np.arange(S)[:, None]
+    left = np.maximum(y - demand, 0) @ pmf
+    short = np.maximum(demand - y, 0) @ pmf
+    order = a.ravel()[pairs % A]
+    c = np.zeros((last - first) * A)
+    c[pairs] = fixed * (order > 0) + unit * order + holding * left[level] + shortage * short[level]
+    return P, c, mask
+
+
+# grid navigation: move north, south, east or west on a rows x cols grid, staying put with
+# probability slip; every step costs step and reaching the absorbing, cost-free goal in the far
+# corner earns reward once
+def grid(rows, cols, slip=0.1, step=1.0, reward=0.0):
+    S, A = rows * cols, 4
+    r, c = np.divmod(np.arange(S), cols)
+    goal = S - 1
+    targets = [np.clip(r + dr, 0, rows - 1) * cols + np.clip(c + dc, 0, cols - 1)
+               for dr, dc in ((-1, 0), (1, 0), (0, 1), (0, -1))]
+    target = np.stack(targets, axis=1).ravel()
+    stay = np.repeat(np.arange(S), A)
+    target[stay == goal] = goal
+    pair = np.arange(S * A)
+    P = sp.csr_matrix((np.r_[np.full(S * A, 1 - slip), np.full(S * A, slip)],
+                       (np.r_[pair, pair], np.r_[target, stay])), shape=(S * A, S))
+    cost = np.where(stay == goal, 0.0, step - reward * (1 - slip) * (target == goal))
+    return MDP(P, cost, np.ones((S, A), dtype=bool))
+
+# random sparse MDP: every action moves to k random states, costs uniform on [0, 1)
+def random_mdp(S, A, k, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = np.repeat(np.arange(S * A), k)
+    cols = rng.integers(0, S, S * A * k)
+    data = rng.random((S * A, k))
+    data /= data.sum(axis=1, keepdims=True)
+    P = sp.csr_matrix((data.ravel(), (rows, cols)), shape=(S * A, S))
+    return MDP(P, rng.random(S * A), np.ones((S, A), dtype=bool))
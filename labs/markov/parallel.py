@@ -0,0 +1,220 @@
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+import scipy.sparse as sp
+
+from .mdp import grid, inventory
+from .value import value_iteration
+
+# commands the master leaves in the shared control array before releasing the workers
+SWEEP, GREEDY, STOP = 0, 1, 2
+
+
+# copy arrays into shared memory blocks; returns the blocks, a picklable spec to attach to them and
+# views of the copies
+def share(arrays):
+    blocks, spec, views = [], {}, {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        views[name] = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        views[name][...] = array
+        blocks.append(block)
+        spec[name] = (block.name, array.dtype.str, array.shape)
+    return blocks, spec, views
+
+
+# views of shared arrays from their spec, and the blocks to close once done
+def attach(spec):
+    blocks, arrays = [], {}
+    for name, (key, dtype, shape) in spec.items():
+        block = shared_memory.SharedMemory(name=key)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return blocks, arrays
+
+
+# cut states first..last - 1 into runs of whole states holding about size nonzeros each
+def split(state_ptr, first, last, size):
+    targets = state_ptr[first] + size * np.arange(1, int(np.ceil((state_ptr[last] - state_ptr[first]) / size)))
+    cuts = np.searchsorted(state_ptr[first:last + 1], targets) + first
+    return np.unique(np.r_[first, np.clip(cuts, first, last), last]).tolist()
+
+
+# worker w: CSR views of its rows, backed up against the shared values until told to stop; synchronous
+# sweeps read one buffer of V and write the other between two barriers, asynchronous ones update
+# the single buffer in place and never wait, each worker writing only its own states
+def _worker(w, spec, states, chunk, beta, A, barrier, asynchronous):
+    blocks, a = attach(spec)
+    try:
+        _sweeps(w, a, states, chunk, beta, A, barrier, asynchronous)
+    except BaseException:
+        barrier.abort()
+        raise
+    finally:
+        # views must go before their blocks can close
+        del a
+        for block in blocks:
+            block.close()
+
+
+# the worker's loop, run on the shared views in a, which are released when it returns
+def _sweeps(w, a, states, chunk, beta, A, barrier, asynchronous):
+    indptr, indices, data, cost = a["indptr"], a["indices"], a["data"], a["cost"]
+    V, stats, control, policy = a["V"], a["stats"], a["control"], a["policy"]
+    S = V.shape[1]
+    cuts = split(indptr[::A], states[0], states[1], chunk)
+    runs = []
+    for f, l in zip(cuts[:-1], cuts[1:]):
+        lo, hi = indptr[f * A], indptr[l * A]
+        M = sp.csr_matrix((data[lo:hi], indices[lo:hi], indptr[f * A:l * A + 1] - lo), shape=((l - f) * A, S),
+                          copy=False)
+        runs.append((f, l, M, cost[f * A:l * A], np.arange(l - f)))
+    if asynchronous:
+        values, sweeps = V[0], 0
+        while control[0] != STOP:
+            change = 0.0
+            for f, l, M, c, rows in runs:
+                Q = (c + beta * (M @ values)).reshape(l - f, A)
+                TV = Q[rows, Q.argmin(axis=1)]
+                change = max(change, np.abs(TV - values[f:l]).max())
+                values[f:l] = TV
+            sweeps += 1
+            stats[w] = change, sweeps
+        return
+    while True:
+        barrier.wait()
+        command, src = control
+        if command == STOP:
+            return
+        old, new = V[src], V[1 - src]
+        low, high = np.inf, -np.inf
+        for f, l, M, c, rows in runs:
+            Q = (c + beta * (M @ old)).reshape(l - f, A)
+            policy[f:l] = Q.argmin(axis=1)
+            if command == GREEDY:
+                continue
+            new[f:l] = Q[rows, policy[f:l]]
+            diff = new[f:l] - old[f:l]
+            low, high = min(low, diff.min()), max(high, diff.max())
+        stats[w] = low, high
+        barrier.wait()
+
+
+# value iteration on worker processes, each owning a run of states with about the same number of
+# transitions; P, the costs and V live in shared memory, attached once, so nothing is pickled per
+# sweep. Synchronous mode is value_iteration split across processes (barrier per sweep, same
+# MacQueen stopping rule and midpoint); asynchronous mode lets every worker sweep its states in place,
+# chunk nonzeros at a time, without waiting for the others, until a backup of the shared values
+# satisfies the same stopping rule; returns V, a greedy policy, the sweeps (the most any worker made,
+# in asynchronous mode) and the number of state backups, the master's checks not included
+def parallel_value_iteration(mdp, beta, eps=1e-6, V=None, workers=None, asynchronous=False, chunk=1 << 20,
+                             max_iter=100000, poll=1e-3):
+    workers = workers or os.cpu_count()
+    S, A, P = mdp.S, mdp.A, mdp.P
+    index = np.int32 if P.nnz < 2 ** 31 else np.int64
+    start = np.zeros(S) if V is None else np.asarray(V, dtype=np.float64)
+    # runs of states with equal shares of the nonzeros
+    cuts = split(P.indptr[::A], 0, S, -(-P.nnz // workers))
+    workers = len(cuts) - 1
+    blocks, spec, a = share({"indptr": P.indptr.astype(index), "indices": P.indices.astype(index), "data": P.data,
+                             "cost": mdp.cost, "V": np.stack([start, start]), "stats": np.zeros((workers, 2)),
+                             "control": np.array([SWEEP, 0]), "policy": np.zeros(S, dtype=np.int64)})
+    context = mp.get_context()
+    barrier = context.Barrier(workers + 1)
+    processes = [context.Process(target=_worker, args=(w, spec, (cuts[w], cuts[w + 1]), chunk, beta, A, barrier,
+                                                       asynchronous), daemon=True) for w in range(workers)]
+    try:
+        for process in processes:
+            process.start()
+        if asynchronous:
+            V, it = _watch(a, processes, mdp, beta, eps, max_iter, poll)
+            backups = int(a["stats"][:, 1] @ np.diff(cuts))
+            _, policy = mdp.backup(V, beta)
+            return V, policy, it, backups
+        V, policy, it = _lead(a, barrier, beta, eps, max_iter)
+        for process in processes:
+            process.join()
+        return V, policy, it, it * S
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        del a
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+# master side of the synchronous mode: release a sweep, wait for it, test the MacQueen bounds
+def _lead(a, barrier, beta, eps, max_iter):
+    V, stats, control = a["V"], a["stats"], a["control"]
+    factor = beta / (1 - beta)
+    src = 0
+    for it in range(1, max_iter + 1):
+        control[:] = SWEEP, src
+        barrier.wait()
+        barrier.wait()
+        low, high = stats[:, 0].min(), stats[:, 1].max()
+        src = 1 - src
+        if factor * (high - low) <= eps:
+            break
+    V[src] += factor * (low + high) / 2
+    control[:] = GREEDY, src
+    barrier.wait()
+    barrier.wait()
+    control[0] = STOP
+    barrier.wait()
+    return V[src].copy(), a["policy"].copy(), it
+
+
+# master side of the asynchronous mode: poll the workers' pass counters; once every worker has finished
+# a pass since the last check and none changed a value by more than eps (1 - beta) / beta, back up a
+# snapshot of V and stop the workers if its MacQueen bounds are within eps, returning their midpoint
+def _watch(a, processes, mdp, beta, eps, max_iter, poll):
+    stats, control = a["stats"], a["control"]
+    factor = beta / (1 - beta)
+    seen = np.zeros(len(processes))
+    while (stats[:, 1] < max_iter).all():
+        time.sleep(poll)
+        change, count = stats[:, 0].copy(), stats[:, 1].copy()
+        if (count > seen).all():
+            seen = count
+            if factor * change.max() <= eps:
+                V = a["V"][0].copy()
+                TV, _ = mdp.backup(V, beta)
+                low, high = (TV - V).min(), (TV - V).max()
+                if factor * (high - low) <= eps:
+                    break
+        if not all(process.is_alive() for process in processes):
+            raise RuntimeError("A value iteration worker died.")
+    else:
+        TV, low, high = a["V"][0].copy(), 0.0, 0.0
+    control[0] = STOP
+    for process in processes:
+        process.join()
+    return TV + factor * (low + high) / 2, int(stats[:, 1].max())
+
+
+if __name__ == "__main__":
+    cores = os.cpu_count()
+    print(f"{cores} cores available")
+    for label, mdp in (("grid 600 x 600, goal reward", grid(600, 600, step=0.0, reward=1.0)),
+                       ("inventory 1000", inventory(1000, max_order=300))):
+        print(f"{label}: {mdp.S} states, {mdp.P.nnz} transitions")
+        tick = time.perf_counter()
+        reference, _, it = value_iteration(mdp, 0.95, eps=1e-6)
+        serial = time.perf_counter() - tick
+        print(f"{'serial':>22}: {it:>5} sweeps, {serial:6.2f}s")
+        for workers in sorted({1, 2, cores}):
+            for asynchronous in (False, True):
+                tick = time.perf_counter()
+                V, policy, it, backups = parallel_value_iteration(mdp, 0.95, eps=1e-6, workers=workers,
+                                                                  asynchronous=asynchronous)
+                elapsed = time.perf_counter() - tick
+                mode = "asynchronous" if asynchronous else "synchronous"
+                print(f"{f'{workers} workers, {mode}':>22}: {it:>5} sweeps, {elapsed:6.2f}s, "
+                      f"speedup {serial / elapsed:4.2f}, error {np.abs(V - reference).max():.1e}")
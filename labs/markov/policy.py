@@ -0,0 +1,89 @@
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.linalg import bicgstab, splu
+
+from .mdp import inventory, lab
+from .value import value_iteration
+
+# define parameters
+beta = 0.8 # discounted factor
+
+
+# value of a stationary policy from (I - beta P_pi) v = c_pi: sparse LU ("direct") or BiCGSTAB
+# ("krylov") started from V, the previous policy's values when iterating
+def evaluate(mdp, policy, beta, method="direct", V=None, tol=1e-12):
+    P, c = mdp.policy_matrix(policy)
+    A = (sp.identity(mdp.S, format="csr") - beta * P).tocsc()
+    if method == "direct":
+        return splu(A).solve(c)
+    if method == "krylov":
+        v, info = bicgstab(A, c, x0=V, rtol=tol, atol=0.0)
+        if info != 0:
+            raise RuntimeError(f"BiCGSTAB did not converge (info {info}).")
+        return v
+    raise ValueError(f"Unknown method {method!r}, expected 'direct' or 'krylov'.")
+
+
+# greedy improvement that keeps the current action unless another is better by more than the
+# evaluation noise, so policy iteration cannot cycle between equally good actions
+def improve(mdp, V, beta, policy):
+    Q = mdp.q(V, beta)
+    best = Q.argmin(axis=1)
+    rows = np.arange(mdp.S)
+    keep = Q[rows, policy] <= Q[rows, best] + 1e-9 * (1 + np.abs(Q[rows, best]))
+    return np.where(keep, policy, best), Q[rows, best]
+
+
+# policy iteration from an initial policy (first action of every state by default); with sweeps=m
+# it is modified policy iteration, each evaluation replaced by m applications of T_pi from the
+# current values, and it stops once the policy is stable and the values are within eps of optimal,
+# for modified policy iteration by returning the last backup TV once beta / (1 - beta) |TV - V| <= eps;
+# returns the values, the policy and the number of improvement steps
+def policy_iteration(mdp, beta, method="direct", policy=None, V=None, sweeps=None, eps=1e-6, max_iter=10000,
+                     verbose=False):
+    policy = mdp.mask.argmax(axis=1) if policy is None else np.asarray(policy).copy()
+    V = np.zeros(mdp.S) if V is None else np.asarray(V, dtype=np.float64).copy()
+    factor = beta / (1 - beta)
+    for it in range(1, max_iter + 1):
+        if sweeps is None:
+            V = evaluate(mdp, policy, beta, method, V)
+        else:
+            P, c = mdp.policy_matrix(policy)
+            for _ in range(sweeps):
+                V = c + beta * (P @ V)
+        new, TV = improve(mdp, V, beta, policy)
+        if verbose:
+            print(f"Iteration {it}: value", {s: round(float(v), 2) for s, v in zip(mdp.states, V)},
+                  "policy", mdp.describe(new))
+        stable = (new == policy).all()
+        policy = new
+        if stable and (sweeps is None or factor * np.abs(TV - V).max() <= eps):
+            # the test bounds the distance of TV, not of V, to the optimal values
+            if sweeps is not None:
+                V = TV
+            break
+    return V, policy, it
+
+
+if __name__ == "__main__":
+    # lab instance, starting from the cheapest action in every state
+    mdp = lab()
+    V, policy, it = policy_iteration(mdp, beta, policy=np.argmin(mdp.cost.reshape(mdp.S, mdp.A), axis=1),
+                                     verbose=True)
+    print(f"Optimal after {it} iterations:", mdp.describe(policy))
+    print()
+    # exact, Krylov and modified policy iteration against value iteration
+    for label, mdp, discount in (("inventory 2000", inventory(2000, max_order=500), 0.95),
+                                 ("inventory 10000", inventory(10000, max_order=50), 0.99)):
+        reference = policy_iteration(mdp, discount)[0]
+        runs = [("value iteration", lambda: value_iteration(mdp, discount, eps=1e-6)),
+                ("PI, SuperLU", lambda: policy_iteration(mdp, discount)),
+                ("PI, BiCGSTAB warm start", lambda: policy_iteration(mdp, discount, method="krylov")),
+                ("modified PI, m = 20", lambda: policy_iteration(mdp, discount, sweeps=20))]
+        for name, run in runs:
+            tick = time.perf_counter()
+            V, policy, it = run()
+            print(f"{label:>15} {name:>24}: {it:>4} iterations, {time.perf_counter() - tick:6.2f}s, "
+                  f"error {np.abs(V - reference).max():.1e}")
@@ -0,0 +1,149 @@
+import heapq
+import time
+
+import numpy as np
+
+from .mdp import grid, inventory, lab, random_mdp
+
+# define parameters
+beta = 0.8 # discounted factor
+
+
+# value iteration, one sparse mat-vec and a masked min per sweep; stops when the MacQueen bounds
+# V' + beta / (1 - beta) * [min, max](V' - V) on the optimal values are within eps of each other,
+# i.e. when the span of the update drops below eps (1 - beta) / beta, and returns their midpoint;
+# bounds=False uses the plain sup-norm test beta / (1 - beta) * max |V' - V| <= eps instead;
+# returns the values, a greedy policy and the number of sweeps
+def value_iteration(mdp, beta, eps=1e-6, V=None, max_iter=100000, bounds=True):
+    V = np.zeros(mdp.S) if V is None else np.asarray(V, dtype=np.float64).copy()
+    factor = beta / (1 - beta)
+    for it in range(1, max_iter + 1):
+        V_new, _ = mdp.backup(V, beta)
+        diff = V_new - V
+        low, high = diff.min(), diff.max()
+        V = V_new
+        if factor * ((high - low) if bounds else max(high, -low)) <= eps:
+            break
+    if bounds:
+        V = V + factor * (low + high) / 2
+    _, policy = mdp.backup(V, beta)
+    return V, policy, it
+
+
+# single-state Bellman backup on the raw CSR arrays, for the in-place variants
+def state_backup(mdp, beta):
+    P, A = mdp.P, mdp.A
+    indptr, indices, data = P.indptr, P.indices, P.data
+    slot = np.repeat(np.arange(P.shape[0]) % A, np.diff(indptr))
+    cost = mdp.cost.reshape(mdp.S, A)
+
+    def backup(s, V):
+        lo, hi = indptr[s * A], indptr[(s + 1) * A]
+        q = np.bincount(slot[lo:hi], weights=data[lo:hi] * V[indices[lo:hi]], minlength=A)
+        return (cost[s] + beta * q).min()
+    return backup
+
+
+# Gauss-Seidel value iteration: states are backed up in place, in the given order ("natural",
+# "reverse", "symmetric" for alternating directions, or an array of states), so later states in
+# a sweep already see the new values; stops when beta / (1 - beta) times the largest change is
+# within eps, which bounds the distance to the optimal values; returns V, a greedy policy,
+# the number of sweeps and the number of state backups
+def gauss_seidel(mdp, beta, eps=1e-6, V=None, order="natural", max_iter=100000):
+    V = np.zeros(mdp.S) if V is None else np.asarray(V, dtype=np.float64).copy()
+    backup = state_backup(mdp, beta)
+    forward = np.arange(mdp.S) if isinstance(order, str) else np.asarray(order)
+    orders = {"natural": [forward], "reverse": [forward[::-1]], "symmetric": [forward, forward[::-1]]}
+    orders = orders.get(order, [forward]) if isinstance(order, str) else orders["natural"]
+    factor = beta / (1 - beta)
+    for it in range(1, max_iter + 1):
+        change = 0.0
+        for s in orders[(it - 1) % len(orders)].tolist():
+            new = backup(s, V)
+            change = max(change, abs(new - V[s]))
+            V[s] = new
+        if factor * change <= eps:
+            break
+    _, policy = mdp.backup(V, beta)
+    return V, policy, it, it * mdp.S
+
+
+# prioritized sweeping: a heap ordered by an upper bound on each state's Bellman residual; backing
+# up s zeroes its bound and raises the bound of every predecessor p by beta * P(s | p, a) * |change|
+# (largest over p's actions); when no bound exceeds eps (1 - beta), V is within eps of optimal;
+# returns V, a greedy policy and the number of state backups, the first full residual pass included
+def prioritized_sweeping(mdp, beta, eps=1e-6, V=None, max_backups=None):
+    V = np.zeros(mdp.S) if V is None else np.asarray(V, dtype=np.float64).copy()
+    backup = state_backup(mdp, beta)
+    ptr, source, weight = mdp.predecessors()
+    ptr, source, weight = ptr.tolist(), source.tolist(), (beta * weight).tolist()
+    threshold = eps * (1 - beta)
+    # exact residuals to start with
+    TV, _ = mdp.backup(V, beta)
+    bound = np.abs(TV - V).tolist()
+    heap = [(-b, s) for s, b in enumerate(bound) if b > threshold]
+    heapq.heapify(heap)
+    backups = mdp.S
+    while heap and (max_backups is None or backups < max_backups):
+        b, s = heapq.heappop(heap)
+        # skip entries superseded by a larger bound
+        if -b != bound[s]:
+            continue
+        new = backup(s, V)
+        delta = abs(new - V[s])
+        V[s] = new
+        bound[s] = 0.0
+        backups += 1
+        for i in range(ptr[s], ptr[s + 1]):
+            p = source[i]
+            bound[p] += weight[i] * delta
+            if bound[p] > threshold:
+                heapq.heappush(heap, (-bound[p], p))
+    _, policy = mdp.backup(V, beta)
+    return V, policy, backups
+
+
+# state backups, wall time and error against a tight reference for each variant
+def benchmark(instances, beta=0.95, eps=1e-6):
+    print(f"{'instance':>28} {'method':>22} {'backups':>10} {'time':>8} {'error':>9}")
+    for label, mdp in instances:
+        reference, _, _ = value_iteration(mdp, beta, eps=1e-10)
+        runs = [("jacobi bounds", lambda: value_iteration(mdp, beta, eps)),
+                ("jacobi sup-norm", lambda: value_iteration(mdp, beta, eps, bounds=False))]
+        runs += [(f"gauss-seidel {order}", lambda order=order: gauss_seidel(mdp, beta, eps, order=order))
+                 for order in ("natural", "reverse", "symmetric")]
+        runs.append(("prioritized sweeping", lambda: prioritized_sweeping(mdp, beta, eps)))
+        for name, run in runs:
+            tick = time.perf_counter()
+            result = run()
+            elapsed = time.perf_counter() - tick
+            # value iteration reports sweeps, the in-place variants count backups themselves
+            backups = result[-1] * mdp.S if name.startswith("jacobi") else result[-1]
+            error = np.abs(result[0] - reference).max()
+            print(f"{label:>28} {name:>22} {backups:>10} {elapsed:>7.2f}s {error:>9.1e}")
+
+
+if __name__ == "__main__":
+    # lab instance
+    mdp = lab()
+    V, policy, it = value_iteration(mdp, beta)
+    print(f"Value after {it} iterations:", {s: round(float(v), 2) for s, v in zip(mdp.states, V)})
+    print("Policy:", mdp.describe(policy))
+    print()
+    # inventory control with about a million state-action pairs
+    tick = time.perf_counter()
+    mdp = inventory(2000, max_order=500)
+    print(f"Inventory MDP: {mdp.S} states, {mdp.pairs} state-action pairs, {mdp.P.nnz} transitions, "
+          f"built in {time.perf_counter() - tick:.2f}s")
+    for eps in (1e-2, 1e-6):
+        tick = time.perf_counter()
+        V, policy, it = value_iteration(mdp, 0.95, eps=eps)
+        print(f"eps {eps:g}: {it} sweeps, {time.perf_counter() - tick:.2f}s, V(0) = {V[0]:.4f}")
+    # order-up-to structure: order when stock is low, up to a common level
+    level = np.arange(mdp.S) + policy
+    print("Orders placed below stock", np.flatnonzero(policy == 0).min(), "up to level", np.unique(level[policy > 0]))
+    print()
+    # backups and time per variant; in-place updates pay off when values flow outward from a goal
+    benchmark([("grid 80 x 80, goal reward", grid(80, 80, step=0.0, reward=1.0)),
+               ("inventory 300", inventory(300, max_order=100)),
+               ("random 1000 x 4, 5 successors", random_mdp(1000, 4, 5))])
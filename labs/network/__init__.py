@@ -0,0 +1,48 @@
+import numpy as np
+
+# networks are n nodes and arc arrays tail, head (node ids 0..n-1) with capacity and cost per arc;
+# method="lp" solves the Gurobi LP of labs.network.flowlp instead, which is the only path that loads gurobipy;
+# the solver modules load on first call
+
+
+# maximum s-t flow: its value, the flow per arc and the source side of a minimum cut
+def max_flow(n, tail, head, capacity, s, t, method="dinic"):
+    from .graph import Graph
+    from .maxflowsolver import max_flow
+    value, flow, side = max_flow(Graph(n, tail, head, capacity), s, t, method)
+    return {"value": value, "flow": flow, "cut": np.flatnonzero(side)}
+
+
+# cheapest flow meeting supply (positive at sources, negative at sinks, summing to 0)
+def min_cost_flow(n, tail, head, capacity, cost, supply, method="simplex"):
+    from .graph import Graph
+    graph = Graph(n, tail, head, capacity, cost)
+    if method == "lp":
+        from .flowlp import min_cost_flow_lp
+        value, flow, _ = min_cost_flow_lp(graph, supply)
+    elif method == "simplex":
+        from .networksimplex import min_cost_flow
+        value, flow = min_cost_flow(graph, np.asarray(supply, dtype=np.float64))
+    else:
+        raise ValueError(f"Unknown method {method!r}, expected 'simplex' or 'lp'.")
+    return {"cost": value, "flow": flow}
+
+
+# shortest s-t path: its length and arcs, or distances and predecessor arcs to every node when t is None
+def shortest_path(n, tail, head, cost, s, t=None):
+    from .graph import Graph
+    from .shortestpathsolver import bellman_ford, dijkstra, shortest_path
+    graph = Graph(n, tail, head, cost=cost)
+    if t is None:
+        dist, pred = bellman_ford(graph, s) if (graph.cost < 0).any() else dijkstra(graph, s)
+        return {"distance": dist, "predecessor": pred}
+    distance, path = shortest_path(graph, s, t)
+    return {"distance": distance, "path": path}
+
+
+# Gomory-Hu tree of an undirected network with edges (u, v): every pairwise min-cut value is the
+# lightest edge on the tree path, weight[v] being the edge from v to parent[v]
+def gomory_hu(n, u, v, capacity, workers=None):
+    from .gomoryhu import GomoryHuTree, undirected
+    cuts = GomoryHuTree(undirected(n, u, v, capacity), workers=workers)
+    return {"parent": cuts.parent, "weight": cuts.weight, "flows": cuts.flows}
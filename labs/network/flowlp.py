@@ -0,0 +1,68 @@
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+
+from ..gurobi import solve
+
+
+# flow-balance block A[rows] @ x == rhs added with a single matrix constraint
+def flow_balance(m, x, graph, rhs, rows=None, name="flow_balance"):
+    A = graph.incidence()
+    rhs = np.asarray(rhs, dtype=np.float64)
+    if rows is not None:
+        A, rhs = A[rows], rhs[rows]
+    return m.addMConstr(A, x, "=", rhs, name=name)
+
+
+# arc capacities as variable bounds, infinite capacities unbounded
+def capacity_bounds(graph):
+    return np.where(np.isfinite(graph.capacity), graph.capacity, GRB.INFINITY)
+
+
+# max flow from s to t as an LP
+def max_flow_lp(graph, s, t, verbose=False):
+    s, t = graph.terminals(s, t)
+    # create model
+    m = gp.Model("MaxFlow")
+    m.Params.outputFlag = int(verbose)
+    # decision variables: flow on each edge (bounded by capacity)
+    x = m.addMVar(graph.m, lb=0, ub=capacity_bounds(graph), vtype=GRB.CONTINUOUS, name="x")
+    # objective: maximize net flow out of s
+    A = graph.incidence()
+    m.setObjective(A[s] @ x, GRB.MAXIMIZE)
+    # flow conservation constraints for all intermediate nodes
+    inner = np.setdiff1d(np.arange(graph.n), [s, t])
+    flow_balance(m, x, graph, np.zeros(graph.n), rows=inner)
+    # solve model, raising unless it is optimal
+    return solve(m), x.X, m
+
+
+# min-cost flow meeting supply (positive) and demand (negative) at every node
+def min_cost_flow_lp(graph, supply, verbose=False):
+    # create model
+    m = gp.Model("MinCostFlow")
+    m.Params.outputFlag = int(verbose)
+    # decision variables: flow on each edge
+    x = m.addMVar(graph.m, lb=0, ub=capacity_bounds(graph), obj=graph.cost, vtype=GRB.CONTINUOUS, name="flow")
+    # flow constraints: outflow - inflow = supply
+    flow_balance(m, x, graph, supply)
+    # solve model, raising unless it is optimal
+    return solve(m), x.X, m
+
+
+# shortest s-t path as one unit of flow, arc lengths taken from graph.cost
+def shortest_path_lp(graph, s, t, verbose=False):
+    s, t = graph.terminals(s, t)
+    # create model
+    m = gp.Model("ShortestPath")
+    m.Params.outputFlag = int(verbose)
+    # decision variables: flow on each edge
+    x = m.addMVar(graph.m, lb=0, ub=1, vtype=GRB.CONTINUOUS, name="x")
+    # objective: minimize total distance traveled
+    m.setObjective(graph.cost @ x, GRB.MINIMIZE)
+    # one unit leaves s, one unit enters t, conservation elsewhere
+    rhs = np.zeros(graph.n)
+    rhs[s], rhs[t] = 1, -1
+    flow_balance(m, x, graph, rhs)
+    # solve model, raising unless it is optimal
+    return solve(m), x.X, m
@@ -0,0 +1,190 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .graph import Graph
+from .maxflowsolver import max_flow
+
+
+# undirected network as a Graph with one arc each way per edge
+def undirected(n, u, v, capacity):
+    u, v, capacity = np.asarray(u), np.asarray(v), np.asarray(capacity, dtype=np.float64)
+    return Graph(n, np.concatenate([u, v]), np.concatenate([v, u]), np.concatenate([capacity, capacity]))
+
+
+# the graph is shipped to each worker once, not with every task
+_graph = None
+_method = None
+
+
+def _init(graph, method):
+    global _graph, _method
+    _graph, _method = graph, method
+
+
+def _cut(pair):
+    s, t = pair
+    value, _, side = max_flow(_graph, s, t, method=_method)
+    return value, side
+
+
+# Gomory-Hu cut tree by Gusfield's algorithm: n - 1 max-flow computations on the original graph,
+# no contractions; with workers, cuts are computed for a batch of nodes at once and any node whose
+# tree neighbour changed while its batch ran is recomputed
+class GomoryHuTree:
+
+    def __init__(self, graph, method="dinic", workers=None, batch=None):
+        n = graph.n
+        self.n = n
+        parent = np.zeros(n, dtype=np.int64)
+        weight = np.zeros(n)
+        self.flows = 0
+        pool = ProcessPoolExecutor(workers, initializer=_init, initargs=(graph, method)) if workers else None
+        _init(graph, method)
+        batch = batch or (2 * workers if workers else 1)
+        try:
+            s = 1
+            while s < n:
+                nodes = list(range(s, min(s + batch, n)))
+                targets = [int(parent[i]) for i in nodes]
+                pairs = list(zip(nodes, targets))
+                results = list(pool.map(_cut, pairs)) if pool else [_cut(pair) for pair in pairs]
+                self.flows += len(pairs)
+                for (node, t), (value, side) in zip(pairs, results):
+                    if parent[node] != t:
+                        # speculative cut used a stale neighbour
+                        t = int(parent[node])
+                        value, side = _cut((node, t))
+                        self.flows += 1
+                    weight[node] = value
+                    # nodes on this side that hung off t now hang off node
+                    moved = side & (parent == t)
+                    moved[node] = False
+                    parent[moved] = node
+                    if side[parent[t]]:
+                        parent[node], parent[t] = parent[t], node
+                        weight[node], weight[t] = weight[t], value
+                s = nodes[-1] + 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        self.parent, self.weight = parent, weight
+        self._lift()
+
+    # binary lifting tables: 2^k-th ancestor and the lightest edge on the way up
+    def _lift(self):
+        n, parent = self.n, self.parent
+        depth = np.full(n, -1, dtype=np.int64)
+        depth[0] = 0
+        children = [[] for _ in range(n)]
+        for v in range(1, n):
+            children[parent[v]].append(v)
+        stack = [0]
+        while stack:
+            u = stack.pop()
+            for v in children[u]:
+                depth[v] = depth[u] + 1
+                stack.append(v)
+        self.depth = depth
+        levels = max(1, int(depth.max()).bit_length())
+        up = np.empty((levels, n), dtype=np.int64)
+        low = np.empty((levels, n))
+        up[0] = parent
+        low[0] = np.where(np.arange(n) == 0, np.inf, self.weight)
+        for k in range(1, levels):
+            up[k] = up[k - 1][up[k - 1]]
+            low[k] = np.minimum(low[k - 1], low[k - 1][up[k - 1]])
+        self.up, self.low = up, low
+
+    # min-cut value between u and v: lightest edge on their tree path, O(log n)
+    def query(self, u, v):
+        if u == v:
+            return np.inf
+        best = np.inf
+        if self.depth[u] < self.depth[v]:
+            u, v = v, u
+        diff = int(self.depth[u] - self.depth[v])
+        k = 0
+        while diff:
+            if diff & 1:
+                best = min(best, self.low[k, u])
+                u = self.up[k, u]
+            diff >>= 1
+            k += 1
+        if u == v:
+            return best
+        for k in range(len(self.up) - 1, -1, -1):
+            if self.up[k, u] != self.up[k, v]:
+                best = min(best, self.low[k, u], self.low[k, v])
+                u, v = self.up[k, u], self.up[k, v]
+        return min(best, self.low[0, u], self.low[0, v])
+
+    # nodes on u's side of a minimum u-v cut: cut the lightest tree edge on the path
+    def cut(self, u, v):
+        # tree path edges are named by their lower node
+        a, b, path = u, v, []
+        while a != b:
+            if self.depth[a] >= self.depth[b]:
+                path.append(a)
+                a = self.parent[a]
+            else:
+                path.append(b)
+                b = self.parent[b]
+        child = min(path, key=lambda w: self.weight[w])
+        # subtree of child
+        below = np.zeros(self.n, dtype=bool)
+        order = np.argsort(self.depth, kind="stable")
+        below[child] = True
+        for w in order.tolist():
+            if w != child and self.depth[w] > self.depth[child] and below[self.parent[w]]:
+                below[w] = True
+        return below if below[u] else ~below
+
+    # full n x n matrix of min-cut values, one tree traversal per node
+    def matrix(self):
+        n = self.n
+        neighbours = [[] for _ in range(n)]
+        for v in range(1, n):
+            neighbours[v].append((self.parent[v], self.weight[v]))
+            neighbours[self.parent[v]].append((v, self.weight[v]))
+        values = np.full((n, n), np.inf)
+        for root in range(n):
+            stack = [(root, -1, np.inf)]
+            while stack:
+                u, prev, lowest = stack.pop()
+                values[root, u] = lowest
+                for w, c in neighbours[u]:
+                    if w != prev:
+                        stack.append((w, u, min(lowest, c)))
+        return values
+
+
+if __name__ == "__main__":
+    # random undirected service network
+    rng = np.random.default_rng(0)
+    n, m = 300, 1200
+    u = rng.integers(0, n, m)
+    v = rng.integers(0, n, m)
+    keep = u != v
+    # ring so the network is connected
+    u = np.concatenate([np.arange(n), u[keep]])
+    v = np.concatenate([(np.arange(n) + 1) % n, v[keep]])
+    graph = undirected(n, u, v, rng.integers(1, 20, len(u)))
+    for workers in (None, 4):
+        tick = time.perf_counter()
+        tree = GomoryHuTree(graph, workers=workers)
+        print(f"Gomory-Hu tree with {workers or 1} worker(s): {tree.flows} max flows, {time.perf_counter() - tick:.2f}s")
+    # spot-check pairs against direct max flows
+    pairs = rng.integers(0, n, (200, 2))
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    tick = time.perf_counter()
+    values = [tree.query(a, b) for a, b in pairs]
+    print(f"{len(pairs)} tree queries: {1000 * (time.perf_counter() - tick):.2f}ms")
+    for (a, b), value in zip(pairs[:20], values):
+        direct, _, _ = max_flow(graph, a, b)
+        assert abs(direct - value) <= 1e-6, (a, b, direct, value)
+        side = tree.cut(a, b)
+        crossing = side[graph.tail] & ~side[graph.head]
+        assert side[a] and not side[b] and abs(graph.capacity[crossing].sum() - value) <= 1e-6
+    print("Tree values and cuts match direct max-flow computations.")
@@ -0,0 +1,131 @@
+import itertools
+
+import numpy as np
+import scipy.sparse as sp
+
+# graph versions are drawn from one counter, so a (version, ...) key never matches another graph
+_versions = itertools.count()
+
+
+# arcs grouped by one endpoint: arc ids in endpoint order and per-node offsets
+def csr_index(n, endpoint):
+    order = np.argsort(endpoint, kind="stable").astype(np.int32)
+    ptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(endpoint, minlength=n), out=ptr[1:])
+    return order, ptr
+
+
+# directed graph kept as flat arc arrays (tail, head, capacity, cost) in input order,
+# with CSR (outgoing) and CSC (incoming) indexes over the arc ids
+class Graph:
+
+    def __init__(self, n, tail, head, capacity=None, cost=None, names=None, index=None):
+        self.n = int(n)
+        self.tail = np.asarray(tail, dtype=np.int32)
+        self.head = np.asarray(head, dtype=np.int32)
+        self.m = len(self.tail)
+        self.capacity = np.full(self.m, np.inf) if capacity is None else np.asarray(capacity, dtype=np.float64)
+        self.cost = np.zeros(self.m) if cost is None else np.asarray(cost, dtype=np.float64)
+        # optional node labels, ids are positions in the list
+        self.names = list(names) if names is not None else None
+        self._index = {name: i for i, name in enumerate(self.names)} if names is not None else None
+        # outgoing arcs of node v are out_arc[out_ptr[v]:out_ptr[v+1]],
+        # incoming arcs of node v are in_arc[in_ptr[v]:in_ptr[v+1]];
+        # index passes these in precomputed, e.g. memory-mapped from disk
+        if index is None:
+            index = csr_index(self.n, self.tail) + csr_index(self.n, self.head)
+        self.out_arc, self.out_ptr, self.in_arc, self.in_ptr = index
+        self.version = next(_versions)
+        # data derived from the arcs by the solvers, see derived()
+        self._derived = {}
+
+    # change arc data in place; the new version invalidates anything cached for the old one.
+    # arrays that cannot be written, such as read-only memory maps, are copied into memory first
+    def update(self, arcs, capacity=None, cost=None):
+        if capacity is not None:
+            if not self.capacity.flags.writeable:
+                self.capacity = np.array(self.capacity)
+            self.capacity[arcs] = capacity
+        if cost is not None:
+            if not self.cost.flags.writeable:
+                self.cost = np.array(self.cost)
+            self.cost[arcs] = cost
+        self.version = next(_versions)
+        self._derived.clear()
+
+    # build(graph) stored under key, e.g. a solver's adjacency lists, rebuilt once the version changes
+    def derived(self, key, build):
+        version, value = self._derived.get(key, (None, None))
+        if version != self.version:
+            value = build(self)
+            self._derived[key] = (self.version, value)
+        return value
+
+    # build from node labels and a dict keyed by (i, j), the same data gp.multidict takes;
+    # fields names what each arc value holds
+    @classmethod
+    def from_dict(cls, nodes, arcs, fields=("capacity", "cost")):
+        index = {name: i for i, name in enumerate(nodes)}
+        tail = [index[i] for i, _ in arcs]
+        head = [index[j] for _, j in arcs]
+        values = np.array(list(arcs.values()), dtype=np.float64).reshape(len(arcs), -1)
+        data = {field: values[:, k] for k, field in enumerate(fields[:values.shape[1]])}
+        return cls(len(nodes), tail, head, names=nodes, **data)
+
+    # node id from a label (ids pass through)
+    def index(self, node):
+        return self._index[node] if self._index is not None and node in self._index else int(node)
+
+    # source and sink ids of a flow problem, which must be different nodes
+    def terminals(self, s, t):
+        s, t = self.index(s), self.index(t)
+        if s == t:
+            raise ValueError(f"Source and sink are the same node {self.name(s)!r}.")
+        return s, t
+
+    # node label from an id
+    def name(self, v):
+        return self.names[v] if self.names is not None else int(v)
+
+    def out_arcs(self, v):
+        return self.out_arc[self.out_ptr[v]:self.out_ptr[v + 1]]
+
+    def in_arcs(self, v):
+        return self.in_arc[self.in_ptr[v]:self.in_ptr[v + 1]]
+
+    # labelled (tail, head) pairs in arc order
+    def arcs(self):
+        return [(self.name(i), self.name(j)) for i, j in zip(self.tail.tolist(), self.head.tolist())]
+
+    # node-arc incidence matrix (+1 at the tail, -1 at the head), so A @ x is outflow - inflow;
+    # each column holds exactly two entries, so it is assembled directly in CSC form
+    def incidence(self):
+        indices = np.empty(2 * self.m, dtype=np.int32)
+        indices[0::2], indices[1::2] = self.tail, self.head
+        data = np.tile(np.array([1.0, -1.0]), self.m)
+        indptr = np.arange(0, 2 * self.m + 1, 2, dtype=np.int64)
+        A = sp.csc_matrix((data, indices, indptr), shape=(self.n, self.m))
+        A.sum_duplicates()
+        return A.tocsr()
+
+
+# rows x cols grid with right/down arcs and random capacities and costs, s = 0 and t = n - 1
+def grid_graph(rows, cols, low=1, high=100, seed=0):
+    rng = np.random.default_rng(seed)
+    ids = np.arange(rows * cols).reshape(rows, cols)
+    tail = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    head = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    m = len(tail)
+    return Graph(rows * cols, tail, head, rng.integers(low, high, m), rng.integers(low, high, m))
+
+
+# n nodes and about m random arcs without self-loops, plus a Hamiltonian path so every node is reachable
+def random_graph(n, m, low=1, high=100, seed=0):
+    rng = np.random.default_rng(seed)
+    tail = rng.integers(0, n, m)
+    head = rng.integers(0, n, m)
+    keep = tail != head
+    tail = np.concatenate([np.arange(n - 1), tail[keep]])
+    head = np.concatenate([np.arange(1, n), head[keep]])
+    k = len(tail)
+    return Graph(n, tail, head, rng.integers(low, high, k), rng.integers(low, high, k))
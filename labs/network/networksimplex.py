@@ -0,0 +1,287 @@
+import time
+
+import numpy as np
+
+from .graph import Graph, random_graph
+
+# arc states: in the spanning tree, nontree at its lower bound, nontree at its upper bound
+TREE, LOWER, UPPER = 0, 1, -1
+
+
+# primal network simplex for min-cost flow (outflow - inflow = supply, 0 <= x <= capacity)
+# on a spanning-tree basis rooted at an artificial node; the basis is kept between solves,
+# so changed supplies, capacities or costs are re-solved from the previous tree
+class NetworkSimplex:
+
+    def __init__(self, graph, supply, block=None):
+        self.graph = graph
+        n, m = graph.n, graph.m
+        self.n, self.m, self.root = n, m, n
+        self.supply = np.asarray(supply, dtype=np.float64).copy()
+        # real arcs followed by one artificial arc per node joining it to the root
+        self.tail = np.concatenate([graph.tail, np.arange(n)]).astype(np.int64)
+        self.head = np.concatenate([graph.head, np.full(n, n)]).astype(np.int64)
+        self.cap = np.concatenate([graph.capacity, np.full(n, np.inf)])
+        self.cost = np.concatenate([graph.cost, np.zeros(n)])
+        self.flow = np.zeros(m + n)
+        self.state = np.full(m + n, LOWER, dtype=np.int8)
+        # block pricing scans this many arcs per candidate list
+        self.block = block or max(64, int(np.sqrt(m + n)))
+        self.pos = 0
+        self.pivots = 0
+        self._penalty()
+        # tree over n + 1 nodes
+        self.parent = np.full(n + 1, -1, dtype=np.int64)
+        self.parent_arc = np.full(n + 1, -1, dtype=np.int64)
+        self.depth = np.zeros(n + 1, dtype=np.int64)
+        self.y = np.zeros(n + 1)
+        self.children = [set() for _ in range(n + 1)]
+        # cold start: every node hangs off the root by its artificial arc
+        for v in range(n):
+            self._attach(v)
+        self._flows()
+        self._potentials()
+
+    # artificial arcs cost more than any path of real arcs
+    def _penalty(self):
+        real = np.abs(self.cost[:self.m])
+        self.big = 1.0 + (self.n + 1) * (real.max() if len(real) else 1.0)
+        self.cost[self.m:] = self.big
+        self.tol = 1e-9 * self.big
+
+    # hang v directly off the root through its artificial arc
+    def _attach(self, v):
+        if self.parent[v] >= 0:
+            self.children[self.parent[v]].discard(v)
+        a = self.m + v
+        self.parent[v], self.parent_arc[v] = self.root, a
+        self.children[self.root].add(v)
+        self.state[a] = TREE
+
+    # tree flows from the nontree flows and supplies, leaves first; a tree arc pushed outside
+    # its bounds becomes nontree at that bound and its subtree is re-hung on the root
+    def _flows(self):
+        n, m = self.n, self.m
+        self.ftol = 1e-9 * max(1.0, np.abs(self.supply).max(initial=0.0))
+        nontree = np.flatnonzero(self.state != TREE)
+        f = self.flow[nontree]
+        imbalance = np.concatenate([self.supply, [0.0]])
+        imbalance -= np.bincount(self.tail[nontree], weights=f, minlength=n + 1)
+        imbalance += np.bincount(self.head[nontree], weights=f, minlength=n + 1)
+        order = np.argsort(-self.depth[:n], kind="stable")
+        for v in order.tolist():
+            a, p = self.parent_arc[v], self.parent[v]
+            out = self.tail[a] == v
+            x = imbalance[v] if out else -imbalance[v]
+            if a >= m:
+                # artificial arcs may point either way
+                if x < 0:
+                    self.tail[a], self.head[a] = self.head[a], self.tail[a]
+                    x = -x
+                self.flow[a] = x
+            elif x < -self.ftol or x > self.cap[a] + self.ftol:
+                bound = 0.0 if x < 0 else self.cap[a]
+                self.flow[a], self.state[a] = bound, LOWER if x < 0 else UPPER
+                export = bound if out else -bound
+                self._attach(v)
+                self.tail[m + v], self.head[m + v] = (v, self.root) if imbalance[v] - export >= 0 else (self.root, v)
+                self.flow[m + v] = abs(imbalance[v] - export)
+                imbalance[p] += export
+                continue
+            else:
+                self.flow[a] = x
+            imbalance[p] += imbalance[v]
+
+    # node potentials and depths from the root, reduced cost zero on every tree arc
+    def _potentials(self):
+        self.y[self.root], self.depth[self.root] = 0.0, 0
+        stack = [self.root]
+        while stack:
+            u = stack.pop()
+            for v in self.children[u]:
+                a = self.parent_arc[v]
+                self.y[v] = self.y[u] - self.cost[a] if self.tail[a] == u else self.y[u] + self.cost[a]
+                self.depth[v] = self.depth[u] + 1
+                stack.append(v)
+
+    # block pricing: most violating arc in the next block that has one, -1 at optimality
+    def _entering(self):
+        total = self.m + self.n
+        scanned = 0
+        while scanned < total:
+            start = self.pos
+            stop = min(start + self.block, total)
+            rc = self.cost[start:stop] - self.y[self.tail[start:stop]] + self.y[self.head[start:stop]]
+            violation = -self.state[start:stop] * rc
+            k = int(violation.argmax())
+            self.pos = stop % total
+            scanned += stop - start
+            if violation[k] > self.tol:
+                return start + k
+        return -1
+
+    # one pivot on entering arc e
+    def _pivot(self, e):
+        parent, parent_arc, tail = self.parent, self.parent_arc, self.tail
+        # orient the cycle along the improving direction of e: first -> second
+        first, second = (tail[e], self.head[e]) if self.state[e] == LOWER else (self.head[e], tail[e])
+        # join node of the two tree paths
+        u, v = first, second
+        up_first, up_second = [], []
+        while u != v:
+            if self.depth[u] >= self.depth[v]:
+                up_first.append(u)
+                u = parent[u]
+            else:
+                up_second.append(v)
+                v = parent[v]
+        # cycle from the apex: down to first, across e, up from second;
+        # each entry is (arc, forward?, child node of the arc in the tree)
+        cycle = [(parent_arc[w], tail[parent_arc[w]] == parent[w], w) for w in reversed(up_first)]
+        cycle.append((e, self.state[e] == LOWER, -1))
+        cycle += [(parent_arc[w], tail[parent_arc[w]] == w, w) for w in up_second]
+        # largest step, the last blocking arc leaves (strongly feasible rule)
+        theta, leave = np.inf, None
+        for k, (a, forward, _) in enumerate(cycle):
+            room = self.cap[a] - self.flow[a] if forward else self.flow[a]
+            if room <= theta:
+                theta, leave = room, k
+        if not np.isfinite(theta):
+            raise ValueError("Unbounded: negative-cost cycle with unlimited capacity.")
+        for a, forward, _ in cycle:
+            self.flow[a] += theta if forward else -theta
+        self.pivots += 1
+        f, _, c = cycle[leave]
+        if f == e:
+            # e moves straight to its other bound
+            self.state[e] = UPPER if self.state[e] == LOWER else LOWER
+            return
+        self.state[f] = LOWER if self.flow[f] <= self.ftol else UPPER
+        self.state[e] = TREE
+        # re-hang the subtree below f from the endpoint of e inside it
+        q, other = (first, second) if leave < len(up_first) else (second, first)
+        rc = self.cost[e] - self.y[tail[e]] + self.y[self.head[e]]
+        shift = -rc if q == self.head[e] else rc
+        path = []
+        w = q
+        while w != c:
+            path.append(w)
+            w = parent[w]
+        path.append(c)
+        self.children[parent[c]].discard(c)
+        new_parent, new_arc = other, e
+        for w in path:
+            old_parent, old_arc = parent[w], parent_arc[w]
+            if old_parent >= 0 and w != c:
+                self.children[old_parent].discard(w)
+            parent[w], parent_arc[w] = new_parent, new_arc
+            self.children[new_parent].add(w)
+            new_parent, new_arc = w, old_arc
+        # shift potentials and depths of the moved subtree
+        self.y[q] += shift
+        self.depth[q] = self.depth[other] + 1
+        stack = [q]
+        while stack:
+            u = stack.pop()
+            for w in self.children[u]:
+                self.y[w] += shift
+                self.depth[w] = self.depth[u] + 1
+                stack.append(w)
+
+    # pivot to optimality, returns the cost and the flow on the real arcs
+    def solve(self, max_pivots=None):
+        while max_pivots is None or self.pivots < max_pivots:
+            e = self._entering()
+            if e < 0:
+                break
+            self._pivot(e)
+        if (self.flow[self.m:] > 1e3 * self.ftol).any():
+            raise ValueError("Infeasible: supplies cannot be routed within the capacities.")
+        flow = self.flow[:self.m].copy()
+        return float(self.cost[:self.m] @ flow), flow
+
+    # warm restart: change supplies and/or arc data, keep the current tree; only the solver's own copies
+    # of the arc data change, the graph (possibly read-only, from graphio.load) is left as it is
+    def update(self, supply=None, arcs=None, capacity=None, cost=None):
+        if supply is not None:
+            self.supply = np.asarray(supply, dtype=np.float64).copy()
+        if arcs is not None:
+            if capacity is not None:
+                self.cap[arcs] = capacity
+            if cost is not None:
+                self.cost[arcs] = cost
+                self._penalty()
+        # nontree arcs sit on their (possibly new) bounds
+        upper = self.state == UPPER
+        infinite = upper & ~np.isfinite(self.cap)
+        self.state[infinite] = LOWER
+        upper &= ~infinite
+        self.flow[upper] = self.cap[upper]
+        self.flow[self.state == LOWER] = 0.0
+        self._flows()
+        self._potentials()
+
+
+# one-shot min-cost flow
+def min_cost_flow(graph, supply):
+    return NetworkSimplex(graph, supply).solve()
+
+
+# random transportation-style instance: first k nodes supply, last k demand
+def random_instance(n, m, k, seed=0):
+    graph = random_graph(n, m, seed=seed)
+    # raise capacities so the instance stays feasible, as a new graph with a version of its own
+    graph = Graph(graph.n, graph.tail, graph.head, graph.capacity * 10, graph.cost)
+    rng = np.random.default_rng(seed)
+    supply = np.zeros(n)
+    amount = rng.integers(10, 100, k).astype(float)
+    supply[:k] = amount
+    supply[-k:] = -rng.permutation(amount)
+    return graph, supply
+
+
+if __name__ == "__main__":
+    # lab instance
+    nodes = ["Warehouse1", "Warehouse2", "Retailer1", "Retailer2"]
+    supply_demand = {"Warehouse1": 20, "Warehouse2": 30, "Retailer1": -25, "Retailer2": -25}
+    graph = Graph.from_dict(nodes, {
+        ("Warehouse1", "Retailer1"): [15, 4],
+        ("Warehouse1", "Retailer2"): [10, 3],
+        ("Warehouse2", "Retailer1"): [20, 3],
+        ("Warehouse2", "Retailer2"): [15, 1],
+        ("Retailer1", "Retailer2"): [10, 5]
+    })
+    cost, flow = min_cost_flow(graph, [supply_demand[i] for i in nodes])
+    print(f"Minimum Cost: {cost}")
+    for (i, j), x in zip(graph.arcs(), flow):
+        if x > 0:
+            print(f"  Send {x:.0f} units from {i} to {j}")
+    print()
+    # daily re-solves after changing a few percent of arcs
+    graph, supply = random_instance(20000, 100000, 200)
+    solver = NetworkSimplex(graph, supply)
+    tick = time.perf_counter()
+    cost, _ = solver.solve()
+    print(f"Day 0: cost {cost:.0f}, {solver.pivots} pivots, {time.perf_counter() - tick:.2f}s")
+    rng = np.random.default_rng(1)
+    for day in range(1, 4):
+        arcs = rng.choice(graph.m, size=graph.m // 50, replace=False)
+        new_cost = graph.cost[arcs] * rng.uniform(0.8, 1.2, len(arcs))
+        new_capacity = graph.capacity[arcs] * rng.uniform(0.8, 1.2, len(arcs))
+        new_supply = supply.copy()
+        new_supply[:200] *= 1.05
+        new_supply[-200:] *= 1.05
+        start = solver.pivots
+        tick = time.perf_counter()
+        solver.update(supply=new_supply, arcs=arcs, capacity=new_capacity, cost=new_cost)
+        cost, _ = solver.solve()
+        warm = time.perf_counter() - tick
+        warm_pivots = solver.pivots - start
+        graph.update(arcs, capacity=new_capacity, cost=new_cost)
+        tick = time.perf_counter()
+        cold = NetworkSimplex(graph, new_supply)
+        cold_cost, _ = cold.solve()
+        print(f"Day {day}: cost {cost:.0f}, warm {warm_pivots} pivots {warm:.2f}s, "
+              f"cold {cold.pivots} pivots {time.perf_counter() - tick:.2f}s")
+        assert abs(cost - cold_cost) <= 1e-6 * abs(cold_cost)
+        supply = new_supply
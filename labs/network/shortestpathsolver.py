@@ -0,0 +1,227 @@
+import heapq
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from .graph import Graph, grid_graph, random_graph
+
+inf = float("inf")
+
+
+# forward (CSR) and backward (CSC) adjacency as plain lists
+def adjacency_lists(graph):
+    out_arc = graph.out_arc
+    in_arc = graph.in_arc
+    return (graph.out_ptr.tolist(), graph.head[out_arc].tolist(), graph.cost[out_arc].tolist(), out_arc.tolist(),
+            graph.in_ptr.tolist(), graph.tail[in_arc].tolist(), graph.cost[in_arc].tolist(), in_arc.tolist())
+
+
+# adjacency lists kept on the graph, rebuilt only when the graph version changes
+def adjacency(graph):
+    return graph.derived("adjacency", adjacency_lists)
+
+
+# binary-heap Dijkstra from s, optionally stopping once target is settled;
+# returns distances and the arc used to reach each node (-1 for none)
+def dijkstra(graph, s, target=None):
+    ptr, to, length, arc = adjacency(graph)[:4]
+    n = graph.n
+    dist = [inf] * n
+    pred = [-1] * n
+    done = [False] * n
+    dist[s] = 0.0
+    heap = [(0.0, s)]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if done[v]:
+            continue
+        done[v] = True
+        if v == target:
+            break
+        for i in range(ptr[v], ptr[v + 1]):
+            w = to[i]
+            nd = d + length[i]
+            if nd < dist[w]:
+                dist[w] = nd
+                pred[w] = arc[i]
+                heapq.heappush(heap, (nd, w))
+    return np.array(dist), np.array(pred, dtype=np.int64)
+
+
+# SPFA (queue-based Bellman-Ford) for negative arc costs, raises on a negative cycle
+def bellman_ford(graph, s):
+    ptr, to, length, arc = adjacency(graph)[:4]
+    n = graph.n
+    dist = [inf] * n
+    pred = [-1] * n
+    queued = [False] * n
+    # number of arcs on the current shortest path, reaching n means a cycle
+    hops = [0] * n
+    dist[s] = 0.0
+    queue = deque([s])
+    queued[s] = True
+    while queue:
+        v = queue.popleft()
+        queued[v] = False
+        d = dist[v]
+        for i in range(ptr[v], ptr[v + 1]):
+            w = to[i]
+            nd = d + length[i]
+            if nd < dist[w]:
+                dist[w] = nd
+                pred[w] = arc[i]
+                hops[w] = hops[v] + 1
+                if hops[w] >= n:
+                    raise ValueError("Graph contains a negative-cost cycle.")
+                if not queued[w]:
+                    queued[w] = True
+                    queue.append(w)
+    return np.array(dist), np.array(pred, dtype=np.int64)
+
+
+# bidirectional Dijkstra for one s-t query, returns the distance and the arcs of the path
+def bidirectional(graph, s, t):
+    fptr, fto, flen, farc, bptr, bto, blen, barc = adjacency(graph)
+    if s == t:
+        return 0.0, []
+    dist = ({s: 0.0}, {t: 0.0})
+    pred = ({s: -1}, {t: -1})
+    done = (set(), set())
+    heaps = ([(0.0, s)], [(0.0, t)])
+    sides = ((fptr, fto, flen, farc), (bptr, bto, blen, barc))
+    best, meet = inf, -1
+    while heaps[0] and heaps[1]:
+        # stop once no path through unsettled nodes can beat the best one found
+        if heaps[0][0][0] + heaps[1][0][0] >= best:
+            break
+        # expand the side with the smaller frontier
+        k = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+        d, v = heapq.heappop(heaps[k])
+        if v in done[k]:
+            continue
+        done[k].add(v)
+        ptr, to, length, arc = sides[k]
+        for i in range(ptr[v], ptr[v + 1]):
+            w = to[i]
+            nd = d + length[i]
+            if nd < dist[k].get(w, inf):
+                dist[k][w] = nd
+                pred[k][w] = arc[i]
+                heapq.heappush(heaps[k], (nd, w))
+            if w in dist[1 - k] and nd + dist[1 - k][w] < best:
+                best, meet = nd + dist[1 - k][w], w
+    if meet < 0:
+        return inf, []
+    # stitch the two halves at the meeting node
+    path, v = [], meet
+    while pred[0][v] >= 0:
+        path.append(pred[0][v])
+        v = int(graph.tail[pred[0][v]])
+    path.reverse()
+    v = meet
+    while pred[1][v] >= 0:
+        path.append(pred[1][v])
+        v = int(graph.head[pred[1][v]])
+    return best, path
+
+
+# arcs of the tree path from the root to t
+def tree_path(graph, pred, t):
+    path = []
+    while pred[t] >= 0:
+        path.append(int(pred[t]))
+        t = graph.tail[pred[t]]
+    path.reverse()
+    return path
+
+
+# least-recently-used store of shortest-path trees keyed by (graph version, source)
+class TreeCache:
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.trees = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, graph, s):
+        key = (graph.version, s)
+        if key in self.trees:
+            self.hits += 1
+            self.trees.move_to_end(key)
+            return self.trees[key]
+        self.misses += 1
+        tree = bellman_ford(graph, s) if (graph.cost < 0).any() else dijkstra(graph, s)
+        self.trees[key] = tree
+        if len(self.trees) > self.maxsize:
+            self.trees.popitem(last=False)
+        return tree
+
+    def clear(self):
+        self.trees.clear()
+        self.hits = self.misses = 0
+
+
+cache = TreeCache()
+
+
+# full shortest-path tree from s (distances, predecessor arcs), served from the cache
+def tree(graph, s, cache=cache):
+    return cache.get(graph, graph.index(s))
+
+
+# single s-t query: bidirectional Dijkstra for nonnegative costs, SPFA otherwise
+def shortest_path(graph, s, t):
+    s, t = graph.index(s), graph.index(t)
+    if (graph.cost < 0).any():
+        dist, pred = bellman_ford(graph, s)
+        return dist[t], tree_path(graph, pred, t) if np.isfinite(dist[t]) else []
+    return bidirectional(graph, s, t)
+
+
+# many (source, target) queries answered with one tree per distinct source
+def batch(graph, pairs, paths=False, cache=cache):
+    pairs = [(graph.index(s), graph.index(t)) for s, t in pairs]
+    dist = np.empty(len(pairs))
+    routes = [None] * len(pairs) if paths else None
+    by_source = {}
+    for k, (s, t) in enumerate(pairs):
+        by_source.setdefault(s, []).append(k)
+    for s, queries in by_source.items():
+        d, pred = cache.get(graph, s)
+        targets = [pairs[k][1] for k in queries]
+        dist[queries] = d[targets]
+        if paths:
+            for k, t in zip(queries, targets):
+                routes[k] = tree_path(graph, pred, t) if np.isfinite(d[t]) else []
+    return (dist, routes) if paths else dist
+
+
+if __name__ == "__main__":
+    # lab instance
+    nodes = ["A", "B", "C", "D"]
+    graph = Graph.from_dict(nodes, {("A", "B"): 4, ("A", "C"): 2, ("B", "C"): 1, ("C", "D"): 3}, fields=("cost",))
+    distance, path = shortest_path(graph, "A", "D")
+    print(f"Optimal Distance: {distance}")
+    print("Edges used in the shortest path:")
+    for a in path:
+        print(f"  {graph.name(graph.tail[a])} → {graph.name(graph.head[a])}")
+    print()
+    # batched queries on a road-like grid and a random graph
+    rng = np.random.default_rng(0)
+    for label, graph in (("grid 300x300", grid_graph(300, 300)), ("random 100000/500000", random_graph(100000, 500000))):
+        cache.clear()
+        pairs = list(zip(rng.integers(0, 20, 5000).tolist(), rng.integers(0, graph.n, 5000).tolist()))
+        tick = time.perf_counter()
+        dist = batch(graph, pairs)
+        cold = time.perf_counter() - tick
+        tick = time.perf_counter()
+        batch(graph, pairs)
+        warm = time.perf_counter() - tick
+        tick = time.perf_counter()
+        for s, t in pairs[:20]:
+            d, _ = shortest_path(graph, s, t)
+            assert d == dist[pairs.index((s, t))]
+        single = (time.perf_counter() - tick) / 20
+        print(f"{label}: {len(pairs)} queries from {len({s for s, _ in pairs})} sources, "
+              f"cold {cold:.2f}s, cached {1000 * warm:.1f}ms, bidirectional {1000 * single:.1f}ms per query")
@@ -0,0 +1,35 @@
+import numpy as np
+
+# scenarios are (n, 3) arrays of wheat, corn and beet yields per acre with optional probabilities,
+# equally likely by default; the LP modules load on first call
+
+
+# extensive form of the two-stage farmer problem: expected net profit and acres per crop
+def farmer(yields, probabilities=None):
+    from .farm import extensive, scenario_dicts
+    profit, planting = extensive(*scenario_dicts(yields, probabilities))
+    return {"profit": profit, "planting": planting}
+
+
+# Benders decomposition of the same problem, plain ("kelley") or regularized ("level", "trust",
+# "proximal"), with its iteration log
+def benders(yields, probabilities=None, method="kelley", **kwargs):
+    from .farm import scenario_dicts
+    from .regularized import benders
+    return benders(*scenario_dicts(yields, probabilities), method=method, **kwargs)
+
+
+# SDDP for the multi-year farmer problem over stage-wise independent yield realizations
+# (stages x n x 3); the cut store is reduced to its size
+def sddp(realizations, probs=None, **kwargs):
+    from .multistage import sddp
+    result = sddp(realizations, probs, **kwargs)
+    result["cuts"] = int(result["cuts"].count.sum())
+    return result
+
+
+# k representative scenarios of X by forward selection or backward reduction, no LP involved
+def reduce(X, probs=None, k=10, method="forward", **kwargs):
+    from .reduction import reduce
+    scenarios, probabilities, distance = reduce(np.asarray(X, dtype=np.float64), probs, k, method, **kwargs)
+    return {"scenarios": scenarios, "probabilities": probabilities, "distance": distance}
@@ -0,0 +1,109 @@
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+
+# data setup
+planting_cost = {"wheat": 150, "corn": 230, "beets": 260}
+purchase_cost = {"wheat": 238, "corn": 210}
+selling_price = {"wheat": 170, "corn": 150, "beets_high": 36, "beets_low": 10}
+feed_requirements = {"wheat": 200, "corn": 240}
+land_available = 500
+beet_sale_limit = 6000
+
+# scenarios and probabilities
+expected_yields = {"wheat": 2.5, "corn": 3, "beets": 20}
+scenarios = [1, 2, 3]
+yields = {
+    1: {crop: yield_val for crop, yield_val in expected_yields.items()},    # Scenario 1: Expected yields
+    2: {crop: 1.2 * yield_val for crop, yield_val in expected_yields.items()},  # Scenario 2: 20% higher yields
+    3: {crop: 0.8 * yield_val for crop, yield_val in expected_yields.items()}   # Scenario 3: 20% lower yields
+}
+probabilities = {1: 1/3, 2: 1/3, 3: 1/3}
+
+# crop order used by array-based code
+crops = list(planting_cost.keys())
+
+
+# second-stage cost (negative profit) for one yield realization and fixed planting values
+def recourse(scenario_yields, planting):
+    # create Gurobi model
+    subprob = gp.Model("Subproblem")
+    # turn off log
+    subprob.Params.outputFlag = 0
+    # decision variables
+    sales = subprob.addVars(selling_price.keys(), vtype=GRB.CONTINUOUS, name="sales")
+    purchase = subprob.addVars(purchase_cost.keys(), vtype=GRB.CONTINUOUS, name="purchases")
+    # objective function
+    revenue = gp.quicksum(sales[crop] * selling_price[crop] for crop in selling_price)
+    purchase_cost_total = gp.quicksum(purchase[crop] * purchase_cost[crop] for crop in purchase_cost)
+    subprob.setObjective(- revenue + purchase_cost_total, GRB.MINIMIZE)
+    # constraints
+    subprob.addConstr(scenario_yields["wheat"] * planting["wheat"] + purchase["wheat"] - sales["wheat"] >= feed_requirements["wheat"], "Wheat Balance")
+    subprob.addConstr(scenario_yields["corn"] * planting["corn"] + purchase["corn"] - sales["corn"] >= feed_requirements["corn"], "Corn Balance")
+    subprob.addConstr(scenario_yields["beets"] * planting["beets"] - sales["beets_high"] - sales["beets_low"] >= 0, "Beet Balance")
+    subprob.addConstr(sales["beets_high"] <= beet_sale_limit, "Beets Limit")
+    return subprob
+
+
+# solve the recourse problem and return its value with a subgradient w.r.t. planting
+def recourse_cut(scenario_yields, planting):
+    subprob = recourse(scenario_yields, planting)
+    subprob.optimize()
+    # extract dual variables from subproblem constraints
+    dual_wheat = subprob.getConstrByName("Wheat Balance").pi
+    dual_corn = subprob.getConstrByName("Corn Balance").pi
+    dual_beets = subprob.getConstrByName("Beet Balance").pi
+    # Q(x) >= Q(x_hat) + g (x - x_hat)
+    grad = {"wheat": - dual_wheat * scenario_yields["wheat"],
+            "corn": - dual_corn * scenario_yields["corn"],
+            "beets": - dual_beets * scenario_yields["beets"]}
+    return subprob.objVal, grad
+
+
+# extensive form over any scenario set, returns net profit and planting
+def extensive(yields, probabilities):
+    scenarios = list(yields.keys())
+    # create Gurobi model
+    m = gp.Model("Extensive Form")
+    # turn off log
+    m.Params.outputFlag = 0
+    # decision variables
+    planting = m.addVars(planting_cost.keys(), vtype=GRB.CONTINUOUS, name="plants")
+    purchase = m.addVars(scenarios, purchase_cost.keys(), vtype=GRB.CONTINUOUS, name="purchases")
+    sales = m.addVars(scenarios, selling_price.keys(), vtype=GRB.CONTINUOUS, name="sales")
+    # objective function
+    revenue = gp.quicksum(probabilities[sc] * sales[sc, crop] * selling_price[crop] for crop in selling_price for sc in scenarios)
+    planting_cost_total = gp.quicksum(planting[crop] * planting_cost[crop] for crop in planting_cost)
+    purchase_cost_total = gp.quicksum(probabilities[sc] * purchase[sc, crop] * purchase_cost[crop] for crop in purchase_cost for sc in scenarios)
+    m.setObjective(revenue - planting_cost_total - purchase_cost_total, GRB.MAXIMIZE)
+    # constraints
+    m.addConstrs((yields[sc]["wheat"] * planting["wheat"] + purchase[sc, "wheat"] - sales[sc, "wheat"] >= feed_requirements["wheat"]
+                  for sc in scenarios), "Wheat Balance")
+    m.addConstrs((yields[sc]["corn"] * planting["corn"] + purchase[sc, "corn"] - sales[sc, "corn"] >= feed_requirements["corn"]
+                  for sc in scenarios), "Corn Balance")
+    m.addConstrs((yields[sc]["beets"] * planting["beets"] - sales[sc, "beets_high"] - sales[sc, "beets_low"] >= 0
+                  for sc in scenarios), "Beet Balance")
+    m.addConstrs((sales[sc, "beets_high"] <= beet_sale_limit for sc in scenarios), "Beets Limit")
+    m.addConstr(planting.sum() <= land_available, "Land Balance")
+    # solve the model
+    m.optimize()
+    return m.objVal, {crop: planting[crop].x for crop in planting}
+
+
+# expected net profit of a fixed planting decision over a scenario set
+def evaluate(planting, yields, probabilities):
+    profit = - sum(planting[crop] * planting_cost[crop] for crop in planting_cost)
+    for sc in yields:
+        Q_value, _ = recourse_cut(yields[sc], planting)
+        profit -= probabilities[sc] * Q_value
+    return profit
+
+
+# convert an (n, 3) yield array and probability vector into scenario dicts
+def scenario_dicts(yield_array, probs=None):
+    yield_array = np.asarray(yield_array, dtype=float)
+    if probs is None:
+        probs = np.full(len(yield_array), 1 / len(yield_array))
+    yields = {sc + 1: dict(zip(crops, row.tolist())) for sc, row in enumerate(yield_array)}
+    probabilities = {sc + 1: float(p) for sc, p in enumerate(probs)}
+    return yields, probabilities
@@ -0,0 +1,261 @@
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import gurobipy as gp
+import numpy as np
+from gurobipy import GRB
+
+from .farm import (planting_cost, purchase_cost, selling_price, feed_requirements,
+                    land_available, beet_sale_limit, expected_yields, crops)
+
+# multi-year planting: grain can be stored for next year's feed or sale,
+# and beets cannot be grown on the same field two years in a row
+storage_cost = {"wheat": 15, "corn": 15}
+stored = list(storage_cost.keys())
+# state passed between years: acres planted and grain in storage
+states = [("plant", crop) for crop in crops] + [("store", crop) for crop in stored]
+# loose lower bound on one year of (negative) profit
+year_bound = 1e7
+
+
+# stagewise-independent yields: realizations[t-1] holds the n outcomes of year t
+def sample_realizations(stages, n, spread=0.2, seed=0):
+    rng = np.random.default_rng(seed)
+    mean = np.array([expected_yields[crop] for crop in crops])
+    return mean * rng.uniform(1 - spread, 1 + spread, size=(stages - 1, n, len(crops)))
+
+
+# Benders cuts θ_t >= alpha + beta @ state_t shared by every node of a stage
+class Cuts:
+
+    def __init__(self, stages, dim, capacity=64):
+        self.alpha = [np.empty(capacity) for _ in range(stages)]
+        self.beta = [np.empty((capacity, dim)) for _ in range(stages)]
+        self.count = np.zeros(stages, dtype=int)
+
+    def add(self, t, alpha, beta):
+        n = self.count[t]
+        # double the arrays when full
+        if n == len(self.alpha[t]):
+            self.alpha[t] = np.concatenate([self.alpha[t], np.empty_like(self.alpha[t])])
+            self.beta[t] = np.concatenate([self.beta[t], np.empty_like(self.beta[t])])
+        self.alpha[t][n] = alpha
+        self.beta[t][n] = beta
+        self.count[t] += 1
+
+    def get(self, t):
+        n = self.count[t]
+        return self.alpha[t][:n], self.beta[t][:n]
+
+
+# one year of the farm: harvest last year's planting, trade, store and plant again
+class Stage:
+
+    def __init__(self, t, stages):
+        self.t, self.last = t, t == stages - 1
+        # create Gurobi model
+        m = gp.Model(f"Stage {t}")
+        # turn off log
+        m.Params.outputFlag = 0
+        # incoming state copies, fixed to the previous decisions
+        z = m.addVars(states, lb=-GRB.INFINITY, name="incoming")
+        self.fix = m.addConstrs((z[s] == 0 for s in states), "Fix")
+        # decision variables
+        sales = m.addVars(selling_price.keys(), vtype=GRB.CONTINUOUS, name="sales")
+        purchase = m.addVars(purchase_cost.keys(), vtype=GRB.CONTINUOUS, name="purchases")
+        # outgoing state and cost-to-go, none after the final harvest
+        ub = 0 if self.last else GRB.INFINITY
+        self.x = m.addVars(states, ub=ub, vtype=GRB.CONTINUOUS, name="outgoing")
+        self.θ = m.addVar(lb=-year_bound * (stages - t - 1), ub=0 if self.last else GRB.INFINITY, name="θ")
+        # objective function
+        revenue = gp.quicksum(sales[crop] * selling_price[crop] for crop in selling_price)
+        purchase_cost_total = gp.quicksum(purchase[crop] * purchase_cost[crop] for crop in purchase_cost)
+        planting_cost_total = gp.quicksum(self.x["plant", crop] * planting_cost[crop] for crop in crops)
+        storage_cost_total = gp.quicksum(self.x["store", crop] * storage_cost[crop] for crop in stored)
+        m.setObjective(- revenue + purchase_cost_total + planting_cost_total + storage_cost_total + self.θ, GRB.MINIMIZE)
+        # balances, harvest coefficients are set per realization
+        self.balance = {}
+        for crop in stored:
+            self.balance[crop] = m.addConstr(z["plant", crop] + z["store", crop] + purchase[crop] - sales[crop]
+                                             - self.x["store", crop] >= feed_requirements[crop] * (t > 0),
+                                             f"{crop.capitalize()} Balance")
+        self.balance["beets"] = m.addConstr(z["plant", "beets"] - sales["beets_high"] - sales["beets_low"] >= 0, "Beet Balance")
+        m.addConstr(sales["beets_high"] <= beet_sale_limit, "Beets Limit")
+        m.addConstr(gp.quicksum(self.x["plant", crop] for crop in crops) <= land_available, "Land Balance")
+        m.addConstr(self.x["plant", "beets"] + z["plant", "beets"] <= land_available, "Rotation")
+        self.z, self.m, self.synced = z, m, 0
+
+    # add the cuts stored for this stage that the model has not seen yet
+    def sync(self, alpha, beta):
+        for k in range(self.synced, len(alpha)):
+            self.m.addConstr(self.θ >= alpha[k] + gp.quicksum(beta[k, j] * self.x[s] for j, s in enumerate(states)))
+        self.synced = len(alpha)
+
+    # solve at an incoming state and yield realization
+    def solve(self, incoming, scenario_yields=None):
+        for j, s in enumerate(states):
+            self.fix[s].rhs = incoming[j]
+        if scenario_yields is not None:
+            for k, crop in enumerate(crops):
+                self.m.chgCoeff(self.balance[crop], self.z["plant", crop], scenario_yields[k])
+        self.m.optimize()
+        outgoing = np.array([self.x[s].x for s in states])
+        duals = np.array([self.fix[s].pi for s in states])
+        return self.m.objVal, self.m.objVal - self.θ.x, outgoing, duals
+
+
+# stage models of one sddp() run, built once per process and reused across its passes; every run
+# has its own key, so no model carries the cuts of another instance
+_models = {}
+
+
+def _stages(stages, run):
+    if _models.get("run") != run:
+        _models.clear()
+        _models["run"], _models["stages"] = run, [Stage(t, stages) for t in range(stages)]
+    return _models["stages"]
+
+
+# simulate one sample path with the current cuts
+def forward(cuts, realizations, path, run):
+    stages = len(realizations) + 1
+    models = _stages(stages, run)
+    incoming, total, trajectory = np.zeros(len(states)), 0.0, []
+    for t, model in enumerate(models):
+        model.sync(*cuts.get(t))
+        scenario_yields = realizations[t - 1, path[t - 1]] if t > 0 else None
+        _, cost, incoming, _ = model.solve(incoming, scenario_yields)
+        total += cost
+        trajectory.append(incoming)
+    return total, trajectory
+
+
+# Stochastic Dual Dynamic Programming for the multi-year farmer problem. every check iterations the
+# policy is simulated on the same samples paths, a statistical upper bound on the expected cost with
+# its 95% confidence interval; the run stops once the relative gap between the two bounds is no longer
+# significantly above gap, i.e. the bottom of the interval is within gap of the lower bound, or after
+# max_iter iterations with converged False
+def sddp(realizations, probs=None, passes=4, gap=0.01, check=5, samples=1000, max_iter=100, workers=None, seed=0,
+         verbose=False):
+    realizations = np.asarray(realizations, dtype=float)
+    stages, n = len(realizations) + 1, realizations.shape[1]
+    probs = np.full(n, 1 / n) if probs is None else np.asarray(probs, dtype=float)
+    rng = np.random.default_rng(seed)
+    cuts = Cuts(stages, len(states))
+    run = uuid.uuid4().hex
+    models = _stages(stages, run)
+    pool = ProcessPoolExecutor(workers) if workers else None
+    # evaluation paths, drawn once so that every check simulates the same sample
+    evaluation = [rng.choice(n, size=stages - 1, p=probs) for _ in range(samples)]
+
+    # forward passes with the current cuts, on the pool when there is one
+    def simulate(paths):
+        if pool is None:
+            return [forward(cuts, realizations, path, run) for path in paths]
+        k = len(paths)
+        return list(pool.map(forward, [cuts] * k, [realizations] * k, paths, [run] * k,
+                             chunksize=max(1, k // (4 * workers))))
+
+    log, upper, half, relative, converged = [], np.inf, np.inf, np.inf, False
+    try:
+        for it in range(1, max_iter + 1):
+            tick = time.perf_counter()
+            # forward passes on independently sampled paths
+            paths = [rng.choice(n, size=stages - 1, p=probs) for _ in range(passes)]
+            results = simulate(paths)
+            # backward pass: one averaged cut per stage and trajectory
+            for _, trajectory in results:
+                for t in range(stages - 1, 0, -1):
+                    model = models[t]
+                    model.sync(*cuts.get(t))
+                    objs, duals = np.empty(n), np.empty((n, len(states)))
+                    for k in range(n):
+                        objs[k], _, _, duals[k] = model.solve(trajectory[t - 1], realizations[t - 1, k])
+                    beta = probs @ duals
+                    cuts.add(t - 1, probs @ objs - beta @ trajectory[t - 1], beta)
+            # lower bound from the first year
+            models[0].sync(*cuts.get(0))
+            lower, _, first, _ = models[0].solve(np.zeros(len(states)))
+            row = {"iteration": it, "lower": lower, "cuts": int(cuts.count.sum())}
+            if it % check == 0 or it == max_iter:
+                # statistical upper bound: mean simulated cost of the policy
+                costs = np.array([total for total, _ in simulate(evaluation)])
+                upper = costs.mean()
+                half = 1.96 * costs.std(ddof=1) / np.sqrt(samples)
+                relative = (upper - lower) / max(1.0, abs(lower))
+                converged = relative - half / max(1.0, abs(lower)) <= gap
+                row.update(upper=upper, ci=half, gap=relative)
+            row["time"] = time.perf_counter() - tick
+            log.append(row)
+            if verbose:
+                bounds = f", Upper: {upper:.0f} ± {half:.0f}, Gap: {100 * relative:.2f}%" if "upper" in row else ""
+                print(f"Iteration {it}, Lower: {lower:.0f}{bounds}, Cuts: {row['cuts']}")
+            if converged:
+                break
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # profits are negated costs: the lower bound on cost bounds the expected profit from above
+    return {"profit": -lower, "simulated": -upper, "ci": half, "gap": relative, "converged": converged,
+            "planting": {crop: first[j] for j, crop in enumerate(crops)},
+            "cuts": cuts, "iterations": len(log), "log": log}
+
+
+# extensive form over the full scenario tree, only usable for tiny instances
+def extensive(realizations, probs=None):
+    realizations = np.asarray(realizations, dtype=float)
+    stages, n = len(realizations) + 1, realizations.shape[1]
+    probs = np.full(n, 1 / n) if probs is None else np.asarray(probs, dtype=float)
+    # create Gurobi model
+    m = gp.Model("Multi-Stage Extensive Form")
+    # turn off log
+    m.Params.outputFlag = 0
+    obj = 0
+    # each node carries (path probability, parent state variables, yields)
+    nodes = [(1.0, None, None)]
+    for t in range(stages):
+        children = []
+        for weight, parent, scenario_yields in nodes:
+            x = m.addVars(states, ub=0 if t == stages - 1 else GRB.INFINITY)
+            sales = m.addVars(selling_price.keys())
+            purchase = m.addVars(purchase_cost.keys())
+            incoming = {s: (parent[s] if parent is not None else 0) for s in states}
+            harvest = {crop: (scenario_yields[j] * incoming["plant", crop] if t > 0 else 0) for j, crop in enumerate(crops)}
+            for crop in stored:
+                m.addConstr(harvest[crop] + incoming["store", crop] + purchase[crop] - sales[crop]
+                            - x["store", crop] >= feed_requirements[crop] * (t > 0))
+            m.addConstr(harvest["beets"] - sales["beets_high"] - sales["beets_low"] >= 0)
+            m.addConstr(sales["beets_high"] <= beet_sale_limit)
+            m.addConstr(gp.quicksum(x["plant", crop] for crop in crops) <= land_available)
+            m.addConstr(x["plant", "beets"] + incoming["plant", "beets"] <= land_available)
+            obj += weight * (- gp.quicksum(sales[crop] * selling_price[crop] for crop in selling_price)
+                             + gp.quicksum(purchase[crop] * purchase_cost[crop] for crop in purchase_cost)
+                             + gp.quicksum(x["plant", crop] * planting_cost[crop] for crop in crops)
+                             + gp.quicksum(x["store", crop] * storage_cost[crop] for crop in stored))
+            if t < stages - 1:
+                children += [(weight * probs[k], x, realizations[t, k]) for k in range(n)]
+        nodes = children
+    m.setObjective(obj, GRB.MINIMIZE)
+    m.optimize()
+    return -m.objVal
+
+
+if __name__ == "__main__":
+    # small tree against the extensive form
+    small = sample_realizations(stages=3, n=3)
+    res = sddp(small, passes=3)
+    print(f"3 stages, 3 realizations: SDDP {res['profit']:.0f} vs extensive form {extensive(small):.0f}")
+    # a second run on the same instance starts from an empty cut store and finds the same bound
+    again = sddp(small, passes=3)
+    assert abs(again["profit"] - res["profit"]) < 1e-6 * abs(res["profit"]), (again["profit"], res["profit"])
+    # 10 years with 20 yield outcomes each, 20^9 paths
+    large = sample_realizations(stages=10, n=20)
+    res = sddp(large, passes=8, max_iter=100, workers=4, verbose=True)
+    total = sum(row["time"] for row in res["log"])
+    status = "converged" if res["converged"] else "not converged"
+    print(f"\nExpected profit: at most {res['profit']:.0f}, simulated {res['simulated']:.0f} ± {res['ci']:.0f}, "
+          f"gap {100 * res['gap']:.2f}% ({status} after {res['iterations']} iterations in {total:.1f}s)")
+    for crop in crops:
+        print(f"  plant {res['planting'][crop]:.0f} acres of {crop} in the first year.")
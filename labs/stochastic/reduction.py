@@ -0,0 +1,156 @@
+import time
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+# pairwise distances between scenario rows, computed in row blocks to bound memory
+def distances(X, Y, p=2, block=1024):
+    X, Y = np.asarray(X, dtype=float), np.asarray(Y, dtype=float)
+    D = np.empty((len(X), len(Y)))
+    if p == 2:
+        # |x - y|^2 = |x|^2 + |y|^2 - 2 x.y as one matrix product per block
+        y2 = np.einsum("ij,ij->i", Y, Y)
+        for start in range(0, len(X), block):
+            Xb = X[start:start + block]
+            sq = np.einsum("ij,ij->i", Xb, Xb)[:, None] + y2[None, :] - 2 * Xb @ Y.T
+            D[start:start + block] = np.sqrt(np.maximum(sq, 0))
+        return D
+    for start in range(0, len(X), block):
+        diff = X[start:start + block, None, :] - Y[None, :, :]
+        D[start:start + block] = (np.abs(diff) ** p).sum(axis=2) ** (1 / p)
+    return D
+
+
+# Kantorovich distance between the full distribution and the one supported on the selected rows,
+# along with the redistributed probabilities (each scenario moves to its closest selected one)
+def redistribute(X, probs, selected, p=2, block=1024):
+    nearest = np.empty(len(X), dtype=int)
+    dist = np.empty(len(X))
+    for start in range(0, len(X), block):
+        D = distances(X[start:start + block], X[selected], p=p)
+        nearest[start:start + block] = D.argmin(axis=1)
+        dist[start:start + block] = D.min(axis=1)
+    reduced = np.bincount(nearest, weights=probs, minlength=len(selected))
+    return reduced, probs @ dist
+
+
+# fast forward selection: greedily add the scenario that lowers the Kantorovich distance most
+def forward_selection(X, probs, k, p=2, pool=2000, block=1024, seed=0):
+    n = len(X)
+    # candidate scenarios, a random pool when the set is too large to scan
+    if n > pool:
+        candidates = np.random.default_rng(seed).choice(n, size=pool, replace=False, p=probs)
+    else:
+        candidates = np.arange(n)
+    # score of a candidate: expected distance to the selected set once it is added
+    score = np.zeros(len(candidates))
+    for start in range(0, n, block):
+        score += probs[start:start + block] @ distances(X[start:start + block], X[candidates], p=p)
+    # current distance of every scenario to the selected set
+    current = np.full(n, np.inf)
+    selected = []
+    available = np.ones(len(candidates), dtype=bool)
+    for _ in range(k):
+        best = np.where(available, score, np.inf).argmin()
+        available[best] = False
+        selected.append(candidates[best])
+        new = distances(X, X[candidates[best]][None, :], p=p)[:, 0]
+        # only scenarios that moved closer to the selected set change the scores
+        changed = np.flatnonzero(new < current)
+        for start in range(0, len(changed), block):
+            idx = changed[start:start + block]
+            D = distances(X[idx], X[candidates], p=p)
+            score += probs[idx] @ (np.minimum(D, new[idx, None]) - np.minimum(D, current[idx, None]))
+        current[changed] = new[changed]
+    return np.array(selected)
+
+
+# backward reduction: delete scenarios with the smallest p_i * distance to their nearest neighbour,
+# a batch per round so large sets shrink geometrically
+def backward_reduction(X, probs, k, p=2, batch=0.5):
+    kept = np.arange(len(X))
+    # probability mass already redirected to each kept scenario
+    mass = probs.copy()
+    while len(kept) > k:
+        tree = cKDTree(X[kept])
+        dist, idx = tree.query(X[kept], k=2, p=p)
+        neighbour = idx[:, 1]
+        cost = mass[kept] * dist[:, 1]
+        limit = max(1, min(len(kept) - k, int(batch * (len(kept) - k))))
+        removed = np.zeros(len(kept), dtype=bool)
+        absorbing = np.zeros(len(kept), dtype=bool)
+        count = 0
+        for i in np.argsort(cost, kind="stable"):
+            # never delete a scenario together with the one absorbing its mass, in either order, so
+            # every absorber survives the round and no mass passes on along a chain of deletions
+            if removed[neighbour[i]] or absorbing[i]:
+                continue
+            removed[i] = True
+            absorbing[neighbour[i]] = True
+            mass[kept[neighbour[i]]] += mass[kept[i]]
+            count += 1
+            if count == limit:
+                break
+        kept = kept[~removed]
+    return kept
+
+
+# shrink a scenario array to k representatives with redistributed probabilities
+def reduce(X, probs=None, k=10, method="forward", p=2, scale=True, **kwargs):
+    X = np.asarray(X, dtype=float)
+    probs = np.full(len(X), 1 / len(X)) if probs is None else np.asarray(probs, dtype=float)
+    # measure distances in units of each crop's spread, leaving constant columns as they are
+    if scale and len(X) > 1:
+        spread = X.std(axis=0)
+        Z = X / np.where(spread > 0, spread, 1.0)
+    else:
+        Z = X
+    if method == "forward":
+        selected = forward_selection(Z, probs, k, p=p, **kwargs)
+    elif method == "backward":
+        selected = backward_reduction(Z, probs, k, p=p, **kwargs)
+    else:
+        raise ValueError(f"Unknown method {method!r}, expected 'forward' or 'backward'.")
+    reduced, distance = redistribute(Z, probs, selected, p=p)
+    return X[selected], reduced, distance
+
+
+# reduction time and solution quality of the reduced sets against the full set
+def report(X, probs=None, sizes=(5, 10, 20), methods=("forward", "backward")):
+    # the LP side is only loaded here, reduction itself needs no Gurobi
+    from .farm import extensive, evaluate, scenario_dicts
+    from .regularized import benders
+    probs = np.full(len(X), 1 / len(X)) if probs is None else probs
+    full_yields, full_probs = scenario_dicts(X, probs)
+    tick = time.perf_counter()
+    full = benders(full_yields, full_probs)
+    print(f"Full set: {len(X)} scenarios, profit {full['profit']:.0f}, Benders {time.perf_counter() - tick:.2f}s\n")
+    print(f"{'method':>9} {'k':>4} {'reduce(s)':>10} {'distance':>9} {'EF profit':>10} {'BD profit':>10} {'true profit':>12} {'loss %':>7}")
+    for method in methods:
+        for k in sizes:
+            tick = time.perf_counter()
+            Xk, pk, distance = reduce(X, probs, k=k, method=method)
+            elapsed = time.perf_counter() - tick
+            yields_k, probs_k = scenario_dicts(Xk, pk)
+            ef_profit, planting = extensive(yields_k, probs_k)
+            bd_profit = benders(yields_k, probs_k)["profit"]
+            # reduced-set planting evaluated on every scenario
+            true_profit = evaluate(planting, full_yields, full_probs)
+            loss = 100 * (full["profit"] - true_profit) / abs(full["profit"])
+            print(f"{method:>9} {k:>4} {elapsed:>10.3f} {distance:>9.4f} {ef_profit:>10.0f} {bd_profit:>10.0f} {true_profit:>12.0f} {loss:>7.3f}")
+
+
+if __name__ == "__main__":
+    from .farm import expected_yields, crops
+    rng = np.random.default_rng(0)
+    mean = np.array([expected_yields[crop] for crop in crops])
+    # reduction alone on a large sample
+    big = mean * rng.lognormal(0, 0.15, size=(100000, len(crops)))
+    for method in ("forward", "backward"):
+        tick = time.perf_counter()
+        _, _, distance = reduce(big, k=20, method=method)
+        print(f"{method} reduction of 100000 scenarios to 20: {time.perf_counter() - tick:.2f}s, distance {distance:.4f}")
+    print()
+    # solution quality on a set small enough to solve in full
+    report(mean * rng.lognormal(0, 0.15, size=(1000, len(crops))))
@@ -0,0 +1,112 @@
+import contextlib
+import json
+import os
+import time
+
+import numpy as np
+
+# per-iteration traces of the decomposition loops (Lagrangian, Benders, column generation); a loop
+# times its phases with `with trace.phase("master"):` and closes each iteration with trace.record(...),
+# phases entered several times in one iteration (one per subproblem) are summed and also kept as a list
+# under "<phase>_each"; the lab scripts trace to $TRACE/<name>.jsonl when the TRACE directory is set
+
+
+# a running phase of the current iteration
+class _Phase:
+
+    def __init__(self, times, name):
+        self.times, self.name = times, name
+
+    def __enter__(self):
+        self.tick = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.times.setdefault(self.name, []).append(time.perf_counter() - self.tick)
+        return False
+
+
+# records kept in memory and, with a path, streamed as one JSON line per iteration
+class Tracer:
+
+    enabled = True
+
+    def __init__(self, path=None):
+        self.records = []
+        self._times = {}
+        self.file = None
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self.file = open(path, "w")
+
+    def phase(self, name):
+        return _Phase(self._times, name)
+
+    # close the iteration: the given values (iteration, bounds, cuts or columns added, model size, ...),
+    # the phase times and the gap upper - lower when both bounds are given
+    def record(self, **values):
+        entry = {"iteration": len(self.records) + 1}
+        entry.update(values)
+        if "gap" not in entry and "lower" in entry and "upper" in entry:
+            entry["gap"] = entry["upper"] - entry["lower"]
+        for name, times in self._times.items():
+            entry[name] = sum(times)
+            if len(times) > 1:
+                entry[f"{name}_each"] = times
+        self._times = {}
+        self.records.append(entry)
+        if self.file is not None:
+            self.file.write(json.dumps(entry) + "\n")
+            self.file.flush()
+        return entry
+
+    # the scalar fields of all records as a NumPy structured array, nan where a record lacks one
+    def array(self):
+        names = []
+        for entry in self.records:
+            names += [k for k, v in entry.items() if isinstance(v, (int, float)) and k not in names]
+        dtype = [(k, np.int64 if k == "iteration" else np.float64) for k in names]
+        out = np.zeros(len(self.records), dtype=dtype)
+        for k in names:
+            out[k] = [entry.get(k, np.nan) for entry in self.records] if k != "iteration" else \
+                [entry[k] for entry in self.records]
+        return out
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+# stand-in when tracing is off: phases are one shared no-op context and nothing is recorded
+class NullTracer:
+
+    enabled = False
+    records = ()
+    _phase = contextlib.nullcontext()
+
+    def phase(self, name):
+        return self._phase
+
+    def record(self, **values):
+        return None
+
+    def array(self):
+        return np.zeros(0, dtype=[("iteration", np.int64)])
+
+    def close(self):
+        pass
+
+
+NULL = NullTracer()
+
+
+# tracer for a lab script: streams to $TRACE/<name>.jsonl when TRACE is set, off otherwise
+def tracer(name):
+    folder = os.environ.get("TRACE")
+    return Tracer(os.path.join(folder, f"{name}.jsonl")) if folder else NULL
+
+
+# model size for a record
+def size(model):
+    return {"vars": model.NumVars, "constrs": model.NumConstrs, "nonzeros": model.NumNZs}
@@ -0,0 +1,126 @@
+import importlib.util
+from itertools import product
+
+import numpy as np
+import pytest
+
+from labs.dynamic import dp
+from labs.dynamic.dp import arrays, frontier, optimize, random_instance, tables
+from labs.dynamic.labels import pareto, real_instance
+
+gurobi = pytest.mark.skipif(importlib.util.find_spec("gurobipy") is None, reason="gurobipy is not installed")
+
+
+# best reliability over every configuration whose resources stay within their limits
+def brute_force(R, C, budget, W=None, capacity=None):
+    rows = np.arange(len(R))
+    best, config = 0.0, None
+    for choice in product(*[np.flatnonzero(r > 0) for r in R]):
+        choice = np.array(choice)
+        if C[rows, choice].sum() > budget + 1e-9:
+            continue
+        if W is not None and W[rows, choice].sum() > capacity + 1e-9:
+            continue
+        reliability = R[rows, choice].prod()
+        if reliability > best:
+            best, config = reliability, choice
+    return best, config
+
+
+# reliability and resource use of the returned configuration match the reported optimum
+def assert_optimal(R, C, budget, best, config, expected):
+    rows = np.arange(len(R))
+    assert best == pytest.approx(expected, rel=1e-12)
+    assert R[rows, config].prod() == pytest.approx(best, rel=1e-12)
+    assert C[rows, config].sum() <= budget + 1e-9
+
+
+def test_lab_instance():
+    R, C = arrays(dp.reliabilities, dp.costs, dp.components)
+    best, config = optimize(R, C, 1000)
+    recursion, units = dp.dp(0, 1000, (dp.components, dp.reliabilities, dp.costs))
+    assert best == pytest.approx(recursion, rel=1e-12)
+    assert_optimal(R, C, 1000, best, config, brute_force(R, C, 1000)[0])
+    assert R[np.arange(len(R)), units].prod() == pytest.approx(recursion)
+
+
+@pytest.mark.parametrize("budget", [300, 500, 800, 1200])
+@pytest.mark.parametrize("seed", range(3))
+def test_table_dp_brute_force(seed, budget):
+    R, C = random_instance(6, k=3, seed=seed)
+    best, config = optimize(R, C, budget)
+    expected, _ = brute_force(R, C, budget)
+    if expected == 0:
+        assert config is None
+    else:
+        assert_optimal(R, C, budget, best, config, expected)
+
+
+# an unavailable option (reliability 0) is never chosen, however cheap
+def test_unavailable_option():
+    R = np.array([[0, 0.9, 0.99], [0, 0.5, 0.8]])
+    C = np.array([[0, 5, 10], [0, 1, 30]])
+    R[1, 2] = 0.0
+    best, config = optimize(R, C, 100)
+    assert config.tolist() == [2, 1]
+    assert best == pytest.approx(0.99 * 0.5)
+
+
+def test_cached_tables(tmp_path):
+    R, C = random_instance(8, seed=4)
+    first = tables(R, C, 900, cache=tmp_path)
+    again = tables(R, C, 900, cache=tmp_path)
+    assert len(list(tmp_path.iterdir())) == 1
+    for a, b in zip(first, again):
+        np.testing.assert_array_equal(a, b)
+
+
+# every budget of the frontier has the optimum of a solve at that budget
+def test_frontier(tmp_path):
+    R, C = random_instance(5, seed=5)
+    budgets, reliability, config = frontier(R, C, 600, cache=tmp_path)
+    rows = np.arange(len(R))
+    for b, best, units in zip(budgets, reliability, config):
+        expected, _ = brute_force(R, C, b)
+        assert best == pytest.approx(expected, rel=1e-12)
+        if expected > 0:
+            assert_optimal(R, C, b, R[rows, units].prod(), units, expected)
+
+
+@pytest.mark.parametrize("bound", ["simple", pytest.param("lp", marks=gurobi)])
+@pytest.mark.parametrize("seed", range(3))
+def test_pareto_matches_table_dp(seed, bound):
+    R, C = random_instance(7, k=3, seed=seed)
+    budget = int(C[:, 1:].mean(axis=1).sum())
+    best, config, _ = pareto(R, C.astype(np.float64), budget, bound=bound)
+    expected, _ = optimize(R, C, budget)
+    assert_optimal(R, C, budget, best, config, expected)
+
+
+@pytest.mark.parametrize("bound", ["simple", pytest.param("lp", marks=gurobi)])
+@pytest.mark.parametrize("seed", range(3))
+def test_pareto_two_resources_brute_force(seed, bound):
+    R, C, W = real_instance(6, k=3, seed=seed)
+    budget, capacity = C[:, 1:].mean(axis=1).sum(), W[:, 1:].mean(axis=1).sum()
+    best, config, _ = pareto(R, C, budget, W, capacity, bound=bound)
+    expected, _ = brute_force(R, C, budget, W, capacity)
+    assert_optimal(R, C, budget, best, config, expected)
+    assert W[np.arange(len(R)), config].sum() <= capacity + 1e-9
+
+
+@pytest.mark.parametrize("bound", ["simple", pytest.param("lp", marks=gurobi)])
+def test_pareto_infeasible(bound):
+    R, C, _ = real_instance(4, seed=0)
+    assert pareto(R, C, C[:, 1].sum() - 1, bound=bound)[:2] == (0.0, None)
+
+
+@gurobi
+@pytest.mark.parametrize("seed", range(3))
+def test_mip_brute_force(seed):
+    from labs.dynamic.mip import ip
+    R, C, W = real_instance(6, k=3, seed=seed)
+    budget, capacity = C[:, 1:].mean(axis=1).sum(), W[:, 1:].mean(axis=1).sum()
+    log_reliability, config, _ = ip(R, C, budget, W, capacity)
+    expected, _ = brute_force(R, C, budget, W, capacity)
+    assert np.exp(log_reliability) == pytest.approx(expected, rel=1e-6)
+    assert R[np.arange(len(R)), config].prod() == pytest.approx(expected, rel=1e-6)
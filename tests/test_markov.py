@@ -0,0 +1,49 @@
+import importlib.util
+
+import numpy as np
+import pytest
+
+from labs.markov import avg
+from labs.markov.mdp import inventory, lab, random_mdp
+from labs.markov.policy import policy_iteration
+from labs.markov.value import gauss_seidel, value_iteration
+
+gurobi = pytest.mark.skipif(importlib.util.find_spec("gurobipy") is None, reason="gurobipy is not installed")
+models = [lab, lambda: inventory(15), lambda: random_mdp(40, 3, 4, seed=1)]
+ids = ["lab", "inventory", "random"]
+
+
+# value iteration stops within eps of the fixed point, policy iteration lands on it
+@pytest.mark.parametrize("make", models, ids=ids)
+@pytest.mark.parametrize("beta", [0.5, 0.95])
+def test_discounted_solvers_agree(make, beta):
+    mdp = make()
+    V, policy, _ = policy_iteration(mdp, beta)
+    np.testing.assert_allclose(value_iteration(mdp, beta, eps=1e-9)[0], V, atol=1e-6)
+    np.testing.assert_allclose(gauss_seidel(mdp, beta, eps=1e-9)[0], V, atol=1e-6)
+    # the policy is greedy for its own values
+    np.testing.assert_array_equal(policy_iteration(mdp, beta, policy=policy)[1], policy)
+
+
+@gurobi
+@pytest.mark.parametrize("make", models, ids=ids)
+def test_discounted_lp(make):
+    from labs.markov.lp import primal_lp
+    mdp = make()
+    V, _, _ = policy_iteration(mdp, 0.9)
+    np.testing.assert_allclose(primal_lp(mdp, 0.9)[0], V, atol=1e-6)
+
+
+@pytest.mark.parametrize("N", [5, 20])
+def test_average_cost(N):
+    model = avg.queue(N)
+    gain, _, policy, _ = avg.policy_iteration(*model)
+    assert avg.relative_value_iteration(*model)[0] == pytest.approx(gain, rel=1e-6)
+    assert len(policy) == len(model[0])
+
+
+@gurobi
+def test_average_cost_lp():
+    model = avg.queue(10)
+    gain, _, _, _ = avg.policy_iteration(*model)
+    assert avg.occupation_lp(*model)[0] == pytest.approx(gain, rel=1e-6)
@@ -0,0 +1,153 @@
+import importlib.util
+from itertools import combinations
+
+import numpy as np
+import pytest
+
+from labs.network.gomoryhu import GomoryHuTree, undirected
+from labs.network.graph import Graph, grid_graph, random_graph
+from labs.network.maxflowsolver import max_flow
+from labs.network.networksimplex import min_cost_flow, random_instance
+from labs.network.shortestpathsolver import bellman_ford, dijkstra, shortest_path
+
+# the LP cross-checks need gurobipy; the instances stay within the size-limited license
+gurobi = pytest.mark.skipif(importlib.util.find_spec("gurobipy") is None, reason="gurobipy is not installed")
+engines = ["dinic", "push_relabel"]
+
+
+# capacity of the arcs leaving the node set side
+def cut_capacity(graph, side):
+    return graph.capacity[side[graph.tail] & ~side[graph.head]].sum()
+
+
+# minimum s-t cut by enumerating every node set that holds s and not t
+def brute_force_cut(graph, s, t):
+    others = [v for v in range(graph.n) if v not in (s, t)]
+    best = np.inf
+    for k in range(len(others) + 1):
+        for chosen in combinations(others, k):
+            side = np.zeros(graph.n, dtype=bool)
+            side[[s, *chosen]] = True
+            best = min(best, cut_capacity(graph, side))
+    return best
+
+
+# the flow respects capacities and conserves at every node but s and t, sending value from s
+def assert_feasible(graph, flow, s, t, value):
+    assert (flow >= -1e-9).all() and (flow <= graph.capacity + 1e-9).all()
+    net = graph.incidence() @ flow
+    assert net[s] == pytest.approx(value)
+    assert np.abs(np.delete(net, [s, t])).max(initial=0) <= 1e-9
+
+
+@pytest.mark.parametrize("method", engines)
+@pytest.mark.parametrize("seed", range(5))
+def test_max_flow_brute_force(method, seed):
+    graph = random_graph(9, 30, seed=seed)
+    value, flow, side = max_flow(graph, 0, graph.n - 1, method)
+    assert value == pytest.approx(brute_force_cut(graph, 0, graph.n - 1))
+    assert_feasible(graph, flow, 0, graph.n - 1, value)
+    assert side[0] and not side[-1]
+    assert cut_capacity(graph, side) == pytest.approx(value)
+
+
+@gurobi
+@pytest.mark.parametrize("method", engines)
+@pytest.mark.parametrize("graph", [random_graph(60, 300, seed=1), grid_graph(12, 12, seed=2)], ids=["random", "grid"])
+def test_max_flow_lp(method, graph):
+    lp, _, _ = max_flow(graph, 0, graph.n - 1, "lp")
+    value, flow, side = max_flow(graph, 0, graph.n - 1, method)
+    assert value == pytest.approx(lp)
+    assert_feasible(graph, flow, 0, graph.n - 1, value)
+    assert cut_capacity(graph, side) == pytest.approx(lp)
+
+
+@pytest.mark.parametrize("method", engines)
+def test_max_flow_infinite_capacities(method):
+    # the infinite arc 1 -> 2 sits behind finite arcs, so the flow is finite
+    graph = Graph(4, [0, 1, 2, 0], [1, 2, 3, 2], [5, np.inf, 4, 3])
+    value, _, side = max_flow(graph, 0, 3, method)
+    assert value == pytest.approx(4)
+    assert cut_capacity(graph, side) == pytest.approx(4)
+
+
+@pytest.mark.parametrize("method", engines)
+def test_max_flow_unbounded(method):
+    graph = Graph(3, [0, 1, 0], [1, 2, 2], [np.inf, np.inf, 1])
+    with pytest.raises(ValueError):
+        max_flow(graph, 0, 2, method)
+
+
+@pytest.mark.parametrize("method", engines + ["lp"])
+def test_max_flow_same_terminals(method):
+    graph = random_graph(5, 10)
+    with pytest.raises(ValueError):
+        max_flow(graph, 2, 2, method)
+
+
+@gurobi
+@pytest.mark.parametrize("seed", range(3))
+def test_min_cost_flow_lp(seed):
+    from labs.network.flowlp import min_cost_flow_lp
+    graph, supply = random_instance(40, 200, 5, seed=seed)
+    cost, flow = min_cost_flow(graph, supply)
+    lp, _, _ = min_cost_flow_lp(graph, supply)
+    assert cost == pytest.approx(lp)
+    assert graph.cost @ flow == pytest.approx(cost)
+    assert (flow >= -1e-9).all() and (flow <= graph.capacity + 1e-9).all()
+    np.testing.assert_allclose(graph.incidence() @ flow, supply, atol=1e-9)
+
+
+# Dijkstra and bidirectional Dijkstra agree with SPFA, and SPFA stays right once node potentials
+# make some costs negative: d'(s, t) = d(s, t) + p[s] - p[t]
+@pytest.mark.parametrize("seed", range(3))
+def test_shortest_paths_agree(seed):
+    graph = random_graph(80, 400, seed=seed)
+    dist, _ = dijkstra(graph, 0)
+    np.testing.assert_allclose(bellman_ford(graph, 0)[0], dist)
+    for t in range(1, graph.n, 7):
+        distance, path = shortest_path(graph, 0, t)
+        assert distance == pytest.approx(dist[t])
+        assert graph.cost[path].sum() == pytest.approx(distance)
+        assert graph.tail[path[0]] == 0 and graph.head[path[-1]] == t
+    p = np.random.default_rng(seed).integers(0, 200, graph.n)
+    shifted = Graph(graph.n, graph.tail, graph.head, cost=graph.cost + p[graph.tail] - p[graph.head])
+    assert (shifted.cost < 0).any()
+    np.testing.assert_allclose(bellman_ford(shifted, 0)[0], dist + p[0] - p)
+
+
+def test_negative_cycle():
+    graph = Graph(3, [0, 1, 2], [1, 2, 1], cost=[1, -2, 1])
+    with pytest.raises(ValueError):
+        bellman_ford(graph, 0)
+
+
+@gurobi
+@pytest.mark.parametrize("seed", range(3))
+def test_shortest_path_lp(seed):
+    from labs.network.flowlp import shortest_path_lp
+    graph = random_graph(60, 300, seed=seed)
+    lp, _, _ = shortest_path_lp(graph, 0, graph.n - 1)
+    assert shortest_path(graph, 0, graph.n - 1)[0] == pytest.approx(lp)
+
+
+# every pairwise min cut read off the tree equals a direct max flow on the undirected network
+@pytest.mark.parametrize("workers", [None, 2])
+def test_gomory_hu(workers):
+    rng = np.random.default_rng(3)
+    n = 12
+    u, v = np.array(list(combinations(range(n), 2))).T
+    keep = rng.random(len(u)) < 0.4
+    # a ring keeps the network connected
+    u = np.concatenate([u[keep], np.arange(n)])
+    v = np.concatenate([v[keep], (np.arange(n) + 1) % n])
+    graph = undirected(n, u, v, rng.integers(1, 20, len(u)))
+    tree = GomoryHuTree(graph, workers=workers)
+    values = tree.matrix()
+    for a, b in combinations(range(n), 2):
+        value = max_flow(graph, a, b)[0]
+        assert tree.query(a, b) == pytest.approx(value)
+        assert values[a, b] == pytest.approx(value)
+        side = tree.cut(a, b)
+        assert side[a] and not side[b]
+        assert cut_capacity(graph, side) == pytest.approx(value)
@@ -0,0 +1,65 @@
+import importlib.util
+
+import numpy as np
+import pytest
+
+from labs.stochastic.reduction import reduce
+
+# every solver here but the scenario reduction builds Gurobi models
+gurobi = pytest.mark.skipif(importlib.util.find_spec("gurobipy") is None, reason="gurobipy is not installed")
+
+
+# yields spread 20% around the lab's expected yields
+def yield_scenarios(n, seed=0):
+    from labs.stochastic.farm import crops, expected_yields
+    mean = np.array([expected_yields[crop] for crop in crops])
+    return mean * np.random.default_rng(seed).uniform(0.8, 1.2, (n, len(crops)))
+
+
+@gurobi
+@pytest.mark.parametrize("method", ["kelley", "level", "trust", "proximal"])
+def test_benders_matches_extensive_form(method):
+    from labs.stochastic.farm import evaluate, extensive, scenario_dicts, yields, probabilities
+    from labs.stochastic.regularized import benders
+    for instance in [(yields, probabilities), scenario_dicts(yield_scenarios(30))]:
+        profit, planting = extensive(*instance)
+        result = benders(*instance, method=method)
+        assert result["profit"] == pytest.approx(profit, rel=1e-6)
+        # the reported planting earns the reported profit
+        assert evaluate(result["planting"], *instance) == pytest.approx(result["profit"], rel=1e-6)
+        assert evaluate(planting, *instance) == pytest.approx(profit, rel=1e-6)
+
+
+@gurobi
+def test_sddp_bounds_extensive_form():
+    from labs.stochastic.multistage import extensive, sample_realizations, sddp
+    small = sample_realizations(stages=3, n=3)
+    result = sddp(small, passes=3)
+    exact = extensive(small)
+    assert result["converged"]
+    assert result["gap"] <= 0.01
+    # the lower bound on cost bounds the expected profit from above
+    assert result["profit"] >= exact - 1e-6 * abs(exact)
+    assert result["profit"] == pytest.approx(exact, rel=1e-3)
+    assert abs(result["simulated"] - exact) <= result["ci"] + 1e-3 * abs(exact)
+    assert sddp(small, passes=3)["profit"] == pytest.approx(result["profit"], rel=1e-9)
+
+
+@pytest.mark.parametrize("method", ["forward", "backward"])
+def test_reduction(method):
+    X = yield_scenarios(60, seed=1)
+    kept, probs, distance = reduce(X, k=10, method=method)
+    assert kept.shape == (10, X.shape[1])
+    assert probs.sum() == pytest.approx(1.0)
+    assert (probs >= 0).all() and distance > 0
+    # every kept scenario is one of the originals
+    assert all((np.abs(X - row).max(axis=1) == 0).any() for row in kept)
+    # keeping them all moves no mass
+    _, probs, distance = reduce(X, k=len(X), method=method)
+    np.testing.assert_allclose(np.sort(probs), np.full(len(X), 1 / len(X)))
+    assert distance == pytest.approx(0.0, abs=1e-6)
+
+
+def test_reduction_unknown_method():
+    with pytest.raises(ValueError):
+        reduce(yield_scenarios(5), k=2, method="random")